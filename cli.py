@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Interface de linha de comando não interativa do Gerenciador de Vídeos
+Saída em JSON no stdout; mensagens de progresso vão para o stderr.
+
+Exemplos:
+    python cli.py --config manager_config.json run-once
+    python cli.py --config manager_config.json daemon
+    python cli.py --config manager_config.json status
+    python cli.py --config manager_config.json upload --count 10 --concurrency 3
+    python cli.py --config manager_config.json history --since 7d --outcome failed
+    python cli.py --config manager_config.json history --since 30d --summary --group-by channel,day
+"""
+
+import argparse
+import json
+import signal
+import sys
+from contextlib import redirect_stdout
+
+from src.cron_job.history import OUTCOMES, parse_since
+from src.cron_job.manager import VideoManager, load_config
+
+
+def _emit(data) -> None:
+    """Escreve o resultado em JSON no stdout real"""
+    sys.__stdout__.write(json.dumps(data, default=str, ensure_ascii=False) + "\n")
+    sys.__stdout__.flush()
+
+
+def _install_signal_handlers(manager: VideoManager) -> None:
+    """SIGTERM/SIGINT encerram o gerenciador de forma ordenada"""
+    def handle(signum, frame):
+        print(f"\n📴 Sinal {signum} recebido, encerrando...")
+        manager.stop()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+
+def cmd_run_once(manager: VideoManager, args) -> int:
+    result = manager.run_once(force=args.force)
+    _emit(result)
+    return 1 if result['status'] in ('failed', 'error') else 0
+
+
+def cmd_daemon(manager: VideoManager, args) -> int:
+    _install_signal_handlers(manager)
+    manager.start_scheduler()
+    _emit({'status': 'stopped'})
+    return 0
+
+
+def cmd_status(manager: VideoManager, args) -> int:
+    manager.sync_pool()
+    _emit(manager.get_status())
+    return 0
+
+
+def cmd_upload(manager: VideoManager, args) -> int:
+    _install_signal_handlers(manager)
+    results = manager.upload_batch(args.count, args.concurrency)
+    manager.drain()
+    summary = {
+        'requested': args.count,
+        'uploaded': sum(1 for result in results if result['status'] == 'uploaded'),
+        'failed': sum(1 for result in results if result['status'] in ('failed', 'error')),
+        'results': results,
+    }
+    _emit(summary)
+    return 1 if summary['failed'] else 0
+
+
+def cmd_history(manager: VideoManager, args) -> int:
+    if args.compact:
+        _emit({'removed': manager.compact_history()})
+        return 0
+    try:
+        filters = {
+            'channel': args.channel,
+            'platform': args.platform,
+            'outcome': args.outcome,
+            'account': args.account,
+            'since': parse_since(args.since) if args.since else None,
+            'until': parse_since(args.until) if args.until else None,
+        }
+        if args.operations:
+            _emit(manager.history.operations(
+                remote_id=args.remote_id, filename=args.filename, since=filters['since'], limit=args.limit
+            ))
+        elif args.summary:
+            _emit(manager.history.summary(args.group_by.split(','), **filters))
+        else:
+            _emit(manager.history.query(filename=args.filename, limit=args.limit, **filters))
+    except ValueError as e:
+        _emit({'status': 'error', 'error': str(e)})
+        return 2
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Gerenciador de vídeos (modo não interativo)")
+    parser.add_argument('--config', required=True, help="Arquivo JSON de configuração")
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_once = subparsers.add_parser('run-once', help="Executa uma verificação/upload")
+    run_once.add_argument('--force', action='store_true', help="Ignora intervalo e horário")
+    run_once.set_defaults(handler=cmd_run_once)
+
+    daemon = subparsers.add_parser('daemon', help="Executa o agendador continuamente")
+    daemon.set_defaults(handler=cmd_daemon)
+
+    status = subparsers.add_parser('status', help="Mostra o status em JSON")
+    status.set_defaults(handler=cmd_status)
+
+    upload = subparsers.add_parser('upload', help="Envia vários vídeos em lote")
+    upload.add_argument('--count', type=int, default=1, help="Quantidade de vídeos")
+    upload.add_argument('--concurrency', type=int, default=None,
+                        help="Uploads simultâneos (padrão: um por conta)")
+    upload.set_defaults(handler=cmd_upload)
+
+    history = subparsers.add_parser('history', help="Consulta o histórico de uploads")
+    history.add_argument('--channel', help="Filtra por canal")
+    history.add_argument('--platform', help="Filtra por plataforma")
+    history.add_argument('--account', help="Filtra por conta")
+    history.add_argument('--outcome', choices=OUTCOMES, help="Filtra por resultado")
+    history.add_argument('--filename', help="Tentativas de um vídeo específico")
+    history.add_argument('--since', help="Início do período (7d, 12h, 30m ou data ISO)")
+    history.add_argument('--until', help="Fim do período (mesmo formato)")
+    history.add_argument('--limit', type=int, default=100, help="Máximo de linhas")
+    history.add_argument('--summary', action='store_true', help="Totais agrupados em vez das tentativas")
+    history.add_argument('--group-by', default="channel,platform,outcome",
+                         help="Agrupamento do resumo (channel, platform, account, outcome, day)")
+    history.add_argument('--operations', action='store_true',
+                         help="Chamadas posteriores ao upload (playlists) e seus resultados")
+    history.add_argument('--remote-id', help="Filtra as operações pelo ID remoto do vídeo")
+    history.add_argument('--compact', action='store_true', help="Aplica a retenção e compacta o histórico")
+    history.set_defaults(handler=cmd_history)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        config.setdefault('interactive', False)
+    except Exception as e:
+        _emit({'status': 'error', 'error': f"Configuração inválida: {e}"})
+        return 2
+
+    # Mensagens com emoji do gerenciador vão para o stderr
+    with redirect_stdout(sys.stderr):
+        manager = VideoManager(config)
+        return args.handler(manager, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,14 @@ Configurador do Gerenciador de Vídeos
 Interface simples para configurar e executar o sistema automático
 """
 
-from src.cron_job.manager import VideoManager, create_config
+from src.channels.credentials import save_token
+from src.cron_job.manager import VideoManager, create_config, save_config
 import os
 
 
+CONFIG_FILE = "manager_config.json"
+
+
 def setup_config():
     """Configura o sistema interativamente"""
     print("🎬 Configurador do Gerenciador de Vídeos")
@@ -79,7 +83,6 @@ def setup_authentication(manager: VideoManager) -> bool:
     try:
         # Importar as classes necessárias
         from google_auth_oauthlib.flow import InstalledAppFlow
-        import json
         
         # Configurar flow
         config = manager.auth.auth_configs['youtube']
@@ -118,9 +121,8 @@ def setup_authentication(manager: VideoManager) -> bool:
             'scopes': creds.scopes
         }
         
-        token_file = config.token_file
-        with open(token_file, 'w') as f:
-            json.dump(token_data, f)
+        save_token(config.token_file, token_data)
+        manager.auth._credentials.invalidate(('youtube', config.account))
         
         # Marcar como autenticado
         manager._authenticated = True
@@ -136,6 +138,7 @@ def setup_authentication(manager: VideoManager) -> bool:
 
 def show_status(manager: VideoManager):
     """Mostra status do gerenciador"""
+    manager.sync_pool()
     status = manager.get_status()
     
     print("\n📊 Status do Sistema:")
@@ -170,7 +173,9 @@ def main():
         if choice == "1":
             config = setup_config()
             manager = VideoManager(config)
-            print("✅ Configuração salva!")
+            save_config(config, CONFIG_FILE)
+            print(f"✅ Configuração salva em {CONFIG_FILE}!")
+            print(f"💡 Modo não interativo: python cli.py --config {CONFIG_FILE} daemon")
             
         elif choice == "2":
             if manager is None:
@@ -59,6 +59,7 @@ def setup_config():
 
 def show_status(manager: VideoManager):
     """Mostra status do gerenciador"""
+    manager.sync_pool()
     status = manager.get_status()
     
     print("\n📊 Status do Sistema:")
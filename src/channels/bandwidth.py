@@ -0,0 +1,205 @@
+import io
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+
+# Tamanho de cada leitura repassada ao socket; define a granularidade do limite
+BLOCK_SIZE = 64 * 1024
+# Balde compartilhado: cada processo retira até 100ms de banda por transação
+GRANT_SECONDS = 0.1
+
+
+def parse_profile(profile: List) -> List[Tuple[int, int, Optional[float]]]:
+    """Normaliza o perfil [{start_hour, end_hour, mbps|bytes_per_second}] da configuração
+
+    Cada faixa vale de start_hour (inclusive) até end_hour (exclusive) e pode
+    cruzar a meia-noite (ex.: 22 até 6). Sem limite = None.
+    """
+    windows = []
+    for entry in profile or []:
+        if 'bytes_per_second' in entry:
+            rate = entry['bytes_per_second']
+        elif 'mb_per_second' in entry:
+            rate = entry['mb_per_second'] * 1024 * 1024 if entry['mb_per_second'] is not None else None
+        else:
+            rate = None
+        windows.append((int(entry['start_hour']), int(entry['end_hour']), rate))
+    return windows
+
+
+class BandwidthLimiter:
+    """Token bucket de bytes compartilhado por todos os uploads do processo
+
+    A taxa segue um perfil por horário do dia; fora das faixas configuradas
+    (ou com taxa None) não há limite.
+    """
+
+    def __init__(self, profile: Optional[List] = None, clock: Callable[[], datetime] = datetime.now):
+        self.windows = parse_profile(profile)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    def current_rate(self) -> Optional[float]:
+        """Limite em bytes/s para o horário atual (None = ilimitado)"""
+        hour = self._clock().hour
+        for start, end, rate in self.windows:
+            inside = start <= hour < end if start < end else (hour >= start or hour < end)
+            if inside:
+                return rate
+        return None
+
+    def consume(self, size: int) -> None:
+        """Bloqueia até o envio de `size` bytes caber no limite atual"""
+        while True:
+            rate = self.current_rate()
+            if not rate:
+                return
+            with self._lock:
+                now = time.monotonic()
+                # Rajada máxima de 1s de banda
+                self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= size or (size > rate and self._tokens >= rate):
+                    self._tokens -= size
+                    return
+                wait = (min(size, rate) - self._tokens) / rate
+            time.sleep(min(wait, 1.0))
+
+
+class SharedBandwidthLimiter(BandwidthLimiter):
+    """Token bucket gravado em SQLite, compartilhado por vários processos
+
+    Os workers do supervisor (um processo por canal) apontam para o mesmo
+    arquivo, então o perfil limita a soma de todos. Para não abrir uma
+    transação por bloco, cada processo retira do balde até GRANT_SECONDS de
+    banda por vez e consome essa reserva localmente.
+    """
+
+    def __init__(self, db_path: str, profile: Optional[List] = None,
+                 clock: Callable[[], datetime] = datetime.now):
+        super().__init__(profile, clock)
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        # Bytes já retirados do balde e ainda não enviados por este processo
+        self._granted = 0.0
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bandwidth_bucket ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            # Perder o saldo do balde numa queda não faz mal; evita fsync a cada retirada
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _take(self, amount: float, rate: float) -> float:
+        """Retira amount bytes do balde compartilhado; devolve a espera necessária (0 = retirado)"""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT tokens, updated FROM bandwidth_bucket WHERE id = 1").fetchone()
+            now = time.time()
+            tokens = 0.0 if row is None else min(rate, row[0] + max(0.0, now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= amount or (amount > rate and tokens >= rate):
+                tokens -= amount
+            else:
+                wait = (min(amount, rate) - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO bandwidth_bucket (id, tokens, updated) VALUES (1, ?, ?)", (tokens, now)
+            )
+            return wait
+
+    def consume(self, size: int) -> None:
+        while True:
+            rate = self.current_rate()
+            if not rate:
+                return
+            with self._lock:
+                if self._granted >= size:
+                    self._granted -= size
+                    return
+                amount = max(size, rate * GRANT_SECONDS) - self._granted
+                wait = self._take(amount, rate)
+                if not wait:
+                    self._granted += amount - size
+                    return
+            time.sleep(min(wait, 1.0))
+
+
+class ThrottledReader(io.RawIOBase):
+    """Arquivo/bytes cuja leitura respeita o BandwidthLimiter
+
+    requests e httplib2 leem o corpo em blocos; limitar a leitura limita o
+    envio sem mudar o protocolo (Content-Length continua conhecido).
+    """
+
+    def __init__(self, source, limiter: BandwidthLimiter, length: Optional[int] = None):
+        self._source = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+        self._limiter = limiter
+        if length is None:
+            position = self._source.tell()
+            length = self._source.seek(0, io.SEEK_END) - position
+            self._source.seek(position)
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self._source.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._source.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._source.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            # Leitura total pedida: entrega em blocos limitados
+            chunks = []
+            while True:
+                block = self.read(BLOCK_SIZE)
+                if not block:
+                    return b"".join(chunks)
+                chunks.append(block)
+
+        data = self._source.read(min(size, BLOCK_SIZE))
+        if data:
+            self._limiter.consume(len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        try:
+            self._source.close()
+        finally:
+            super().close()
@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class UploadCheckpoints:
+    """Progresso de uploads em chunks, gravado a cada chunk confirmado
+
+    Se o processo cair no meio do envio, o próximo worker retoma do chunk
+    seguinte na mesma sessão (publish_id/upload_url) em vez de reenviar o
+    vídeo. A sessão de upload do TikTok expira, então checkpoints mais velhos
+    que max_age_seconds são descartados. O arquivo precisa continuar igual
+    (tamanho e mtime) para a retomada valer.
+    """
+
+    def __init__(self, db_path: str, max_age_seconds: float = 3600):
+        self.db_path = str(db_path)
+        self.max_age_seconds = max_age_seconds
+        self._local = threading.local()
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS upload_checkpoints (
+                filename TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                account TEXT NOT NULL,
+                publish_id TEXT NOT NULL,
+                upload_url TEXT NOT NULL,
+                video_size INTEGER NOT NULL,
+                modified_at REAL,
+                chunk_size INTEGER NOT NULL,
+                total_chunks INTEGER NOT NULL,
+                next_chunk INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def save(self, filename: str, platform: str, account: str, publish_id: str, upload_url: str,
+             video_size: int, modified_at: Optional[float], chunk_size: int, total_chunks: int) -> None:
+        """Registra uma sessão de upload recém-iniciada"""
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO upload_checkpoints (filename, platform, account, publish_id, upload_url, "
+            "video_size, modified_at, chunk_size, total_chunks, next_chunk, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+            (filename, platform, account, publish_id, upload_url, video_size, modified_at,
+             chunk_size, total_chunks, now, now)
+        )
+
+    def advance(self, filename: str, next_chunk: int) -> None:
+        """Marca os chunks anteriores a next_chunk como confirmados"""
+        self._connection().execute(
+            "UPDATE upload_checkpoints SET next_chunk = ?, updated_at = ? WHERE filename = ?",
+            (next_chunk, time.time(), filename)
+        )
+
+    def clear(self, filename: str) -> None:
+        self._connection().execute("DELETE FROM upload_checkpoints WHERE filename = ?", (filename,))
+
+    def resume(self, filename: str, platform: str, account: str, video_size: int,
+               modified_at: Optional[float]) -> Optional[Dict]:
+        """Checkpoint válido para retomar o upload (None se não houver ou expirou)"""
+        row = self._connection().execute(
+            "SELECT publish_id, upload_url, video_size, modified_at, chunk_size, total_chunks, next_chunk, "
+            "created_at, platform, account FROM upload_checkpoints WHERE filename = ?", (filename,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('publish_id', 'upload_url', 'video_size', 'modified_at', 'chunk_size', 'total_chunks',
+                'next_chunk', 'created_at', 'platform', 'account')
+        checkpoint = dict(zip(keys, row))
+        if (
+            time.time() - checkpoint['created_at'] > self.max_age_seconds
+            or (checkpoint['platform'], checkpoint['account']) != (platform, account)
+            or checkpoint['video_size'] != video_size
+            or checkpoint['modified_at'] != modified_at
+        ):
+            # Sessão vencida, outra conta ou arquivo alterado: recomeça do zero
+            self.clear(filename)
+            return None
+        return checkpoint
+
+    def pending(self, platform: Optional[str] = None) -> List[str]:
+        """Vídeos com upload interrompido ainda dentro da validade da sessão"""
+        query = "SELECT filename FROM upload_checkpoints WHERE created_at >= ?"
+        params = [time.time() - self.max_age_seconds]
+        if platform is not None:
+            query += " AND platform = ?"
+            params.append(platform)
+        return [row[0] for row in self._connection().execute(query + " ORDER BY created_at", params)]
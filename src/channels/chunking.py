@@ -0,0 +1,107 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from src.channels.files import atomic_write_json
+
+
+# Limites da Content Posting API do TikTok
+TIKTOK_MIN_CHUNK = 5 * 1024 * 1024
+TIKTOK_MAX_CHUNK = 64 * 1024 * 1024
+TIKTOK_MAX_CHUNKS = 1000
+DEFAULT_CHUNK = 10 * 1024 * 1024
+
+
+def plan_tiktok_chunks(video_size: int, chunk_size: int) -> Tuple[int, int]:
+    """Ajusta chunk_size às regras do TikTok e retorna (chunk_size, total_chunks)
+
+    Vídeos menores que o chunk mínimo vão em um único chunk; nos demais o
+    último chunk absorve o resto (total = tamanho // chunk_size).
+    """
+    if video_size < TIKTOK_MIN_CHUNK:
+        return video_size, 1
+
+    chunk_size = max(TIKTOK_MIN_CHUNK, min(TIKTOK_MAX_CHUNK, chunk_size, video_size))
+    # Respeitar o máximo de chunks aumentando o tamanho se necessário
+    if video_size // chunk_size > TIKTOK_MAX_CHUNKS:
+        chunk_size = -(-video_size // TIKTOK_MAX_CHUNKS)
+    return chunk_size, video_size // chunk_size
+
+
+class ChunkSizer:
+    """Escolhe o tamanho de chunk a partir da vazão e taxa de erro medidas
+
+    O estado é mantido por conta e perfil de rede e persistido em JSON, para
+    que os próximos uploads já comecem de um bom valor.
+    """
+
+    def __init__(
+        self,
+        state_file: str,
+        min_chunk: int = TIKTOK_MIN_CHUNK,
+        max_chunk: int = TIKTOK_MAX_CHUNK,
+        target_seconds: float = 8.0,
+        smoothing: float = 0.3
+    ):
+        self.state_file = Path(state_file)
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        # Duração alvo de cada PUT: poucas idas e voltas sem perder muito numa falha
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = self._load()
+
+    @staticmethod
+    def profile_key(account: str, network_profile: str) -> str:
+        return f"{account}@{network_profile}"
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Estado de chunks inválido, recomeçando: {e}")
+            return {}
+
+    def _save(self) -> None:
+        # Escrita atômica para não corromper o arquivo em paradas abruptas
+        atomic_write_json(self.state_file, self._state)
+
+    def chunk_size(self, key: str) -> int:
+        """Tamanho de chunk sugerido para o próximo upload"""
+        with self._lock:
+            return int(self._state.get(key, {}).get('chunk_size', DEFAULT_CHUNK))
+
+    def record_chunk(self, key: str, size: int, seconds: float, ok: bool) -> None:
+        """Registra a medição de um PUT de chunk"""
+        with self._lock:
+            profile = self._state.setdefault(key, {'chunk_size': DEFAULT_CHUNK})
+            alpha = self.smoothing
+            error = 0.0 if ok else 1.0
+            profile['error_rate'] = (1 - alpha) * profile.get('error_rate', 0.0) + alpha * error
+            if ok and seconds > 0:
+                throughput = size / seconds
+                previous = profile.get('throughput')
+                profile['throughput'] = throughput if previous is None else (1 - alpha) * previous + alpha * throughput
+
+    def finish_upload(self, key: str) -> int:
+        """Recalcula e persiste o tamanho de chunk ao fim de um upload"""
+        with self._lock:
+            profile = self._state.setdefault(key, {'chunk_size': DEFAULT_CHUNK})
+            throughput = profile.get('throughput')
+            if throughput:
+                size = throughput * self.target_seconds
+                # Links instáveis: chunks menores para perder menos em cada falha
+                size *= 1 - min(0.75, 2 * profile.get('error_rate', 0.0))
+                mb = 1024 * 1024
+                size = int(max(self.min_chunk, min(self.max_chunk, size)) // mb * mb)
+                profile['chunk_size'] = max(self.min_chunk, size)
+            try:
+                self._save()
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar estado de chunks: {e}")
+            return profile['chunk_size']
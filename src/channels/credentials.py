@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.channels.files import atomic_write_json
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos, só entre threads
+    fcntl = None
+
+
+@contextmanager
+def token_file_lock(token_file: str):
+    """Lock exclusivo (flock) em <token_file>.lock, compartilhado entre processos do host"""
+    with open(f"{token_file}.lock", 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def read_token(token_file: str) -> Optional[Dict]:
+    """Lê o arquivo de token (None se não existir)"""
+    if not os.path.exists(token_file):
+        return None
+    with open(token_file, 'r') as f:
+        return json.load(f)
+
+
+def save_token(token_file: str, token_data: Dict) -> None:
+    """Grava o token de forma atômica sob o lock do arquivo"""
+    with token_file_lock(token_file):
+        atomic_write_json(token_file, token_data)
+
+
+class CredentialCache:
+    """Cache de credenciais em memória com renovação única (single-flight)
+
+    Cada conta tem seu lock: enquanto uma thread renova o token, as demais
+    esperam e recebem o mesmo resultado. A renovação acontece sob o lock do
+    arquivo e relê o token antes, aproveitando a renovação feita por outro
+    processo no mesmo host.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Any] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(
+        self,
+        key: Tuple[str, str],
+        token_file: str,
+        load: Callable[[Optional[Dict]], Any],
+        is_fresh: Callable[[Any], bool],
+        refresh: Callable[[Any], Any],
+        dump: Callable[[Any], Dict]
+    ) -> Any:
+        """Credencial válida para a conta (None se não houver como obter)
+
+        load converte o conteúdo do arquivo, is_fresh diz se ainda vale,
+        refresh renova (None em falha) e dump serializa para o arquivo.
+        """
+        with self._lock_for(key):
+            cached = self._entries.get(key)
+            if cached is not None and is_fresh(cached):
+                return cached
+
+            with token_file_lock(token_file):
+                current = load(read_token(token_file))
+                if current is not None and is_fresh(current):
+                    self._entries[key] = current
+                    return current
+                if current is None:
+                    self._entries.pop(key, None)
+                    return None
+
+                renewed = refresh(current)
+                if renewed is None:
+                    self._entries.pop(key, None)
+                    return None
+                atomic_write_json(token_file, dump(renewed))
+                self._entries[key] = renewed
+                return renewed
+
+    def invalidate(self, key: Tuple[str, str]) -> None:
+        """Descarta a credencial em memória (ex.: após nova autenticação)"""
+        with self._lock_for(key):
+            self._entries.pop(key, None)
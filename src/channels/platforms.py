@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+
+
+class PlatformAdapter:
+    """Interface de uma plataforma de destino
+
+    Cada adaptador declara quantos uploads simultâneos aceita (max_concurrency);
+    o PublishShorts executa os uploads de cada plataforma em um executor
+    próprio com esse limite, então uma plataforma lenta não segura as outras.
+    """
+
+    name: str = ""
+    max_concurrency: int = 1
+    # A API aceita publicação agendada (upload antecipado)?
+    supports_scheduling: bool = False
+
+    def __init__(self, publisher):
+        self.publisher = publisher
+
+    def authenticate(self, auth, account: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
+    def prepare(self, video, publish_at: Optional[datetime] = None) -> Dict:
+        """Metadados do upload"""
+        return self.publisher.prepare_for_upload(video, self.name, publish_at)
+
+    def upload(self, video, auth, account: Optional[str] = None,
+               publish_at: Optional[datetime] = None) -> bool:
+        raise NotImplementedError
+
+    def finalize(self, video, account: Optional[str], success: bool) -> None:
+        """Etapa após o envio (ex.: acompanhar processamento); padrão: nada"""
+
+    def status(self) -> Dict:
+        """Estado da plataforma para o /status"""
+        return {}
+
+
+_ADAPTERS: Dict[str, Type[PlatformAdapter]] = {}
+
+
+def register_platform(adapter_class: Type[PlatformAdapter]) -> Type[PlatformAdapter]:
+    """Registra um adaptador (pode ser usado como decorator)"""
+    if not adapter_class.name:
+        raise ValueError("Adaptador de plataforma sem nome")
+    _ADAPTERS[adapter_class.name] = adapter_class
+    return adapter_class
+
+
+def get_platform(name: str) -> Type[PlatformAdapter]:
+    try:
+        return _ADAPTERS[name]
+    except KeyError:
+        raise ValueError(f"Plataforma não suportada: {name} (opções: {', '.join(available_platforms())})")
+
+
+def available_platforms() -> List[str]:
+    return sorted(_ADAPTERS)
+
+
+@register_platform
+class YouTubeAdapter(PlatformAdapter):
+    name = "youtube"
+    max_concurrency = 3
+    supports_scheduling = True
+
+    def authenticate(self, auth, account: Optional[str] = None) -> bool:
+        return auth.authenticate_youtube(account)
+
+    def upload(self, video, auth, account: Optional[str] = None,
+               publish_at: Optional[datetime] = None) -> bool:
+        return self.publisher.upload_to_youtube(video, auth, account, publish_at)
+
+
+@register_platform
+class TikTokAdapter(PlatformAdapter):
+    name = "tiktok"
+    # init é limitado a poucas chamadas por minuto; mais paralelismo só enfileira
+    max_concurrency = 2
+
+    def authenticate(self, auth, account: Optional[str] = None) -> bool:
+        return auth.authenticate_tiktok(account)
+
+    def upload(self, video, auth, account: Optional[str] = None,
+               publish_at: Optional[datetime] = None) -> bool:
+        if publish_at is not None:
+            print("⚠️ TikTok não aceita publicação agendada; enviando para publicação imediata")
+        return self.publisher.upload_to_tiktok(video, auth, account)
+
+    def status(self) -> Dict:
+        tracker = self.publisher.status_tracker
+        return {'pending_publishes': tracker.pending_count()} if tracker is not None else {}
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from src.observability import events, metrics
+
+
+# Leitura em blocos no modo 'read' (e quando não há posix_fadvise)
+READ_BLOCK = 1024 * 1024
+
+PREFETCH_BYTES = metrics.REGISTRY.counter(
+    "prefetch_bytes_total",
+    "Bytes de vídeo aquecidos no cache antes do upload",
+    ("mode",)
+)
+PREFETCH_DURATION = metrics.REGISTRY.histogram(
+    "prefetch_duration_seconds",
+    "Tempo para aquecer o próximo vídeo",
+    ("mode",)
+)
+PREFETCH_RESULTS = metrics.REGISTRY.counter(
+    "prefetch_results_total",
+    "Uploads que encontraram o arquivo aquecido (hit) ou não (miss)",
+    ("result",)
+)
+PREFETCH_RESIDENT = metrics.REGISTRY.gauge(
+    "prefetch_resident_bytes",
+    "Bytes aquecidos aguardando o upload (limitados pelo orçamento)"
+)
+
+
+class Prefetcher:
+    """Aquece em segundo plano o cache de páginas do próximo vídeo
+
+    Enquanto o upload atual está em andamento, o próximo arquivo é lido
+    antecipadamente: com posix_fadvise(WILLNEED) o kernel faz a leitura
+    antecipada sozinho; no modo 'read' (montagens FUSE que ignoram o aviso)
+    o arquivo é lido e descartado. O total aquecido e ainda não enviado não
+    passa de budget_mb; arquivos maiores são aquecidos só no início.
+    """
+
+    def __init__(self, budget_mb: float = 256, mode: str = "fadvise"):
+        if mode not in ("fadvise", "read"):
+            raise ValueError(f"Modo de prefetch inválido: {mode} (opções: fadvise, read)")
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        # Sem posix_fadvise (Windows/macOS) o aquecimento é por leitura
+        self.mode = mode if hasattr(os, 'posix_fadvise') else "read"
+        self._resident: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes > 0
+
+    def schedule(self, path: str) -> None:
+        """Pede o aquecimento do arquivo (não bloqueia)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if path in self._resident:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="prefetch", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def _work(self) -> None:
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            try:
+                self._warm(path)
+            except OSError as e:
+                events.log_event("prefetch.error", "DEBUG", path=path, error=str(e))
+
+    def _warm(self, path: str) -> None:
+        size = os.path.getsize(path)
+        with self._lock:
+            if path in self._resident:
+                return
+            length = min(size, self.budget_bytes - sum(self._resident.values()))
+            if length <= 0:
+                events.log_event("prefetch.skipped", "DEBUG", path=path, reason="budget")
+                return
+            self._resident[path] = length
+
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            if self.mode == "fadvise":
+                os.posix_fadvise(f.fileno(), 0, length, os.POSIX_FADV_WILLNEED)
+            else:
+                remaining = length
+                while remaining > 0 and f.read(min(READ_BLOCK, remaining)):
+                    remaining -= READ_BLOCK
+        elapsed = time.perf_counter() - started
+
+        PREFETCH_BYTES.inc(length, mode=self.mode)
+        PREFETCH_DURATION.observe(elapsed, mode=self.mode)
+        self._update_gauge()
+        events.log_event(
+            "prefetch.warmed", "DEBUG", path=path, bytes=length, size=size,
+            mode=self.mode, seconds=round(elapsed, 3)
+        )
+
+    def consume(self, path: str) -> bool:
+        """Chamado no início do upload: libera o orçamento e diz se o arquivo foi aquecido"""
+        if not self.enabled:
+            return False
+        hit = self.release(path)
+        PREFETCH_RESULTS.inc(result="hit" if hit else "miss")
+        return hit
+
+    def release(self, path: str) -> bool:
+        """Devolve ao orçamento um arquivo aquecido que não vai mais ser enviado agora"""
+        with self._lock:
+            hit = self._resident.pop(path, None) is not None
+        self._update_gauge()
+        return hit
+
+    def _update_gauge(self) -> None:
+        with self._lock:
+            PREFETCH_RESIDENT.set(sum(self._resident.values()))
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
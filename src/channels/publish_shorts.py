@@ -1,29 +1,101 @@
 import os
-import glob
+import sys
 import json
 import requests
 import secrets
 import hashlib
 import base64
-from typing import List, Dict, Optional
+import mimetypes
+import threading
+import time
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
+from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 
+from src.channels.bandwidth import BandwidthLimiter, ThrottledReader
+from src.channels.chunking import ChunkSizer, plan_tiktok_chunks
+from src.channels.credentials import CredentialCache, save_token
+from src.channels.platforms import PlatformAdapter, get_platform
+from src.channels.quota import QuotaBudget, operation_cost
+from src.channels import resilience
+from src.channels.resilience import check_response
+from src.channels.thumbnails import DEFAULT_COVER_MS
+from src.observability import events, metrics
 
-@dataclass
+# Renova o token do TikTok alguns minutos antes de expirar
+TOKEN_EXPIRY_MARGIN = 300
+# Token sem validade registrada é reconferido na API neste intervalo
+TOKEN_RECHECK_SECONDS = 600
+
+
+def parse_video_name(filename: str) -> Tuple[str, Tuple[str, ...]]:
+    """Título e tags a partir do nome do arquivo ("Título #tag1 #tag2.mp4")"""
+    # Extrair título do nome do arquivo (remover extensão)
+    title = os.path.splitext(os.path.basename(filename))[0]
+    
+    # Extrair tags do título (palavras após #)
+    tags = ()
+    if '#' in title:
+        parts = title.split('#')
+        title = parts[0].strip()
+        tags = tuple(sys.intern(tag.strip()) for tag in parts[1:] if tag.strip())
+    return title, tags
+
+
+@dataclass(slots=True)
 class VideoFile:
-    """Representa um arquivo de vídeo com seus metadados"""
-    file_path: str
+    """Representa um arquivo de vídeo com seus metadados
+
+    Compacto para catálogos grandes: sem __dict__, diretório compartilhado
+    entre os vídeos do canal e tags como tupla de strings internadas.
+    """
+    directory: str
     filename: str
     title: str
     size_mb: float
     duration: Optional[int] = None  # em segundos
     resolution: Optional[str] = None
-    tags: List[str] = None
+    tags: Tuple[str, ...] = ()
+    modified_at: Optional[float] = None  # mtime do arquivo
+
+    @property
+    def file_path(self) -> str:
+        return os.path.join(self.directory, self.filename)
+
+    @classmethod
+    def from_path(cls, file_path: str, size_bytes: int, modified_at: Optional[float] = None,
+                  directory: Optional[str] = None) -> "VideoFile":
+        """Cria o vídeo a partir do caminho; título e tags vêm do nome do arquivo"""
+        filename = os.path.basename(file_path)
+        title, tags = parse_video_name(filename)
+        return cls(
+            directory=directory or os.path.dirname(file_path),
+            filename=filename,
+            title=title,
+            size_mb=round(size_bytes / (1024 * 1024), 2),
+            tags=tags,
+            modified_at=modified_at
+        )
+
+
+@dataclass(slots=True)
+class UploadResult:
+    """Resultado de um upload; como bool equivale ao sucesso (interface antiga)"""
+    success: bool
+    remote_id: Optional[str] = None  # ID do vídeo no YouTube ou publish_id do TikTok
+    size_bytes: int = 0
+    seconds: float = 0.0
+
+    def __bool__(self) -> bool:
+        return self.success
 
 
 @dataclass
@@ -36,6 +108,7 @@ class AuthConfig:
     token_file: str
     client_id: str = None  # Para YouTube
     client_key: str = None  # Para TikTok
+    account: str = "default"  # Nome da conta (várias contas por plataforma)
     
     def __post_init__(self):
         """Validação pós-inicialização"""
@@ -48,62 +121,91 @@ class AuthConfig:
 class PlatformAuth:
     """Gerencia autenticação para YouTube"""
     
-    def __init__(self, config_path: str = "auth_config.json"):
+    def __init__(self, config_path: str = "auth_config.json", interactive: bool = True):
         self.config_path = config_path
-        self.auth_configs = self._load_auth_configs()
+        # Sem modo interativo (CLI/daemon) nunca pedimos código no terminal
+        self.interactive = interactive
+        # plataforma -> conta -> configuração
+        self.accounts = self._load_auth_configs()
+        # Conta principal (primeira listada) de cada plataforma
+        self.auth_configs = {
+            platform: next(iter(accounts.values())) for platform, accounts in self.accounts.items()
+        }
+        # Credenciais em memória, compartilhadas pelos uploads paralelos
+        self._credentials = CredentialCache()
     
-    def _load_auth_configs(self) -> Dict[str, AuthConfig]:
-        """Carrega configurações de autenticação do arquivo JSON"""
+    def _load_auth_configs(self) -> Dict[str, Dict[str, AuthConfig]]:
+        """Carrega configurações de autenticação do arquivo JSON
+
+        Cada plataforma aceita um objeto (uma conta) ou uma lista de objetos
+        com o campo 'account' (várias contas, cada uma com seu token_file).
+        """
         if not os.path.exists(self.config_path):
             return {}
         
         with open(self.config_path, 'r') as f:
             configs = json.load(f)
         
-        auth_configs = {}
-        for platform, config in configs.items():
-            # Normalizar campos para diferentes plataformas
-            if platform == "youtube":
-                # YouTube usa client_id
-                if "client_id" not in config:
-                    raise ValueError("Configuração do YouTube deve ter 'client_id'")
-            elif platform == "tiktok":
-                # TikTok usa client_key
-                if "client_key" not in config:
-                    raise ValueError("Configuração do TikTok deve ter 'client_key'")
-                # Mapear client_key para client_id para compatibilidade
-                config["client_id"] = config.get("client_key")
-            
-            auth_configs[platform] = AuthConfig(**config)
+        accounts = {}
+        for platform, entries in configs.items():
+            if isinstance(entries, dict):
+                entries = [entries]
+            
+            for config in entries:
+                # Normalizar campos para diferentes plataformas
+                if platform == "youtube":
+                    # YouTube usa client_id
+                    if "client_id" not in config:
+                        raise ValueError("Configuração do YouTube deve ter 'client_id'")
+                elif platform == "tiktok":
+                    # TikTok usa client_key
+                    if "client_key" not in config:
+                        raise ValueError("Configuração do TikTok deve ter 'client_key'")
+                    # Mapear client_key para client_id para compatibilidade
+                    config["client_id"] = config.get("client_key")
+                
+                auth_config = AuthConfig(**config)
+                platform_accounts = accounts.setdefault(platform, {})
+                if auth_config.account in platform_accounts:
+                    raise ValueError(f"Conta duplicada para {platform}: {auth_config.account}")
+                platform_accounts[auth_config.account] = auth_config
         
-        return auth_configs
+        return accounts
+    
+    def list_accounts(self, platform: str) -> List[str]:
+        """Contas configuradas para a plataforma"""
+        return list(self.accounts.get(platform, {}))
     
-    def authenticate_youtube(self) -> bool:
+    def get_config(self, platform: str, account: Optional[str] = None) -> Optional[AuthConfig]:
+        """Configuração de uma conta (padrão: conta principal)"""
+        accounts = self.accounts.get(platform, {})
+        if account is None or (account == "default" and account not in accounts):
+            return self.auth_configs.get(platform)
+        return accounts.get(account)
+    
+    def authenticate_youtube(self, account: Optional[str] = None) -> bool:
         """Autentica com YouTube API"""
         try:
-            if 'youtube' not in self.auth_configs:
+            config = self.get_config('youtube', account)
+            if config is None:
                 print("❌ Configuração do YouTube não encontrada")
                 return False
             
-            config = self.auth_configs['youtube']
             token_file = config.token_file
             
-            # Verificar se já existe token válido
+            # Verificar se já existe token válido (renovando se preciso)
             if os.path.exists(token_file):
                 try:
-                    with open(token_file, 'r') as f:
-                        creds_data = json.load(f)
-                    
-                    # Verificar se é o formato correto
-                    if 'token' in creds_data and 'refresh_token' in creds_data:
-                        creds = Credentials.from_authorized_user_info(creds_data)
-                        
-                        if creds.valid:
-                            print("✅ Autenticação do YouTube válida")
-                            return True
+                    if self._youtube_credentials(config) is not None:
+                        print("✅ Autenticação do YouTube válida")
+                        return True
                 except Exception as e:
                     print(f"⚠️ Token inválido, fazendo nova autenticação: {e}")
             
+            if not self.interactive:
+                print("❌ Token do YouTube ausente ou inválido; autentique pelo modo interativo")
+                return False
+            
             # Fazer nova autenticação
             flow = InstalledAppFlow.from_client_secrets_file(
                 f"credentials_{config.platform}.json",
@@ -137,8 +239,8 @@ class PlatformAuth:
                 'scopes': creds.scopes
             }
             
-            with open(token_file, 'w') as f:
-                json.dump(token_data, f)
+            save_token(token_file, token_data)
+            self._credentials.invalidate(('youtube', config.account))
             
             print("✅ Autenticação do YouTube concluída")
             return True
@@ -147,29 +249,51 @@ class PlatformAuth:
             print(f"❌ Erro na autenticação do YouTube: {e}")
             return False
     
-    def get_youtube_service(self):
+    def get_youtube_service(self, account: Optional[str] = None):
         """Retorna serviço autenticado do YouTube"""
         try:
-            config = self.auth_configs['youtube']
-            token_file = config.token_file
-            
-            with open(token_file, 'r') as f:
-                creds_data = json.load(f)
-                
-            # Verificar se é o formato correto
-            if 'token' in creds_data and 'refresh_token' in creds_data:
-                # Formato correto do token
-                creds = Credentials.from_authorized_user_info(creds_data)
-            else:
-                # Formato incorreto, tentar recriar
-                print("⚠️ Formato de token incorreto, recriando...")
+            creds = self._youtube_credentials(self.get_config('youtube', account))
+            if creds is None:
                 return None
             
+            # Serviço por chamada (httplib2 não é thread-safe); credencial compartilhada
             return build('youtube', 'v3', credentials=creds)
         except Exception as e:
             print(f"❌ Erro ao obter serviço do YouTube: {e}")
             return None
     
+    def _youtube_credentials(self, config: AuthConfig) -> Optional[Credentials]:
+        """Credencial do YouTube vinda do cache, renovada uma única vez quando expira"""
+        def load(creds_data: Optional[Dict]) -> Optional[Credentials]:
+            if not creds_data:
+                return None
+            # Verificar se é o formato correto
+            if 'token' in creds_data and 'refresh_token' in creds_data:
+                return Credentials.from_authorized_user_info(creds_data)
+            print("⚠️ Formato de token incorreto, recriando...")
+            return None
+        
+        return self._credentials.get(
+            ('youtube', config.account), config.token_file, load,
+            is_fresh=lambda creds: creds.valid,
+            refresh=self._refresh_youtube_credentials,
+            dump=lambda creds: json.loads(creds.to_json())
+        )
+    
+    def _refresh_youtube_credentials(self, creds: Credentials) -> Optional[Credentials]:
+        """Renova o access token do YouTube usando o refresh_token"""
+        if not creds.refresh_token:
+            return None
+        try:
+            resilience.call('youtube.oauth', lambda: creds.refresh(GoogleRequest()))
+            metrics.AUTH_REFRESHES.inc(platform="youtube", outcome="success")
+            print("✅ Token do YouTube atualizado")
+            return creds
+        except Exception as e:
+            metrics.AUTH_REFRESHES.inc(platform="youtube", outcome="failure")
+            print(f"❌ Erro ao atualizar token do YouTube: {e}")
+            return None
+    
     def _generate_pkce(self) -> tuple[str, str]:
         """Gera code_verifier e code_challenge para PKCE"""
         # Gerar code_verifier (43-128 caracteres)
@@ -182,29 +306,29 @@ class PlatformAuth:
         
         return code_verifier, code_challenge
     
-    def authenticate_tiktok(self) -> bool:
+    def authenticate_tiktok(self, account: Optional[str] = None) -> bool:
         """Autentica com TikTok API usando Login Kit for Web"""
         try:
-            if 'tiktok' not in self.auth_configs:
+            config = self.get_config('tiktok', account)
+            if config is None:
                 print("❌ Configuração do TikTok não encontrada")
                 return False
             
-            config = self.auth_configs['tiktok']
             token_file = config.token_file
             
-            # Verificar se já existe token válido
+            # Verificar se já existe token válido (renovando se preciso)
             if os.path.exists(token_file):
                 try:
-                    with open(token_file, 'r') as f:
-                        token_data = json.load(f)
-                    
-                    # Verificar se o token ainda é válido
-                    if self._is_tiktok_token_valid(token_data):
+                    if self._tiktok_token(config) is not None:
                         print("✅ Autenticação do TikTok válida")
                         return True
                 except Exception as e:
                     print(f"⚠️ Token inválido, fazendo nova autenticação: {e}")
             
+            if not self.interactive:
+                print("❌ Token do TikTok ausente ou inválido; autentique pelo modo interativo")
+                return False
+            
             # Fazer nova autenticação
             print("🔗 Abrindo URL de autenticação do TikTok...")
             
@@ -234,8 +358,8 @@ class PlatformAuth:
                 return False
             
             # Salvar token
-            with open(token_file, 'w') as f:
-                json.dump(token_data, f)
+            save_token(token_file, self._stamp_expiry(token_data))
+            self._credentials.invalidate(('tiktok', config.account))
             
             print("✅ Autenticação do TikTok concluída")
             return True
@@ -252,10 +376,10 @@ class PlatformAuth:
                 'Authorization': f"Bearer {token_data['access_token']}"
             }
             
-            response = requests.get(
+            response = resilience.call('tiktok.user_info', lambda: check_response(requests.get(
                 'https://open.tiktokapis.com/v2/user/info/',
                 headers=headers
-            )
+            )))
             
             return response.status_code == 200
         except Exception:
@@ -280,7 +404,9 @@ class PlatformAuth:
                 'Cache-Control': 'no-cache'
             }
             
-            response = requests.post(url, data=data, headers=headers)
+            response = resilience.call(
+                'tiktok.oauth', lambda: check_response(requests.post(url, data=data, headers=headers))
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -292,28 +418,44 @@ class PlatformAuth:
             print(f"❌ Erro na requisição de token: {e}")
             return None
     
-    def get_tiktok_service(self):
+    def get_tiktok_service(self, account: Optional[str] = None):
         """Retorna dados de autenticação do TikTok"""
         try:
-            config = self.auth_configs['tiktok']
-            token_file = config.token_file
-            
-            with open(token_file, 'r') as f:
-                token_data = json.load(f)
-            
-            # Verificar se o token ainda é válido
-            if not self._is_tiktok_token_valid(token_data):
-                print("⚠️ Token do TikTok expirado, fazendo refresh...")
-                if not self._refresh_tiktok_token(token_data, config):
-                    return None
-            
-            return token_data
+            return self._tiktok_token(self.get_config('tiktok', account))
         except Exception as e:
             print(f"❌ Erro ao obter dados do TikTok: {e}")
             return None
     
-    def _refresh_tiktok_token(self, token_data: Dict, config: AuthConfig) -> bool:
-        """Atualiza token do TikTok usando refresh_token"""
+    def _tiktok_token(self, config: AuthConfig) -> Optional[Dict]:
+        """Token do TikTok vindo do cache, renovado uma única vez quando expira"""
+        return self._credentials.get(
+            ('tiktok', config.account), config.token_file,
+            load=lambda token_data: token_data or None,
+            is_fresh=self._is_tiktok_token_fresh,
+            refresh=lambda token_data: self._refresh_tiktok_token(token_data, config),
+            dump=lambda token_data: token_data
+        )
+    
+    def _is_tiktok_token_fresh(self, token_data: Dict) -> bool:
+        """Validade pelo expires_at gravado; tokens antigos são conferidos na API"""
+        expires_at = token_data.get('expires_at')
+        if expires_at is None:
+            if not self._is_tiktok_token_valid(token_data):
+                return False
+            token_data['expires_at'] = time.time() + TOKEN_RECHECK_SECONDS
+            return True
+        return time.time() < expires_at - TOKEN_EXPIRY_MARGIN
+    
+    @staticmethod
+    def _stamp_expiry(token_data: Dict) -> Dict:
+        """Registra quando o token expira (a API só informa expires_in)"""
+        if 'expires_in' in token_data:
+            token_data['expires_at'] = time.time() + int(token_data['expires_in'])
+        return token_data
+    
+    def _refresh_tiktok_token(self, token_data: Dict, config: AuthConfig) -> Optional[Dict]:
+        """Atualiza token do TikTok usando refresh_token; retorna o token novo"""
+        print("⚠️ Token do TikTok expirado, fazendo refresh...")
         try:
             url = 'https://open.tiktokapis.com/v2/oauth/token/'
             
@@ -329,81 +471,101 @@ class PlatformAuth:
                 'Cache-Control': 'no-cache'
             }
             
-            response = requests.post(url, data=data, headers=headers)
+            response = resilience.call(
+                'tiktok.oauth', lambda: check_response(requests.post(url, data=data, headers=headers))
+            )
             
             if response.status_code == 200:
-                new_token_data = response.json()
-                # Salvar novo token
-                with open(config.token_file, 'w') as f:
-                    json.dump(new_token_data, f)
+                # O cache grava o novo token no arquivo
+                new_token_data = self._stamp_expiry(response.json())
+                metrics.AUTH_REFRESHES.inc(platform="tiktok", outcome="success")
                 print("✅ Token do TikTok atualizado")
-                return True
+                return new_token_data
             else:
+                metrics.AUTH_REFRESHES.inc(platform="tiktok", outcome="failure")
                 print(f"❌ Erro ao atualizar token: {response.text}")
-                return False
+                return None
                 
         except Exception as e:
+            metrics.AUTH_REFRESHES.inc(platform="tiktok", outcome="failure")
             print(f"❌ Erro ao atualizar token: {e}")
-            return False
+            return None
 
 
 class PublishShorts:
     """Classe para gerenciar o envio de vídeos shorts"""
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, network_profile: str = "default", quota: Optional[QuotaBudget] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 platform_concurrency: Optional[Dict[str, int]] = None):
         self.base_path = Path(base_path)
         self.supported_formats = ['.mp4', '.mov', '.avi', '.mkv']
+        self.network_profile = network_profile
+        self.chunk_sizer = ChunkSizer(self.base_path / 'chunk_profiles.json')
+        self.quota = quota or QuotaBudget(self.base_path / 'quota.db')
+        # Limite de banda compartilhado por todos os uploads (None = sem limite)
+        self.bandwidth = bandwidth
+        # Acompanhamento do processamento no TikTok (definido pelo gerenciador)
+        self.status_tracker = None
+        # Progresso dos uploads em chunks, para retomar após queda (definido pelo gerenciador)
+        self.checkpoints = None
+        # Chamadas após o upload no YouTube, enviadas em lote (definido pelo gerenciador)
+        self.youtube_batch = None
+        self.youtube_playlists: List[str] = []
+        # Escolha do quadro de capa/miniatura (definido pelo gerenciador; None = capa padrão)
+        self.thumbnails = None
+        # Adaptadores e executores por plataforma (limite sobrescrevível na configuração)
+        self.platform_concurrency = platform_concurrency or {}
+        self._adapters: Dict[str, PlatformAdapter] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._adapters_lock = threading.Lock()
+        # ID remoto do upload em curso; cada upload roda inteiro numa thread do executor
+        self._receipt = threading.local()
         
     def get_video_files(self, channel_name: str) -> List[VideoFile]:
         """Obtém lista de arquivos de vídeo de um canal específico"""
+        video_files = list(self.iter_video_files(channel_name))
+        print(f"📁 Encontrados {len(video_files)} vídeos em {channel_name}")
+        return video_files
+    
+    def iter_video_files(self, channel_name: str) -> Iterator[VideoFile]:
+        """Percorre os vídeos do canal sem montar a lista inteira (os.scandir)"""
         channel_path = self.base_path / channel_name
         
         if not channel_path.exists():
             print(f"❌ Diretório do canal não encontrado: {channel_path}")
-            return []
-        
-        video_files = []
+            return
         
-        # Buscar todos os arquivos de vídeo
-        for format_ext in self.supported_formats:
-            pattern = str(channel_path / f"*{format_ext}")
-            files = glob.glob(pattern)
-            
-            for file_path in files:
+        directory = sys.intern(str(channel_path))
+        formats = tuple(self.supported_formats)
+        with os.scandir(channel_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(formats):
+                    continue
                 try:
-                    file_info = self._get_video_info(file_path)
-                    video_files.append(file_info)
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    yield VideoFile.from_path(entry.path, stat.st_size, stat.st_mtime, directory)
                 except Exception as e:
-                    print(f"⚠️ Erro ao processar {file_path}: {e}")
-        
-        print(f"📁 Encontrados {len(video_files)} vídeos em {channel_name}")
-        return video_files
+                    print(f"⚠️ Erro ao processar {entry.path}: {e}")
+    
+    def iter_video_pages(self, channel_name: str, page_size: int = 1000) -> Iterator[List[VideoFile]]:
+        """Percorre os vídeos do canal em páginas de até page_size itens"""
+        page = []
+        for video in self.iter_video_files(channel_name):
+            page.append(video)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
     
     def _get_video_info(self, file_path: str) -> VideoFile:
         """Extrai informações de um arquivo de vídeo"""
-        path_obj = Path(file_path)
-        
-        # Obter tamanho do arquivo
-        size_bytes = path_obj.stat().st_size
-        size_mb = size_bytes / (1024 * 1024)
-        
-        # Extrair título do nome do arquivo (remover extensão)
-        title = path_obj.stem
-        
-        # Extrair tags do título (palavras após #)
-        tags = []
-        if '#' in title:
-            parts = title.split('#')
-            title = parts[0].strip()
-            tags = [tag.strip() for tag in parts[1:] if tag.strip()]
-        
-        return VideoFile(
-            file_path=file_path,
-            filename=path_obj.name,
-            title=title,
-            size_mb=round(size_mb, 2),
-            tags=tags
-        )
+        # Obter tamanho e data de modificação do arquivo
+        stat = os.stat(file_path)
+        return VideoFile.from_path(file_path, stat.st_size, stat.st_mtime)
     
     def list_videos(self, channel_name: str) -> None:
         """Lista todos os vídeos de um canal"""
@@ -426,24 +588,31 @@ class PublishShorts:
     
     def get_video_by_name(self, channel_name: str, video_name: str) -> Optional[VideoFile]:
         """Busca um vídeo específico pelo nome"""
-        videos = self.get_video_files(channel_name)
-        
-        for video in videos:
+        for video in self.iter_video_files(channel_name):
             if video_name.lower() in video.title.lower() or video_name.lower() in video.filename.lower():
                 return video
         
         return None
     
-    def prepare_for_upload(self, video: VideoFile, platform: str = "youtube") -> Dict:
-        """Prepara metadados para upload no YouTube"""
+    def prepare_for_upload(self, video: VideoFile, platform: str = "youtube",
+                           publish_at: Optional[datetime] = None) -> Dict:
+        """Prepara metadados para upload no YouTube (publish_at agenda a publicação)"""
         metadata = {
             "title": video.title,
             "description": self._generate_description(video),
-            "tags": video.tags or [],
+            "tags": list(video.tags),
             "file_path": video.file_path,
-            "platform": platform
+            "platform": platform,
+            "cover_timestamp_ms": DEFAULT_COVER_MS
         }
         
+        # Quadro de capa: miniatura no YouTube, video_cover_timestamp_ms no TikTok
+        if self.thumbnails is not None:
+            thumbnail = self.thumbnails.choose(video.file_path)
+            if thumbnail is not None:
+                metadata["cover_timestamp_ms"] = thumbnail.timestamp_ms
+                metadata["thumbnail_path"] = thumbnail.image_path
+        
         # Configurações específicas do YouTube
         metadata.update({
             "category": "Education",  # Categoria padrão para shorts educativos
@@ -451,6 +620,13 @@ class PublishShorts:
             "shorts": True
         })
         
+        # Upload antecipado: fica privado até o horário agendado
+        if publish_at is not None:
+            metadata.update({
+                "privacy": "private",
+                "publish_at": publish_at.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            })
+        
         return metadata
     
     def _generate_description(self, video: VideoFile) -> str:
@@ -481,15 +657,12 @@ class PublishShorts:
     
     def get_upload_summary(self, channel_name: str) -> Dict:
         """Gera resumo dos vídeos prontos para upload"""
-        videos = self.get_video_files(channel_name)
-        
-        if not videos:
-            return {"total": 0, "ready": 0, "issues": []}
-        
+        total = 0
         ready_count = 0
         issues = []
         
-        for video in videos:
+        for video in self.iter_video_files(channel_name):
+            total += 1
             validation = self.validate_video(video)
             if validation["ready_for_upload"]:
                 ready_count += 1
@@ -499,22 +672,27 @@ class PublishShorts:
                     "problems": [k for k, v in validation.items() if not v and k != "ready_for_upload"]
                 })
         
+        if not total:
+            return {"total": 0, "ready": 0, "issues": []}
+        
         return {
-            "total": len(videos),
+            "total": total,
             "ready": ready_count,
             "issues": issues,
-            "ready_percentage": round((ready_count / len(videos)) * 100, 1)
+            "ready_percentage": round((ready_count / total) * 100, 1)
         }
     
-    def upload_to_youtube(self, video: VideoFile, auth: PlatformAuth) -> bool:
-        """Faz upload de vídeo para YouTube"""
+    def upload_to_youtube(self, video: VideoFile, auth: PlatformAuth, account: Optional[str] = None,
+                          publish_at: Optional[datetime] = None) -> bool:
+        """Faz upload de vídeo para YouTube (com publish_at, como publicação agendada)"""
+        account = account or "default"
         try:
-            service = auth.get_youtube_service()
+            service = auth.get_youtube_service(account)
             if not service:
                 return False
             
             # Preparar metadados
-            metadata = self.prepare_for_upload(video, "youtube")
+            metadata = self.prepare_for_upload(video, "youtube", publish_at)
             
             # Criar body da requisição
             body = {
@@ -525,17 +703,16 @@ class PublishShorts:
                     'categoryId': '22'  # People & Blogs
                 },
                 'status': {
-                    'privacyStatus': 'public',
+                    'privacyStatus': metadata['privacy'],
                     'selfDeclaredMadeForKids': False
                 }
             }
+            if metadata.get('publish_at'):
+                body['status']['publishAt'] = metadata['publish_at']
+                print(f"🗓️ Publicação agendada para {metadata['publish_at']}")
             
             # Fazer upload
-            media = MediaFileUpload(
-                video.file_path,
-                chunksize=-1,
-                resumable=True
-            )
+            media = self._youtube_media(video)
             
             print(f"📤 Fazendo upload para YouTube: {video.title}")
             
@@ -545,30 +722,99 @@ class PublishShorts:
                 media_body=media
             )
             
-            response = request.execute()
+            # A quota é consumida pela tentativa, mesmo que falhe
+            self.quota.charge('youtube', 'videos.insert', account)
+            try:
+                # Upload resumível: uma nova tentativa continua de onde parou
+                response = resilience.call('youtube.videos.insert', request.execute)
+            finally:
+                if self.bandwidth is not None:
+                    media.stream().close()
             
             if response:
                 video_id = response['id']
                 print(f"✅ Upload concluído! ID: {video_id}")
+                events.log_event("youtube.inserted", video_id=video_id, filename=video.filename)
+                self._receipt.remote_id = video_id
                 print(f"🔗 Link: https://www.youtube.com/watch?v={video_id}")
+                if metadata.get('thumbnail_path'):
+                    self._set_youtube_thumbnail(service, account, video_id, metadata['thumbnail_path'])
+                self._queue_youtube_followups(video, account, video_id)
                 return True
             
             return False
             
         except Exception as e:
             print(f"❌ Erro no upload para YouTube: {e}")
+            events.log_event("youtube.error", "ERROR", filename=video.filename, error=str(e))
+            return False
+    
+    def _set_youtube_thumbnail(self, service, account: str, video_id: str, image_path: str) -> bool:
+        """Envia a miniatura escolhida (upload de mídia: não vai para a fila em lote)"""
+        if not self.quota.can_afford('youtube', account, operation_cost('youtube', 'thumbnails.set')):
+            print("⛽ Sem quota para a miniatura; fica a gerada pelo YouTube")
             return False
+        try:
+            request = service.thumbnails().set(
+                videoId=video_id,
+                media_body=MediaFileUpload(image_path, mimetype='image/jpeg')
+            )
+            self.quota.charge('youtube', 'thumbnails.set', account)
+            resilience.call('youtube.thumbnails.set', request.execute)
+        except Exception as e:
+            # O vídeo já foi enviado; canais sem verificação recebem 403 aqui
+            print(f"⚠️ Miniatura não definida: {e}")
+            events.log_event("youtube.thumbnail_failed", "WARNING", video_id=video_id, error=str(e))
+            return False
+        print("🖼️ Miniatura personalizada definida")
+        events.log_event("youtube.thumbnail_set", video_id=video_id)
+        return True
+    
+    def _queue_youtube_followups(self, video: VideoFile, account: str, video_id: str) -> None:
+        """Adia as chamadas posteriores ao upload (playlists) para a fila em lote"""
+        if self.youtube_batch is None:
+            return
+        for playlist_id in self.youtube_playlists:
+            self.youtube_batch.enqueue(
+                account, 'playlistItems.insert',
+                {
+                    'part': 'snippet',
+                    'body': {'snippet': {
+                        'playlistId': playlist_id,
+                        'resourceId': {'kind': 'youtube#video', 'videoId': video_id}
+                    }}
+                },
+                video.filename, video_id
+            )
     
-    def upload_to_tiktok(self, video: VideoFile, auth: PlatformAuth) -> bool:
+    def _youtube_media(self, video: VideoFile):
+        """Corpo do upload; com limite de banda o arquivo é lido de forma controlada"""
+        if self.bandwidth is None:
+            return MediaFileUpload(
+                video.file_path,
+                chunksize=-1,
+                resumable=True
+            )
+        
+        mimetype = mimetypes.guess_type(video.file_path)[0] or 'application/octet-stream'
+        return MediaIoBaseUpload(
+            ThrottledReader(open(video.file_path, 'rb'), self.bandwidth),
+            mimetype,
+            chunksize=-1,
+            resumable=True
+        )
+    
+    def upload_to_tiktok(self, video: VideoFile, auth: PlatformAuth, account: Optional[str] = None) -> bool:
         """Faz upload de vídeo para TikTok usando Content Posting API"""
+        account = account or "default"
         try:
-            token_data = auth.get_tiktok_service()
+            token_data = auth.get_tiktok_service(account)
             if not token_data:
                 return False
             
             # 1. Primeiro, obter informações do criador
             print("🔍 Obtendo informações do criador...")
-            creator_info = self._query_creator_info(token_data)
+            creator_info = self._query_creator_info(token_data, account)
             if not creator_info:
                 print("❌ Falha ao obter informações do criador")
                 return False
@@ -579,10 +825,12 @@ class PublishShorts:
             # 2. Preparar metadados
             metadata = self.prepare_for_upload(video, "tiktok")
             
-            # 3. Calcular chunks para upload
-            video_size_bytes = int(video.size_mb * 1024 * 1024)
-            chunk_size = 10000000  # 10MB chunks
-            total_chunks = (video_size_bytes + chunk_size - 1) // chunk_size
+            # 3. Calcular chunks para upload (tamanho adaptado à vazão medida)
+            video_size_bytes = os.path.getsize(video.file_path)
+            chunk_key = self.chunk_sizer.profile_key(account, self.network_profile)
+            chunk_size, total_chunks = plan_tiktok_chunks(
+                video_size_bytes, self.chunk_sizer.chunk_size(chunk_key)
+            )
             
             # 4. Preparar dados do vídeo
             video_data = {
@@ -592,7 +840,7 @@ class PublishShorts:
                     'disable_duet': False,
                     'disable_comment': False,
                     'disable_stitch': False,
-                    'video_cover_timestamp_ms': 1000
+                    'video_cover_timestamp_ms': metadata['cover_timestamp_ms']
                 },
                 'source_info': {
                     'source': 'FILE_UPLOAD',
@@ -606,7 +854,9 @@ class PublishShorts:
             print(f"📊 Tamanho: {video.size_mb}MB, Chunks: {total_chunks}")
             
             # 5. Fazer upload do vídeo
-            upload_result = self._upload_video_to_tiktok(video, token_data, video_data)
+            upload_result = self._upload_video_to_tiktok(video, token_data, video_data, account)
+            next_chunk_size = self.chunk_sizer.finish_upload(chunk_key)
+            events.log_event("tiktok.chunk_size", "DEBUG", profile=chunk_key, next_chunk_size=next_chunk_size)
             
             if upload_result:
                 print("✅ Upload para TikTok concluído!")
@@ -616,9 +866,10 @@ class PublishShorts:
             
         except Exception as e:
             print(f"❌ Erro no upload para TikTok: {e}")
+            events.log_event("tiktok.error", "ERROR", filename=video.filename, error=str(e))
             return False
     
-    def _query_creator_info(self, token_data: Dict) -> Optional[Dict]:
+    def _query_creator_info(self, token_data: Dict, account: str = "default") -> Optional[Dict]:
         """Obtém informações do criador TikTok"""
         try:
             url = 'https://open.tiktokapis.com/v2/post/publish/creator_info/query/'
@@ -628,7 +879,11 @@ class PublishShorts:
                 'Content-Type': 'application/json; charset=UTF-8'
             }
             
-            response = requests.post(url, headers=headers)
+            def query():
+                self.quota.acquire_rate('tiktok.creator_info', account)
+                return check_response(requests.post(url, headers=headers))
+            
+            response = resilience.call('tiktok.creator_info', query)
             
             if response.status_code == 200:
                 result = response.json()
@@ -645,37 +900,76 @@ class PublishShorts:
             print(f"❌ Erro ao obter informações do criador: {e}")
             return None
     
-    def _upload_video_to_tiktok(self, video: VideoFile, token_data: Dict, video_data: Dict) -> bool:
+    def _upload_video_to_tiktok(self, video: VideoFile, token_data: Dict, video_data: Dict,
+                                account: str = "default") -> bool:
         """Faz o upload real do vídeo para TikTok usando chunks"""
         try:
-            # 1. Inicializar upload
-            print("🚀 Inicializando upload...")
-            init_result = self._init_tiktok_upload(token_data, video_data)
-            if not init_result:
-                return False
-            
-            upload_url = init_result.get('upload_url')
-            publish_id = init_result.get('publish_id')
-            
-            if not upload_url or not publish_id:
-                print("❌ Falha ao obter URL de upload ou publish_id")
-                return False
+            source_info = video_data['source_info']
+            checkpoint = None
+            if self.checkpoints is not None:
+                checkpoint = self.checkpoints.resume(
+                    video.filename, 'tiktok', account, source_info['video_size'], video.modified_at
+                )
+            
+            if checkpoint:
+                # Upload interrompido: mesma sessão, a partir do primeiro chunk não confirmado
+                upload_url = checkpoint['upload_url']
+                publish_id = checkpoint['publish_id']
+                first_chunk = checkpoint['next_chunk']
+                source_info['chunk_size'] = checkpoint['chunk_size']
+                source_info['total_chunk_count'] = checkpoint['total_chunks']
+                print(f"♻️ Retomando upload no chunk {first_chunk + 1}/{checkpoint['total_chunks']}")
+                events.log_event(
+                    "tiktok.resumed", publish_id=publish_id, filename=video.filename, next_chunk=first_chunk
+                )
+            else:
+                # 1. Inicializar upload
+                print("🚀 Inicializando upload...")
+                init_result = self._init_tiktok_upload(token_data, video_data, account)
+                if not init_result:
+                    return False
+                
+                upload_url = init_result.get('upload_url')
+                publish_id = init_result.get('publish_id')
+                
+                if not upload_url or not publish_id:
+                    print("❌ Falha ao obter URL de upload ou publish_id")
+                    return False
+                events.log_event("tiktok.initialized", publish_id=publish_id, filename=video.filename)
+                first_chunk = 0
+                if self.checkpoints is not None:
+                    self.checkpoints.save(
+                        video.filename, 'tiktok', account, publish_id, upload_url, source_info['video_size'],
+                        video.modified_at, source_info['chunk_size'], source_info['total_chunk_count']
+                    )
+            self._receipt.remote_id = publish_id
             
             # 2. Fazer upload em chunks
             print("📤 Fazendo upload em chunks...")
-            upload_success = self._upload_video_chunks(video, upload_url, video_data)
+            checkpoints = self.checkpoints
+            upload_success = self._upload_video_chunks(
+                video, upload_url, video_data, account, first_chunk=first_chunk,
+                on_chunk=(lambda next_chunk: checkpoints.advance(video.filename, next_chunk)) if checkpoints else None
+            )
             if not upload_success:
                 return False
             
             # 3. Finalizar upload
             print("✅ Finalizando upload...")
-            return self._finalize_tiktok_upload(token_data, publish_id)
+            finalized = self._finalize_tiktok_upload(token_data, publish_id)
+            if self.checkpoints is not None:
+                self.checkpoints.clear(video.filename)
+            if not finalized:
+                return False
+            if self.status_tracker is not None:
+                self.status_tracker.track(publish_id, video.filename, account)
+            return True
                     
         except Exception as e:
             print(f"❌ Erro no upload do vídeo: {e}")
             return False
     
-    def _init_tiktok_upload(self, token_data: Dict, video_data: Dict) -> Optional[Dict]:
+    def _init_tiktok_upload(self, token_data: Dict, video_data: Dict, account: str = "default") -> Optional[Dict]:
         """Inicializa upload no TikTok"""
         try:
             url = 'https://open.tiktokapis.com/v2/post/publish/video/init/'
@@ -685,7 +979,12 @@ class PublishShorts:
                 'Content-Type': 'application/json; charset=UTF-8'
             }
             
-            response = requests.post(url, json=video_data, headers=headers)
+            def init():
+                self.quota.acquire_rate('tiktok.init', account)
+                return check_response(requests.post(url, json=video_data, headers=headers))
+            
+            self.quota.charge('tiktok', 'video.init', account)
+            response = resilience.call('tiktok.init', init)
             
             if response.status_code == 200:
                 result = response.json()
@@ -702,36 +1001,72 @@ class PublishShorts:
             print(f"❌ Erro ao inicializar upload: {e}")
             return None
     
-    def _upload_video_chunks(self, video: VideoFile, upload_url: str, video_data: Dict) -> bool:
-        """Faz upload do vídeo em chunks"""
+    def _upload_video_chunks(self, video: VideoFile, upload_url: str, video_data: Dict,
+                             account: str = "default", first_chunk: int = 0,
+                             on_chunk: Optional[Callable[[int], None]] = None) -> bool:
+        """Faz upload do vídeo em chunks (o último chunk leva o restante do arquivo)
+
+        first_chunk retoma um envio interrompido; on_chunk recebe o índice do
+        próximo chunk a cada chunk confirmado.
+        """
         try:
             chunk_size = video_data['source_info']['chunk_size']
             total_chunks = video_data['source_info']['total_chunk_count']
+            video_size = video_data['source_info']['video_size']
+            chunk_key = self.chunk_sizer.profile_key(account, self.network_profile)
             
             with open(video.file_path, 'rb') as video_file:
-                for chunk_index in range(total_chunks):
+                video_file.seek(first_chunk * chunk_size)
+                for chunk_index in range(first_chunk, total_chunks):
                     print(f"📤 Enviando chunk {chunk_index + 1}/{total_chunks}")
                     
                     # Ler chunk
-                    chunk_data = video_file.read(chunk_size)
+                    start = chunk_index * chunk_size
+                    if chunk_index == total_chunks - 1:
+                        chunk_data = video_file.read(video_size - start)
+                    else:
+                        chunk_data = video_file.read(chunk_size)
                     if not chunk_data:
                         break
                     
                     # Preparar headers para upload
                     headers = {
                         'Content-Type': 'application/octet-stream',
-                        'Content-Range': f'bytes {chunk_index * chunk_size}-{chunk_index * chunk_size + len(chunk_data) - 1}/*'
+                        'Content-Range': f'bytes {start}-{start + len(chunk_data) - 1}/{video_size}'
                     }
                     
-                    # Fazer upload do chunk
-                    response = requests.put(upload_url, data=chunk_data, headers=headers)
+                    # Fazer upload do chunk (falhas passageiras reenviam só este chunk)
+                    def send_chunk():
+                        started = time.perf_counter()
+                        body = ThrottledReader(chunk_data, self.bandwidth) if self.bandwidth else chunk_data
+                        response = requests.put(upload_url, data=body, headers=headers)
+                        elapsed = time.perf_counter() - started
+                        metrics.CHUNK_PUT_LATENCY.observe(elapsed, platform="tiktok")
+                        ok = response.status_code in [200, 201, 206]
+                        self.chunk_sizer.record_chunk(chunk_key, len(chunk_data), elapsed, ok)
+                        return check_response(response), elapsed
+                    
+                    response, elapsed = resilience.call('tiktok.chunk', send_chunk)
                     
                     if response.status_code not in [200, 201, 206]:
                         print(f"❌ Erro no upload do chunk {chunk_index + 1}: {response.status_code}")
                         print(f"   Resposta: {response.text}")
+                        events.log_event(
+                            "chunk.failed", "ERROR", platform="tiktok", chunk=chunk_index + 1,
+                            status=response.status_code
+                        )
+                        if self.checkpoints is not None:
+                            # Sessão recusada pelo servidor: não há o que retomar
+                            self.checkpoints.clear(video.filename)
                         return False
                     
                     print(f"✅ Chunk {chunk_index + 1} enviado com sucesso")
+                    if on_chunk is not None:
+                        on_chunk(chunk_index + 1)
+                    events.log_event(
+                        "chunk.sent", "DEBUG", platform="tiktok", chunk=chunk_index + 1,
+                        total_chunks=total_chunks, bytes=len(chunk_data), seconds=round(elapsed, 3)
+                    )
             
             return True
                     
@@ -753,12 +1088,15 @@ class PublishShorts:
                 'publish_id': publish_id
             }
             
-            response = requests.post(url, json=data, headers=headers)
+            response = resilience.call(
+                'tiktok.publish', lambda: check_response(requests.post(url, json=data, headers=headers))
+            )
             
             if response.status_code == 200:
                 result = response.json()
                 if result.get('error', {}).get('code') == 'ok':
                     print("✅ Vídeo publicado com sucesso no TikTok!")
+                    events.log_event("tiktok.published", publish_id=publish_id)
                     return True
                 else:
                     print(f"❌ Erro na finalização: {result.get('error', {}).get('message', 'Erro desconhecido')}")
@@ -771,12 +1109,73 @@ class PublishShorts:
             print(f"❌ Erro ao finalizar upload: {e}")
             return False
     
-    def upload_video(self, video: VideoFile, platform: str, auth: PlatformAuth) -> bool:
+    def adapter(self, platform: str) -> PlatformAdapter:
+        """Adaptador da plataforma (criado na primeira utilização)"""
+        with self._adapters_lock:
+            adapter = self._adapters.get(platform)
+            if adapter is None:
+                adapter = get_platform(platform)(self)
+                workers = max(1, self.platform_concurrency.get(platform, adapter.max_concurrency))
+                self._adapters[platform] = adapter
+                self._executors[platform] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"upload-{platform}"
+                )
+                self.platform_concurrency[platform] = workers
+            return adapter
+    
+    def submit_upload(self, video: VideoFile, platform: str, auth: PlatformAuth,
+                      account: Optional[str] = None, publish_at: Optional[datetime] = None) -> Future:
+        """Agenda o upload no executor da plataforma"""
+        adapter = self.adapter(platform)
+        # Mantém correlation id e spans do chamador na thread do executor
+        context = contextvars.copy_context()
+        return self._executors[platform].submit(
+            context.run, self._run_upload, adapter, video, auth, account, publish_at
+        )
+    
+    def _run_upload(self, adapter: PlatformAdapter, video: VideoFile, auth: PlatformAuth,
+                    account: Optional[str], publish_at: Optional[datetime]) -> UploadResult:
+        self._receipt.remote_id = None
+        started = time.perf_counter()
+        success = adapter.upload(video, auth, account, publish_at)
+        adapter.finalize(video, account, success)
+        elapsed = time.perf_counter() - started
+        self._record_upload_metrics(video, adapter.name, success, elapsed)
+        return UploadResult(
+            success=bool(success),
+            remote_id=self._receipt.remote_id,
+            size_bytes=round(video.size_mb * 1024 * 1024),
+            seconds=elapsed
+        )
+    
+    def upload_video(self, video: VideoFile, platform: str, auth: PlatformAuth,
+                     account: Optional[str] = None, publish_at: Optional[datetime] = None) -> UploadResult:
         """Faz upload de vídeo para a plataforma especificada"""
-        if platform == "youtube":
-            return self.upload_to_youtube(video, auth)
-        elif platform == "tiktok":
-            return self.upload_to_tiktok(video, auth)
-        else:
-            print(f"❌ Plataforma não suportada: {platform}")
-            return False
\ No newline at end of file
+        try:
+            future = self.submit_upload(video, platform, auth, account, publish_at)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return UploadResult(success=False)
+        return future.result()
+    
+    def platform_status(self, platform: str) -> Dict:
+        """Limite de uploads simultâneos e estado próprio da plataforma"""
+        adapter = self.adapter(platform)
+        return {'max_concurrency': self.platform_concurrency[platform], **adapter.status()}
+    
+    def shutdown(self) -> None:
+        """Encerra os executores das plataformas"""
+        with self._adapters_lock:
+            executors = list(self._executors.values())
+        for executor in executors:
+            executor.shutdown(wait=True)
+    
+    def _record_upload_metrics(self, video: VideoFile, platform: str, success: bool, elapsed: float):
+        """Registra duração, vazão e resultado de um upload"""
+        metrics.UPLOADS.inc(platform=platform, outcome="success" if success else "failure")
+        if not success:
+            return
+        metrics.UPLOAD_DURATION.observe(elapsed, platform=platform)
+        if elapsed > 0:
+            size_bytes = video.size_mb * 1024 * 1024
+            metrics.UPLOAD_THROUGHPUT.observe(size_bytes / elapsed, platform=platform)
\ No newline at end of file
@@ -0,0 +1,239 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from src.channels import resilience
+from src.channels.resilience import check_response
+from src.observability import events, metrics
+
+
+STATUS_URL = 'https://open.tiktokapis.com/v2/post/publish/status/fetch/'
+
+# Estados finais da Content Posting API
+FINAL_STATES = {'PUBLISH_COMPLETE': 'published', 'FAILED': 'failed'}
+
+PUBLISH_OUTCOMES = metrics.REGISTRY.counter(
+    "tiktok_publish_outcomes_total",
+    "Estado final das publicações do TikTok acompanhadas",
+    ("state",)
+)
+PENDING_PUBLISHES = metrics.REGISTRY.gauge(
+    "tiktok_pending_publishes",
+    "Publicações do TikTok aguardando processamento"
+)
+
+
+class PublishStatusTracker:
+    """Acompanha em segundo plano o processamento das publicações do TikTok
+
+    Os publish_id pendentes ficam no banco de uploads (SQLite) e são
+    consultados em lote a cada ciclo, respeitando o limite de taxa do
+    endpoint de status. Só a recusa explícita do TikTok (FAILED) chama
+    on_failed para recolocar o vídeo na fila; uma publicação sem resposta
+    final depois de max_age_seconds vira 'stale' e gera alerta, mas não volta
+    à fila (pode ter sido publicada e recolocar duplicaria o vídeo).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        auth,
+        quota,
+        on_failed: Optional[Callable[[str, str], None]] = None,
+        poll_interval: float = 30.0,
+        max_age_seconds: float = 6 * 3600
+    ):
+        self.db_path = str(db_path)
+        self.auth = auth
+        self.quota = quota
+        self.on_failed = on_failed
+        self.poll_interval = poll_interval
+        self.max_age_seconds = max_age_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tiktok_publishes (
+                publish_id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                account TEXT NOT NULL,
+                state TEXT NOT NULL,
+                remote_status TEXT,
+                fail_reason TEXT,
+                post_id TEXT,
+                polls INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_publishes_state ON tiktok_publishes (state)")
+        # Contador em memória para o status; o banco só é contado aqui, na partida
+        self._count_lock = threading.Lock()
+        self._pending_count = conn.execute(
+            "SELECT COUNT(*) FROM tiktok_publishes WHERE state = 'pending'"
+        ).fetchone()[0]
+        PENDING_PUBLISHES.set(self._pending_count)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def track(self, publish_id: str, filename: str, account: str = "default") -> None:
+        """Registra uma publicação para acompanhamento"""
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT OR IGNORE INTO tiktok_publishes "
+            "(publish_id, filename, account, state, created_at, updated_at) VALUES (?, ?, ?, 'pending', ?, ?)",
+            (publish_id, filename, account, now, now)
+        )
+        if cursor.rowcount == 1:
+            self._adjust_pending(1)
+        events.log_event("tiktok.tracking", publish_id=publish_id, filename=filename, account=account)
+
+    def _adjust_pending(self, delta: int) -> None:
+        with self._count_lock:
+            self._pending_count = max(0, self._pending_count + delta)
+            PENDING_PUBLISHES.set(self._pending_count)
+
+    def pending_count(self) -> int:
+        """Publicações aguardando processamento (sem consultar o banco)"""
+        with self._count_lock:
+            return self._pending_count
+
+    def pending(self) -> List[Dict]:
+        rows = self._connection().execute(
+            "SELECT publish_id, filename, account, created_at FROM tiktok_publishes "
+            "WHERE state = 'pending' ORDER BY updated_at"
+        ).fetchall()
+        return [
+            {'publish_id': row[0], 'filename': row[1], 'account': row[2], 'created_at': row[3]}
+            for row in rows
+        ]
+
+    def get(self, publish_id: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT publish_id, filename, account, state, remote_status, fail_reason, post_id "
+            "FROM tiktok_publishes WHERE publish_id = ?", (publish_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('publish_id', 'filename', 'account', 'state', 'remote_status', 'fail_reason', 'post_id')
+        return dict(zip(keys, row))
+
+    def _fetch_status(self, publish_id: str, token_data: Dict, account: str) -> Optional[Dict]:
+        """Consulta o status de uma publicação"""
+        try:
+            headers = {
+                'Authorization': f"Bearer {token_data['access_token']}",
+                'Content-Type': 'application/json; charset=UTF-8'
+            }
+            
+            def fetch():
+                self.quota.acquire_rate('tiktok.status', account)
+                return check_response(requests.post(STATUS_URL, json={'publish_id': publish_id}, headers=headers))
+            
+            response = resilience.call('tiktok.status', fetch)
+            if response.status_code != 200:
+                print(f"⚠️ Erro HTTP {response.status_code} ao consultar publicação {publish_id}")
+                return None
+            result = response.json()
+            if result.get('error', {}).get('code') != 'ok':
+                print(f"⚠️ Erro na API de status: {result.get('error', {}).get('message', 'Erro desconhecido')}")
+                return None
+            return result.get('data', {})
+        except Exception as e:
+            print(f"⚠️ Erro ao consultar publicação {publish_id}: {e}")
+            return None
+
+    def poll_once(self) -> Dict[str, int]:
+        """Consulta todas as publicações pendentes (um token por conta)"""
+        outstanding = self.pending()
+        summary = {'checked': 0, 'published': 0, 'failed': 0, 'stale': 0}
+        tokens: Dict[str, Optional[Dict]] = {}
+
+        for item in outstanding:
+            if self._stop.is_set():
+                break
+            account = item['account']
+            if account not in tokens:
+                tokens[account] = self.auth.get_tiktok_service(account)
+            token_data = tokens[account]
+            if not token_data:
+                continue
+
+            if resilience.RESILIENCE.open_circuits('tiktok.status'):
+                # Endpoint fora do ar: o restante fica para o próximo ciclo
+                break
+            data = self._fetch_status(item['publish_id'], token_data, account)
+            summary['checked'] += 1
+            now = time.time()
+            if data is None:
+                continue
+
+            remote_status = data.get('status')
+            state = FINAL_STATES.get(remote_status, 'pending')
+            if state == 'pending' and now - item['created_at'] > self.max_age_seconds:
+                # Sem estado final: desfecho desconhecido, fica para conferência manual
+                state = 'stale'
+
+            post_ids = data.get('publicaly_available_post_id') or []
+            cursor = self._connection().execute(
+                "UPDATE tiktok_publishes SET state = ?, remote_status = ?, fail_reason = ?, post_id = ?, "
+                "polls = polls + 1, updated_at = ? WHERE publish_id = ? AND state = 'pending'",
+                (state, remote_status, data.get('fail_reason'),
+                 str(post_ids[0]) if post_ids else None, now, item['publish_id'])
+            )
+            if state != 'pending' and cursor.rowcount == 1:
+                self._adjust_pending(-1)
+
+            if state != 'pending':
+                summary[state] += 1
+                PUBLISH_OUTCOMES.inc(state=state)
+                if state == 'stale':
+                    print(f"⚠️ TikTok não concluiu {item['filename']} a tempo; confira a publicação manualmente")
+                    events.log_event(
+                        "tiktok.stale", "WARNING", publish_id=item['publish_id'], filename=item['filename'],
+                        remote_status=remote_status, age_seconds=round(now - item['created_at'])
+                    )
+                    continue
+                events.log_event(
+                    "tiktok.processed" if state == 'published' else "tiktok.rejected",
+                    "INFO" if state == 'published' else "ERROR",
+                    publish_id=item['publish_id'], filename=item['filename'],
+                    fail_reason=data.get('fail_reason')
+                )
+                if state == 'failed':
+                    print(f"❌ TikTok rejeitou {item['filename']}: {data.get('fail_reason')}")
+                    if self.on_failed is not None:
+                        self.on_failed(item['filename'], item['publish_id'])
+                else:
+                    print(f"✅ TikTok concluiu a publicação de {item['filename']}")
+        return summary
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Erro no acompanhamento de publicações: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="tiktok-status", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,292 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+# Custo em unidades de quota da YouTube Data API v3
+YOUTUBE_COSTS = {
+    'videos.insert': 1600,
+    'videos.list': 1,
+    'videos.update': 50,
+    'thumbnails.set': 50,
+    'playlistItems.insert': 50,
+}
+
+# TikTok não usa unidades; o limite diário é de publicações por criador
+TIKTOK_COSTS = {
+    'video.init': 1,
+}
+
+OPERATION_COSTS = {'youtube': YOUTUBE_COSTS, 'tiktok': TIKTOK_COSTS}
+
+# Custo de um upload completo, usado pelo agendador antes de escolher o vídeo
+UPLOAD_OPERATION = {'youtube': 'videos.insert', 'tiktok': 'video.init'}
+
+DEFAULT_DAILY_LIMITS = {'youtube': 10000, 'tiktok': 15}
+
+# Limites de taxa (requisições por minuto) por endpoint
+DEFAULT_RATE_LIMITS = {
+    'tiktok.creator_info': 20,
+    'tiktok.init': 6,
+    'tiktok.status': 30,
+}
+
+
+def _quota_timezone():
+    """A quota do YouTube reinicia à meia-noite no horário do Pacífico"""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo("America/Los_Angeles")
+    except Exception:
+        return None
+
+
+def operation_cost(platform: str, operation: str) -> int:
+    return OPERATION_COSTS.get(platform, {}).get(operation, 1)
+
+
+class TokenBucket:
+    """Token bucket thread-safe para limitar taxa de requisições"""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Segundos até haver tokens suficientes"""
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+            return 0.0 if missing <= 0 else missing / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Bloqueia até conseguir os tokens"""
+        while not self.try_acquire(tokens):
+            time.sleep(max(0.01, self.wait_time(tokens)))
+
+
+class QuotaExceededError(Exception):
+    """A chamada não cabe na quota diária que resta (nada foi cobrado)"""
+
+    def __init__(self, platform: str, account: str, operation: str, units: int):
+        super().__init__(f"Quota diária do {platform} esgotada ({account}): {operation} custa {units}")
+        self.platform = platform
+        self.account = account
+        self.operation = operation
+        self.units = units
+
+
+class QuotaBudget:
+    """Controla a quota diária por plataforma/conta e as taxas por endpoint
+
+    O consumo fica em SQLite e cada cobrança é um UPDATE condicional
+    (used + custo <= limite) numa transação: vários processos ou hosts com o
+    mesmo arquivo dividem a mesma quota sem estourá-la. Os limites de taxa
+    (token buckets) valem por processo.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        daily_limits: Optional[Dict[str, int]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.db_path = str(db_path)
+        self.daily_limits = {**DEFAULT_DAILY_LIMITS, **(daily_limits or {})}
+        self._rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._timezone = _quota_timezone()
+        # Relógio local (substituível na simulação)
+        self._clock = clock
+        # Último uso lido ou cobrado por plataforma/conta (o /status lê daqui, sem disco)
+        self._seen: Dict[str, Dict] = {}
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota_usage ("
+                "platform TEXT NOT NULL, account TEXT NOT NULL, day TEXT NOT NULL, "
+                "used INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (platform, account, day))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota_operations ("
+                "platform TEXT NOT NULL, account TEXT NOT NULL, day TEXT NOT NULL, operation TEXT NOT NULL, "
+                "calls INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (platform, account, day, operation))"
+            )
+            conn.execute("DELETE FROM quota_usage WHERE day < ?", (self._yesterday(),))
+            conn.execute("DELETE FROM quota_operations WHERE day < ?", (self._yesterday(),))
+        self._import_legacy(Path(self.db_path).with_name('quota_state.json'))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Transação com lock de escrita imediato (BEGIN IMMEDIATE)"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _import_legacy(self, state_file: Path) -> None:
+        """Traz o consumo do dia do antigo quota_state.json (uma vez, se o banco estiver vazio)"""
+        if not state_file.exists():
+            return
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Estado de quota antigo inválido, ignorando: {e}")
+            return
+        today = self._today()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM quota_usage LIMIT 1").fetchone():
+                return
+            for key, usage in state.items():
+                if usage.get('date') != today or ':' not in key:
+                    continue
+                platform, account = key.split(':', 1)
+                conn.execute(
+                    "INSERT INTO quota_usage (platform, account, day, used) VALUES (?, ?, ?, ?)",
+                    (platform, account, today, int(usage.get('used', 0)))
+                )
+                for operation, calls in usage.get('operations', {}).items():
+                    conn.execute(
+                        "INSERT INTO quota_operations (platform, account, day, operation, calls) "
+                        "VALUES (?, ?, ?, ?, ?)", (platform, account, today, operation, int(calls))
+                    )
+
+    def _now(self) -> datetime:
+        now = self._clock()
+        if self._timezone:
+            now = now.astimezone(self._timezone)
+        return now
+
+    def _today(self) -> str:
+        return self._now().date().isoformat()
+
+    def _yesterday(self) -> str:
+        return (self._now().date() - timedelta(days=1)).isoformat()
+
+    def _remember(self, platform: str, account: str, day: str, used: int) -> None:
+        with self._lock:
+            self._seen[f"{platform}:{account}"] = {'date': day, 'used': used}
+
+    def used(self, platform: str, account: str = "default") -> int:
+        today = self._today()
+        row = self._connection().execute(
+            "SELECT used FROM quota_usage WHERE platform = ? AND account = ? AND day = ?",
+            (platform, account, today)
+        ).fetchone()
+        used = row[0] if row else 0
+        self._remember(platform, account, today, used)
+        return used
+
+    def remaining(self, platform: str, account: str = "default") -> int:
+        limit = self.daily_limits.get(platform)
+        if limit is None:
+            return 1 << 31
+        return max(0, limit - self.used(platform, account))
+
+    def can_afford(self, platform: str, account: str = "default", units: Optional[int] = None) -> bool:
+        """Verifica se há quota para a operação (padrão: um upload completo)"""
+        if units is None:
+            units = operation_cost(platform, UPLOAD_OPERATION.get(platform, ''))
+        return self.remaining(platform, account) >= units
+
+    def charge(self, platform: str, operation: str, account: str = "default") -> int:
+        """Cobra a chamada antes de fazê-la e retorna as unidades
+
+        Levanta QuotaExceededError se não couber no que resta do dia (outro
+        processo pode ter gasto a quota desde o can_afford).
+        """
+        units = operation_cost(platform, operation)
+        limit = self.daily_limits.get(platform)
+        today = self._today()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO quota_usage (platform, account, day, used) VALUES (?, ?, ?, 0)",
+                (platform, account, today)
+            )
+            cursor = conn.execute(
+                "UPDATE quota_usage SET used = used + ? "
+                "WHERE platform = ? AND account = ? AND day = ? AND (? IS NULL OR used + ? <= ?)",
+                (units, platform, account, today, limit, units, limit)
+            )
+            if cursor.rowcount == 1:
+                conn.execute(
+                    "INSERT INTO quota_operations (platform, account, day, operation, calls) VALUES (?, ?, ?, ?, 1) "
+                    "ON CONFLICT(platform, account, day, operation) DO UPDATE SET calls = calls + 1",
+                    (platform, account, today, operation)
+                )
+            used = conn.execute(
+                "SELECT used FROM quota_usage WHERE platform = ? AND account = ? AND day = ?",
+                (platform, account, today)
+            ).fetchone()[0]
+        self._remember(platform, account, today, used)
+        if cursor.rowcount != 1:
+            raise QuotaExceededError(platform, account, operation, units)
+        return units
+
+    def _bucket(self, endpoint: str, account: str) -> Optional[TokenBucket]:
+        per_minute = self._rate_limits.get(endpoint)
+        if not per_minute:
+            return None
+        # Os limites de taxa valem por token de usuário, ou seja, por conta
+        key = f"{endpoint}:{account}"
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(per_minute / 60.0, capacity=max(1.0, float(per_minute)))
+                self._buckets[key] = bucket
+            return bucket
+
+    def acquire_rate(self, endpoint: str, account: str = "default") -> None:
+        """Aguarda um token do limite de taxa do endpoint"""
+        bucket = self._bucket(endpoint, account)
+        if bucket is not None:
+            bucket.acquire()
+
+    def rate_wait(self, endpoint: str, account: str = "default") -> float:
+        """Segundos até o endpoint aceitar nova requisição"""
+        bucket = self._bucket(endpoint, account)
+        return bucket.wait_time() if bucket is not None else 0.0
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Uso do dia por plataforma/conta, como visto por último neste processo (sem disco)"""
+        today = self._today()
+        with self._lock:
+            return {
+                key: {**usage, 'limit': self.daily_limits.get(key.split(':', 1)[0])}
+                for key, usage in self._seen.items() if usage['date'] == today
+            }
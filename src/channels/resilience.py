@@ -0,0 +1,224 @@
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import requests
+from google.auth.exceptions import TransportError
+
+from src.observability import events, metrics
+
+
+T = TypeVar("T")
+
+# Respostas que indicam problema passageiro do servidor (vale tentar de novo)
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+CIRCUIT_OPEN = metrics.REGISTRY.gauge(
+    "circuit_open",
+    "Circuit breaker aberto (1) ou fechado (0) por endpoint",
+    ("endpoint",)
+)
+
+
+class RetryableError(Exception):
+    """Falha passageira (HTTP 5xx/429, conexão); pode ter Retry-After"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Endpoint fora do ar: chamadas recusadas até o fim da espera"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuito aberto para {endpoint} (nova tentativa em {retry_after:.0f}s)")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def check_response(response: requests.Response) -> requests.Response:
+    """Converte respostas HTTP passageiras em RetryableError; as demais seguem para o chamador"""
+    if response.status_code in RETRYABLE_STATUS:
+        raise RetryableError(
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            status=response.status_code,
+            retry_after=_retry_after(response.headers.get('Retry-After'))
+        )
+    return response
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classifica a exceção: rede/servidor instável (True) ou erro definitivo (False)"""
+    if isinstance(error, RetryableError):
+        return True
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TransportError,
+                          socket.timeout, ConnectionError)):
+        return True
+    # googleapiclient.errors.HttpError traz o status em resp.status
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    try:
+        return int(status) in RETRYABLE_STATUS
+    except (TypeError, ValueError):
+        return False
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff exponencial com jitter completo"""
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Abre após failure_threshold falhas seguidas; após reset_timeout deixa uma chamada de teste passar"""
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def retry_after(self) -> float:
+        """Segundos até o circuito aceitar uma chamada de teste"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            # Meio aberto: só uma chamada de teste por vez
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        if was_open:
+            CIRCUIT_OPEN.set(0, endpoint=self.endpoint)
+            events.log_event("circuit.closed", endpoint=self.endpoint)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            reopen = self._probing
+            self._probing = False
+            if not reopen and (self._opened_at is not None or self._failures < self.failure_threshold):
+                return
+            self._opened_at = time.monotonic()
+        CIRCUIT_OPEN.set(1, endpoint=self.endpoint)
+        print(f"🔌 Circuito aberto para {self.endpoint} por {self.reset_timeout:.0f}s")
+        events.log_event("circuit.opened", "WARNING", endpoint=self.endpoint, failures=self._failures)
+
+
+class Resilience:
+    """Tentativas com backoff e circuit breakers por endpoint, compartilhados pelo processo"""
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 reset_timeout: float = 60.0, sleep: Callable[[float], None] = time.sleep):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sleep = sleep
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def call(self, endpoint: str, fn: Callable[[], T], policy: Optional[RetryPolicy] = None) -> T:
+        """Executa fn com novas tentativas para erros passageiros
+
+        Erros definitivos sobem na hora; com o circuito aberto a chamada nem
+        é feita (CircuitOpenError).
+        """
+        policy = policy or self.policy
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(endpoint, breaker.retry_after())
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    # O endpoint respondeu: não conta como indisponibilidade
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                # Sem mais tentativas, ou o circuito acabou de abrir: falha rápido
+                if attempt >= policy.max_attempts or breaker.state == "open":
+                    raise
+                delay = policy.delay(attempt - 1, e)
+                metrics.RETRIES.inc(endpoint=endpoint)
+                print(f"🔁 {endpoint}: {e} — nova tentativa em {delay:.1f}s")
+                events.log_event(
+                    "retry", "WARNING", endpoint=endpoint, attempt=attempt, delay=round(delay, 2), error=str(e)
+                )
+                self._sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def open_circuits(self, prefix: str = "") -> Dict[str, float]:
+        """Endpoints com circuito aberto -> segundos até a próxima tentativa"""
+        with self._lock:
+            breakers = [b for name, b in self._breakers.items() if name.startswith(prefix)]
+        return {b.endpoint: b.retry_after() for b in breakers if b.state == "open"}
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [{'endpoint': b.endpoint, 'state': b.state, 'retry_after': round(b.retry_after(), 1)} for b in breakers]
+
+
+RESILIENCE = Resilience()
+
+
+def call(endpoint: str, fn: Callable[[], T], policy: Optional[RetryPolicy] = None) -> T:
+    """Atalho para RESILIENCE.call"""
+    return RESILIENCE.call(endpoint, fn, policy)
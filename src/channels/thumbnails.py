@@ -0,0 +1,280 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.channels.files import atomic_write_json
+from src.observability import events, metrics
+
+try:
+    import numpy as np
+except ImportError:  # Opcional: sem NumPy a nota é calculada em Python puro (mais lento)
+    np = None
+
+
+# Capa usada quando não há quadro escolhido (mesmo valor fixo de antes)
+DEFAULT_COVER_MS = 1000
+# Largura do quadro reduzido usado só para dar a nota
+SCORE_WIDTH = 160
+# Miniatura do YouTube: até 1280px de largura e 2MB
+THUMBNAIL_WIDTH = 1280
+FFMPEG_TIMEOUT = 60
+# Espera máxima do upload pela escolha; depois segue com a capa padrão
+CHOOSE_TIMEOUT = 120
+
+THUMBNAIL_RESULTS = metrics.REGISTRY.counter(
+    "thumbnail_results_total",
+    "Escolhas de miniatura por resultado (cache, extracted, failed, timeout)",
+    ("result",)
+)
+THUMBNAIL_DURATION = metrics.REGISTRY.histogram(
+    "thumbnail_duration_seconds",
+    "Tempo para extrair e avaliar os quadros candidatos de um vídeo"
+)
+
+
+@dataclass
+class Thumbnail:
+    """Quadro escolhido: instante (capa do TikTok) e imagem (miniatura do YouTube)"""
+    timestamp_ms: int
+    score: float
+    image_path: Optional[str] = None
+
+
+def fingerprint(file_path: str) -> str:
+    """Identidade do arquivo para o cache: nome, tamanho e mtime"""
+    stat = os.stat(file_path)
+    key = f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def probe_duration(file_path: str) -> Optional[float]:
+    """Duração do vídeo em segundos (ffprobe)"""
+    try:
+        output = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', file_path],
+            capture_output=True, text=True, timeout=FFMPEG_TIMEOUT, check=True
+        ).stdout
+        return float(output.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+
+def candidate_times(duration: float, count: int) -> List[float]:
+    """Instantes igualmente espaçados, evitando o início e o fim (fades)"""
+    return [duration * (index + 1) / (count + 1) for index in range(count)]
+
+
+def score_pixels(pixels: bytes, width: int) -> float:
+    """Nota do quadro em tons de cinza: nitidez (variância do laplaciano) x exposição
+
+    Quadros borrados, pretos ou estourados (transições) ficam com nota baixa.
+    """
+    height = len(pixels) // width
+    if height < 3:
+        return 0.0
+    if np is not None:
+        image = np.frombuffer(pixels, dtype=np.uint8, count=width * height).reshape(height, width).astype(np.float32)
+        laplacian = (image[:-2, 1:-1] + image[2:, 1:-1] + image[1:-1, :-2] + image[1:-1, 2:]
+                     - 4 * image[1:-1, 1:-1])
+        sharpness = float(laplacian.var())
+        brightness = float(image.mean())
+    else:
+        # Diferença horizontal ao quadrado: aproximação barata da nitidez
+        total = squares = 0
+        for row in range(height):
+            line = pixels[row * width:(row + 1) * width]
+            total += sum(line)
+            squares += sum((a - b) ** 2 for a, b in zip(line, line[1:]))
+        sharpness = squares / (height * (width - 1))
+        brightness = total / (height * width)
+    exposure = max(0.05, 1 - abs(brightness - 128) / 128)
+    return sharpness * exposure
+
+
+def _score_frame(file_path: str, seconds: float, width: int = SCORE_WIDTH) -> Tuple[float, Optional[float]]:
+    """Executado no pool de processos: extrai um quadro reduzido e devolve (instante, nota)"""
+    try:
+        pixels = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-ss', f"{seconds:.3f}", '-i', file_path, '-frames:v', '1',
+             '-vf', f"scale={width}:-2,format=gray", '-f', 'rawvideo', '-'],
+            capture_output=True, timeout=FFMPEG_TIMEOUT, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return seconds, None
+    if not pixels:
+        return seconds, None
+    return seconds, score_pixels(pixels, width)
+
+
+class ThumbnailPicker:
+    """Escolhe o quadro de capa de cada vídeo, com cache por fingerprint
+
+    Os quadros candidatos são extraídos e avaliados em paralelo num pool de
+    processos (ffmpeg + NumPy); o vencedor vira JPEG em cache_dir. O
+    resultado fica em thumbnails.json, então a escolha é feita uma vez por
+    arquivo, mesmo com reinícios. Sem ffmpeg no PATH a etapa fica desligada
+    e a capa volta ao padrão (1s, sem miniatura personalizada). O upload
+    espera a escolha por no máximo choose_timeout segundos.
+    """
+
+    def __init__(self, cache_dir: str, candidates: int = 6, workers: int = 2, enabled: bool = True,
+                 choose_timeout: float = CHOOSE_TIMEOUT):
+        self.cache_dir = Path(cache_dir)
+        self.candidates = max(1, candidates)
+        self.workers = max(1, workers)
+        self.choose_timeout = choose_timeout
+        self.enabled = enabled and shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+        if enabled and not self.enabled:
+            events.log_event("thumbnails.disabled", "WARNING", reason="ffmpeg_not_found")
+        if self.enabled and np is None:
+            print("⚠️ NumPy não instalado: notas das miniaturas em Python puro (pip install numpy)")
+            events.log_event("thumbnails.numpy_missing", "WARNING")
+        self.state_file = self.cache_dir / 'thumbnails.json'
+        self._cache: Dict[str, Dict] = self._load() if self.enabled else {}
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Coordena as escolhas em segundo plano (schedule) sem ocupar a thread do upload
+        self._runner: Optional[ThreadPoolExecutor] = None
+        # Depois de stop() não aceita trabalho novo (não recria os pools)
+        self._stopped = False
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def cached(self, file_path: str) -> Optional[Thumbnail]:
+        try:
+            entry = self._cache.get(fingerprint(file_path))
+        except OSError:
+            return None
+        if entry is None:
+            return None
+        if entry.get('image_path') and not os.path.exists(entry['image_path']):
+            return None
+        return Thumbnail(**entry)
+
+    def schedule(self, file_path: str) -> None:
+        """Escolhe em segundo plano (ex.: para o próximo vídeo planejado)"""
+        if self.enabled and self.cached(file_path) is None:
+            try:
+                self._submit(file_path)
+            except (OSError, RuntimeError) as e:
+                events.log_event("thumbnails.error", "DEBUG", path=file_path, error=str(e))
+
+    def choose(self, file_path: str) -> Optional[Thumbnail]:
+        """Quadro de capa do vídeo (None se a etapa estiver desligada ou falhar)"""
+        if not self.enabled:
+            return None
+        thumbnail = self.cached(file_path)
+        if thumbnail is not None:
+            THUMBNAIL_RESULTS.inc(result="cache")
+            return thumbnail
+        try:
+            return self._submit(file_path).result(timeout=self.choose_timeout)
+        except FutureTimeoutError:
+            # A escolha continua em segundo plano e fica em cache para a próxima vez
+            THUMBNAIL_RESULTS.inc(result="timeout")
+            events.log_event(
+                "thumbnails.timeout", "WARNING", filename=os.path.basename(file_path), seconds=self.choose_timeout
+            )
+            return None
+        except Exception as e:  # Arquivo sumiu, ffmpeg travou...: segue com a capa padrão
+            print(f"⚠️ Não foi possível escolher a miniatura: {e}")
+            return None
+
+    def _submit(self, file_path: str) -> Future:
+        key = fingerprint(file_path)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("seleção de miniaturas encerrada")
+            future = self._pending.get(key)
+            if future is None:
+                if self._runner is None:
+                    self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+                future = self._runner.submit(self._extract, file_path, key)
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._forget_pending(key))
+            return future
+
+    def _forget_pending(self, key: str) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _extract(self, file_path: str, key: str) -> Optional[Thumbnail]:
+        started = time.perf_counter()
+        filename = os.path.basename(file_path)
+        duration = probe_duration(file_path)
+        if not duration:
+            THUMBNAIL_RESULTS.inc(result="failed")
+            events.log_event("thumbnails.failed", "WARNING", filename=filename, reason="duration")
+            return None
+
+        pool = self._process_pool()
+        futures = [pool.submit(_score_frame, file_path, seconds) for seconds in candidate_times(duration, self.candidates)]
+        scored = [(score, seconds) for seconds, score in (future.result() for future in futures) if score is not None]
+        if not scored:
+            THUMBNAIL_RESULTS.inc(result="failed")
+            events.log_event("thumbnails.failed", "WARNING", filename=filename, reason="frames")
+            return None
+        score, seconds = max(scored)
+
+        image_path = self.cache_dir / f"{key}.jpg"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            subprocess.run(
+                ['ffmpeg', '-v', 'error', '-y', '-ss', f"{seconds:.3f}", '-i', file_path, '-frames:v', '1',
+                 '-vf', f"scale='min({THUMBNAIL_WIDTH},iw)':-2", '-q:v', '3', str(image_path)],
+                capture_output=True, timeout=FFMPEG_TIMEOUT, check=True
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            # Sem imagem ainda vale o instante para a capa do TikTok
+            events.log_event("thumbnails.image_failed", "WARNING", filename=filename, error=str(e))
+            image_path = None
+
+        thumbnail = Thumbnail(int(seconds * 1000), round(score, 2), str(image_path) if image_path else None)
+        with self._lock:
+            self._cache[key] = asdict(thumbnail)
+            atomic_write_json(self.state_file, self._cache)
+        elapsed = time.perf_counter() - started
+        THUMBNAIL_RESULTS.inc(result="extracted")
+        THUMBNAIL_DURATION.observe(elapsed)
+        events.log_event(
+            "thumbnails.chosen", "DEBUG", filename=filename, timestamp_ms=thumbnail.timestamp_ms,
+            score=thumbnail.score, candidates=len(scored), seconds=round(elapsed, 3)
+        )
+        return thumbnail
+
+    def stop(self) -> None:
+        """Recusa escolhas novas, espera as em andamento e encerra os pools"""
+        with self._lock:
+            self._stopped = True
+            runner, self._runner = self._runner, None
+        if runner is not None:
+            runner.shutdown(wait=True)
+        # Só agora: uma escolha em andamento ainda pode ter criado o pool de processos
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.channels import resilience
+from src.channels.quota import QuotaExceededError, operation_cost
+from src.observability import events, metrics
+
+
+BATCHED_OPERATIONS = metrics.REGISTRY.counter(
+    "youtube_batched_operations_total",
+    "Chamadas posteriores ao upload enviadas em lote, por operação e resultado",
+    ("operation", "outcome")
+)
+BATCH_REQUESTS = metrics.REGISTRY.counter(
+    "youtube_batch_requests_total",
+    "Requisições BatchHttpRequest enviadas"
+)
+
+
+@dataclass
+class DeferredOperation:
+    """Chamada da API adiada (ex.: playlistItems.insert) para um vídeo enviado"""
+    account: str
+    operation: str  # "recurso.método" da YouTube Data API
+    params: Dict
+    filename: str
+    remote_id: Optional[str] = None
+    attempts: int = 0
+    queued_at: float = field(default_factory=time.monotonic)
+
+    def build(self, service):
+        resource, method = self.operation.split('.')
+        return getattr(getattr(service, resource)(), method)(**self.params)
+
+
+class YouTubeBatchQueue:
+    """Fila de chamadas posteriores ao upload agrupadas em BatchHttpRequest
+
+    As operações de cada conta são enviadas juntas quando a fila chega a
+    max_batch itens ou quando a mais antiga espera max_delay segundos. O
+    resultado de cada item vai para on_results (histórico de uploads). Itens
+    com falha passageira voltam para a fila até max_attempts. Uploads de mídia
+    (thumbnails.set) não podem ir em lote e não passam por aqui.
+    """
+
+    def __init__(
+        self,
+        auth,
+        quota,
+        on_results: Optional[Callable[[List[Dict]], None]] = None,
+        max_batch: int = 50,
+        max_delay: float = 30.0,
+        max_attempts: int = 3
+    ):
+        self.auth = auth
+        self.quota = quota
+        self.on_results = on_results
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._items: List[DeferredOperation] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, account: str, operation: str, params: Dict, filename: str,
+                remote_id: Optional[str] = None) -> None:
+        item = DeferredOperation(account or "default", operation, params, filename, remote_id)
+        with self._condition:
+            stopped = self._stop
+            self._items.append(item)
+            if self._thread is None and not stopped:
+                self._thread = threading.Thread(target=self._loop, name="youtube-batch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        events.log_event("youtube.deferred", operation=operation, filename=filename, remote_id=remote_id)
+        if stopped:
+            # Upload que terminou depois do stop(): sem envio em segundo plano, vai na hora
+            self._flush_remaining()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    def _due(self) -> Optional[float]:
+        """Segundos até o próximo envio (0 = agora, None = fila vazia)"""
+        if not self._items:
+            return None
+        if len(self._items) >= self.max_batch:
+            return 0.0
+        return max(0.0, self._items[0].queued_at + self.max_delay - time.monotonic())
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stop and self._due() != 0.0:
+                    self._condition.wait(self._due())
+                if self._stop:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Erro no envio em lote do YouTube: {e}")
+
+    def flush(self) -> Dict[str, int]:
+        """Envia tudo o que está na fila, em lotes de até max_batch por conta"""
+        with self._flush_lock:
+            with self._condition:
+                items, self._items = self._items, []
+            summary = {'sent': 0, 'succeeded': 0, 'failed': 0, 'requeued': 0}
+            by_account: Dict[str, List[DeferredOperation]] = defaultdict(list)
+            for item in items:
+                by_account[item.account].append(item)
+            for account, account_items in by_account.items():
+                for start in range(0, len(account_items), self.max_batch):
+                    self._send(account, account_items[start:start + self.max_batch], summary)
+            return summary
+
+    def _requeue(self, items: List[DeferredOperation], summary: Dict[str, int]) -> List[DeferredOperation]:
+        """Devolve à fila os itens que ainda têm tentativas; retorna os esgotados"""
+        exhausted = []
+        with self._condition:
+            for item in items:
+                item.attempts += 1
+                if item.attempts < self.max_attempts:
+                    # Espera um novo max_delay antes da próxima tentativa
+                    item.queued_at = time.monotonic()
+                    self._items.append(item)
+                    summary['requeued'] += 1
+                else:
+                    exhausted.append(item)
+        return exhausted
+
+    def _send(self, account: str, items: List[DeferredOperation], summary: Dict[str, int]) -> None:
+        units = sum(operation_cost('youtube', item.operation) for item in items)
+        if not self.quota.can_afford('youtube', account, units):
+            # Sem quota hoje: tenta de novo no próximo ciclo
+            print(f"⛽ Quota insuficiente para {len(items)} operações adiadas ({account})")
+            self._report([(item, 'failed', 'quota') for item in self._requeue(items, summary)], summary)
+            return
+        service = self.auth.get_youtube_service(account)
+        if service is None:
+            self._report([(item, 'failed', 'auth') for item in self._requeue(items, summary)], summary)
+            return
+
+        responses: Dict[str, Optional[Exception]] = {}
+
+        def callback(request_id, response, exception):
+            responses[request_id] = exception
+
+        # Cobrança item a item: o que não couber (quota gasta por outro processo) espera o próximo ciclo
+        charged, refused = [], []
+        for item in items:
+            try:
+                self.quota.charge('youtube', item.operation, account)
+                charged.append(item)
+            except QuotaExceededError:
+                refused.append(item)
+        if refused:
+            self._report([(item, 'failed', 'quota') for item in self._requeue(refused, summary)], summary)
+        items = charged
+        if not items:
+            return
+        batch = service.new_batch_http_request(callback=callback)
+        for index, item in enumerate(items):
+            batch.add(item.build(service), request_id=str(index))
+        summary['sent'] += len(items)
+        BATCH_REQUESTS.inc()
+        try:
+            # Falha do lote inteiro (rede/5xx): nenhum item foi aplicado, pode repetir
+            resilience.call('youtube.batch', batch.execute)
+        except Exception as e:
+            print(f"⚠️ Lote de {len(items)} operações falhou: {e}")
+            self._report([(item, 'failed', str(e)) for item in self._requeue(items, summary)], summary)
+            return
+
+        results, retry = [], []
+        for index, item in enumerate(items):
+            error = responses.get(str(index))
+            if error is None:
+                results.append((item, 'succeeded', None))
+            elif resilience.is_retryable(error):
+                retry.append(item)
+            else:
+                results.append((item, 'failed', str(error)))
+        results.extend((item, 'failed', 'retries_exhausted') for item in self._requeue(retry, summary))
+        self._report(results, summary)
+
+    def _report(self, results, summary: Dict[str, int]) -> None:
+        rows = []
+        for item, outcome, error in results:
+            summary[outcome] += 1
+            BATCHED_OPERATIONS.inc(operation=item.operation, outcome=outcome)
+            if outcome == 'failed':
+                events.log_event(
+                    "youtube.deferred_failed", "WARNING", operation=item.operation,
+                    filename=item.filename, error=error
+                )
+            rows.append({
+                'platform': 'youtube', 'filename': item.filename, 'remote_id': item.remote_id,
+                'operation': item.operation, 'outcome': outcome, 'error': error
+            })
+        if rows and self.on_results is not None:
+            try:
+                self.on_results(rows)
+            except Exception as e:
+                print(f"⚠️ Erro ao registrar resultados do lote: {e}")
+
+    def stop(self) -> Dict[str, int]:
+        """Encerra o envio em segundo plano e envia o que restou na fila"""
+        with self._condition:
+            self._stop = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+        return self._flush_remaining()
+
+    def _flush_remaining(self) -> Dict[str, int]:
+        """Envio final: o que ainda falhar não fica esquecido, vai para o histórico"""
+        summary = self.flush()
+        with self._condition:
+            leftover, self._items = self._items, []
+        self._report([(item, 'failed', 'shutdown') for item in leftover], summary)
+        return summary
@@ -0,0 +1,243 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.channels import resilience
+from src.channels.publish_shorts import parse_video_name
+from src.channels.quota import UPLOAD_OPERATION, QuotaExceededError, operation_cost
+from src.observability import events, metrics
+
+
+# Limite de IDs por chamada de videos.list
+BATCH_SIZE = 50
+
+STATS_FETCHED = metrics.REGISTRY.counter(
+    "analytics_videos_fetched_total",
+    "Vídeos com estatísticas atualizadas, por plataforma",
+    ("platform",)
+)
+STATS_REQUESTS = metrics.REGISTRY.counter(
+    "analytics_requests_total",
+    "Chamadas em lote à API de estatísticas, por plataforma",
+    ("platform",)
+)
+
+
+class AnalyticsCollector:
+    """Coleta em lote visualizações e curtidas dos vídeos publicados no YouTube
+
+    Os IDs remotos vêm do histórico de uploads; cada videos.list leva até 50
+    IDs e custa 1 unidade de quota, então acompanhar 1000 vídeos custa 20
+    unidades por ciclo. As estatísticas ficam na tabela video_stats do
+    history.db e alimentam os pesos por tag da política tag_weighted.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        auth,
+        quota,
+        interval_hours: float = 6,
+        refresh_hours: float = 12,
+        track_days: float = 30,
+        prior: float = 3.0,
+        min_weight: float = 0.1
+    ):
+        self.db_path = str(db_path)
+        self.auth = auth
+        self.quota = quota
+        self.interval_hours = interval_hours
+        self.refresh_hours = refresh_hours
+        self.track_days = track_days
+        # Peso do prior (em vídeos): tags com poucos vídeos ficam perto de 1.0
+        self.prior = prior
+        self.min_weight = min_weight
+        self._weights: Dict[Optional[str], Dict[str, float]] = {}
+        self._weights_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS video_stats (
+                remote_id TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                views INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                comments INTEGER NOT NULL DEFAULT 0,
+                available INTEGER NOT NULL DEFAULT 1,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_video_stats_channel ON video_stats (channel)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def due(self, now: Optional[float] = None) -> List[Dict]:
+        """Vídeos do YouTube enviados em track_days sem estatística recente"""
+        now = time.time() if now is None else now
+        rows = self._connection().execute(
+            """
+            SELECT u.remote_id, u.channel, COALESCE(u.account, 'default'), u.filename
+            FROM uploads u LEFT JOIN video_stats s ON s.remote_id = u.remote_id
+            WHERE u.platform = 'youtube' AND u.outcome = 'uploaded' AND u.remote_id IS NOT NULL
+              AND u.ts >= ? AND (s.fetched_at IS NULL OR s.fetched_at < ?)
+            GROUP BY u.remote_id
+            """,
+            (now - self.track_days * 86400, now - self.refresh_hours * 3600)
+        ).fetchall()
+        return [
+            {'remote_id': row[0], 'channel': row[1], 'account': row[2], 'filename': row[3]}
+            for row in rows
+        ]
+
+    def _fetch_batch(self, service, ids: List[str]) -> Dict[str, Dict]:
+        """Estatísticas de até 50 vídeos numa chamada (IDs removidos não voltam)"""
+        request = service.videos().list(part='statistics', id=','.join(ids), maxResults=BATCH_SIZE)
+        response = resilience.call('youtube.videos.list', request.execute)
+        return {item['id']: item.get('statistics', {}) for item in response.get('items', [])}
+
+    def _can_afford(self, account: str) -> bool:
+        # Estatística nunca consome a quota reservada para o próximo upload
+        units = operation_cost('youtube', UPLOAD_OPERATION['youtube']) + operation_cost('youtube', 'videos.list')
+        return self.quota.can_afford('youtube', account, units)
+
+    def collect_once(self) -> Dict[str, int]:
+        """Atualiza as estatísticas pendentes, em lotes por conta"""
+        summary = {'due': 0, 'requests': 0, 'updated': 0}
+        by_account: Dict[str, List[Dict]] = defaultdict(list)
+        for item in self.due():
+            by_account[item['account']].append(item)
+            summary['due'] += 1
+
+        for account, items in by_account.items():
+            service = self.auth.get_youtube_service(account)
+            if service is None:
+                continue
+            for start in range(0, len(items), BATCH_SIZE):
+                if self._stop.is_set() or resilience.RESILIENCE.open_circuits('youtube.videos.list'):
+                    break
+                if not self._can_afford(account):
+                    print(f"⛽ Estatísticas adiadas: quota do YouTube reservada para uploads ({account})")
+                    break
+                batch = items[start:start + BATCH_SIZE]
+                try:
+                    self.quota.charge('youtube', 'videos.list', account)
+                except QuotaExceededError:
+                    # Outro processo gastou a quota desde a conferência
+                    break
+                summary['requests'] += 1
+                STATS_REQUESTS.inc(platform='youtube')
+                try:
+                    stats = self._fetch_batch(service, [item['remote_id'] for item in batch])
+                except Exception as e:
+                    print(f"⚠️ Erro ao buscar estatísticas: {e}")
+                    events.log_event("analytics.error", "WARNING", account=account, error=str(e))
+                    break
+                summary['updated'] += self._store(batch, stats)
+
+        if summary['updated']:
+            with self._weights_lock:
+                self._weights.clear()
+            STATS_FETCHED.inc(summary['updated'], platform='youtube')
+        events.log_event("analytics.collected", **summary)
+        return summary
+
+    def _store(self, batch: List[Dict], stats: Dict[str, Dict]) -> int:
+        now = time.time()
+        rows = []
+        for item in batch:
+            # Vídeo removido ou privado não volta na resposta: fica registrado sem pesar nas tags
+            data = stats.get(item['remote_id'])
+            values = data or {}
+            _, tags = parse_video_name(item['filename'])
+            rows.append((
+                item['remote_id'], 'youtube', item['channel'], item['filename'], ",".join(tags),
+                int(values.get('viewCount', 0)), int(values.get('likeCount', 0)),
+                int(values.get('commentCount', 0)), int(data is not None), now
+            ))
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO video_stats "
+            "(remote_id, platform, channel, filename, tags, views, likes, comments, available, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(stats)
+
+    def tag_scores(self, channel: Optional[str] = None) -> Dict[str, float]:
+        """Peso por tag: média de visualizações da tag sobre a média geral
+
+        A média é suavizada com prior vídeos na média geral, para que uma tag
+        com um único vídeo de sorte não domine a seleção.
+        """
+        with self._weights_lock:
+            cached = self._weights.get(channel)
+        if cached is not None:
+            return cached
+
+        query = "SELECT tags, views FROM video_stats WHERE available = 1"
+        params = ()
+        if channel is not None:
+            query += " AND channel = ?"
+            params = (channel,)
+        totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        overall_views = overall_count = 0
+        for tags, views in self._connection().execute(query, params):
+            overall_views += views
+            overall_count += 1
+            # Mesma tag usada pela seleção: a primeira do nome do arquivo
+            tag = tags.split(',')[0] if tags else ""
+            totals[tag][0] += views
+            totals[tag][1] += 1
+
+        weights = {}
+        if overall_count and overall_views:
+            mean = overall_views / overall_count
+            for tag, (views, count) in totals.items():
+                smoothed = (views + self.prior * mean) / (count + self.prior)
+                weights[tag] = round(max(self.min_weight, smoothed / mean), 3)
+        with self._weights_lock:
+            self._weights[channel] = weights
+        return weights
+
+    def cached_tag_scores(self, channel: Optional[str] = None) -> Dict[str, float]:
+        """Pesos já calculados (vazio até a primeira seleção ou coleta; não consulta o banco)"""
+        with self._weights_lock:
+            return dict(self._weights.get(channel) or {})
+
+    def tag_weight(self, tag: str, channel: Optional[str] = None) -> float:
+        """Peso da tag para a seleção (1.0 sem dados)"""
+        return self.tag_scores(channel).get(tag, 1.0)
+
+    def _loop(self) -> None:
+        # Primeira coleta logo na partida; depois a cada interval_hours
+        while not self._stop.is_set():
+            try:
+                self.collect_once()
+            except Exception as e:
+                print(f"⚠️ Erro na coleta de estatísticas: {e}")
+            self._stop.wait(self.interval_hours * 3600)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="analytics", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,315 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+
+OUTCOMES = ("uploaded", "failed", "error", "skipped", "rejected")
+GROUP_COLUMNS = ("channel", "platform", "account", "outcome", "day")
+
+_DAY = 86400
+# Páginas devolvidas ao disco por compactação (4 KiB cada: ~32 MiB)
+VACUUM_PAGES = 8192
+
+
+def parse_since(value: str, now: Optional[float] = None) -> float:
+    """Converte '7d', '12h', '30m' ou data ISO em timestamp"""
+    now = time.time() if now is None else now
+    units = {'d': 86400, 'h': 3600, 'm': 60}
+    value = value.strip()
+    if value[-1:] in units and value[:-1].replace('.', '', 1).isdigit():
+        return now - float(value[:-1]) * units[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _utc_day(ts: float) -> str:
+    """Dia (UTC) do timestamp, no formato das linhas compactadas"""
+    return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+
+class UploadHistory:
+    """Histórico de uploads indexado em SQLite
+
+    Uma linha por tentativa (canal, plataforma, conta, ID remoto, bytes,
+    duração, resultado). Índices por (canal, ts), (plataforma, ts) e
+    (resultado, ts) respondem às consultas por período sem varrer a tabela.
+    Linhas além de retention_days são compactadas em totais diários
+    (upload_daily) e removidas; os totais continuam aparecendo em summary().
+    """
+
+    def __init__(self, db_path: str, retention_days: Optional[float] = 90):
+        self.db_path = str(db_path)
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._enable_incremental_vacuum()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS uploads (
+                    id INTEGER PRIMARY KEY,
+                    ts REAL NOT NULL,
+                    channel TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    account TEXT,
+                    filename TEXT NOT NULL,
+                    remote_id TEXT,
+                    bytes INTEGER NOT NULL DEFAULT 0,
+                    duration REAL,
+                    outcome TEXT NOT NULL,
+                    reason TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_ts ON uploads (ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_channel ON uploads (channel, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_platform ON uploads (platform, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_outcome ON uploads (outcome, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_filename ON uploads (filename)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_daily (
+                    day TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    account TEXT NOT NULL DEFAULT '',
+                    outcome TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    PRIMARY KEY (day, channel, platform, account, outcome)
+                )
+                """
+            )
+            # Chamadas posteriores ao upload (playlist, metadados) e seus resultados
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_operations (
+                    id INTEGER PRIMARY KEY,
+                    ts REAL NOT NULL,
+                    channel TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    remote_id TEXT,
+                    operation TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_operations_remote ON upload_operations (remote_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_operations_ts ON upload_operations (ts)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexão por thread; WAL deixa leituras (CLI, /status) rodarem durante gravações
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _enable_incremental_vacuum(self) -> None:
+        """Liga auto_vacuum=INCREMENTAL; bancos antigos passam por um VACUUM único na troca"""
+        conn = self._connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record(
+        self,
+        channel: str,
+        platform: str,
+        filename: str,
+        outcome: str,
+        account: Optional[str] = None,
+        remote_id: Optional[str] = None,
+        size_bytes: int = 0,
+        duration: Optional[float] = None,
+        reason: Optional[str] = None,
+        ts: Optional[float] = None
+    ) -> None:
+        """Registra uma tentativa de upload"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO uploads (ts, channel, platform, account, filename, remote_id, bytes, "
+                "duration, outcome, reason) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time() if ts is None else ts, channel, platform, account, filename, remote_id,
+                 int(size_bytes or 0), duration, outcome, reason)
+            )
+
+    def record_operations(self, rows: List[Dict]) -> None:
+        """Registra os resultados de um lote de chamadas posteriores ao upload"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO upload_operations (ts, channel, platform, filename, remote_id, operation, "
+                "outcome, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (row.get('ts', time.time()), row['channel'], row['platform'], row['filename'],
+                     row.get('remote_id'), row['operation'], row['outcome'], row.get('error'))
+                    for row in rows
+                ]
+            )
+
+    def operations(self, remote_id: Optional[str] = None, filename: Optional[str] = None,
+                   since: Optional[float] = None, limit: int = 100) -> List[Dict]:
+        """Chamadas posteriores ao upload, mais recentes primeiro"""
+        clauses, params = [], []
+        for column, value in (('remote_id', remote_id), ('filename', filename)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM upload_operations{where} ORDER BY ts DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [{**dict(row), 'time': datetime.fromtimestamp(row['ts'])} for row in rows]
+
+    @staticmethod
+    def _where(channel: Optional[str], platform: Optional[str], outcome: Optional[str],
+               account: Optional[str], since, until, time_column: str = "ts"):
+        clauses, params = [], []
+        for column, value in (('channel', channel), ('platform', platform),
+                              ('outcome', outcome), ('account', account)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{time_column} < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        channel: Optional[str] = None,
+        platform: Optional[str] = None,
+        outcome: Optional[str] = None,
+        account: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        filename: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict]:
+        """Tentativas mais recentes primeiro, filtradas pelos campos informados"""
+        where, params = self._where(channel, platform, outcome, account, since, until)
+        if filename is not None:
+            where += (" AND " if where else " WHERE ") + "filename = ?"
+            params.append(filename)
+        rows = self._connection().execute(
+            f"SELECT * FROM uploads{where} ORDER BY ts DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [{**dict(row), 'time': datetime.fromtimestamp(row['ts'])} for row in rows]
+
+    def summary(
+        self,
+        group_by: Sequence[str] = ("channel", "platform", "outcome"),
+        channel: Optional[str] = None,
+        platform: Optional[str] = None,
+        outcome: Optional[str] = None,
+        account: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> List[Dict]:
+        """Tentativas, bytes e duração média agrupados (inclui os totais compactados)"""
+        invalid = [column for column in group_by if column not in GROUP_COLUMNS]
+        if invalid:
+            raise ValueError(f"Agrupamento inválido: {', '.join(invalid)} (opções: {', '.join(GROUP_COLUMNS)})")
+        where, params = self._where(channel, platform, outcome, account, since, until)
+        # Nos totais diários o período é filtrado pelo dia (UTC)
+        daily_where, daily_params = self._where(
+            channel, platform, outcome, account,
+            _utc_day(since) if since is not None else None,
+            _utc_day(until) if until is not None else None,
+            time_column="day"
+        )
+        detailed = {'day': "date(ts, 'unixepoch')", 'account': "COALESCE(account, '')"}
+        raw_columns = "".join(f"{detailed.get(column, column)} AS {column}, " for column in group_by)
+        columns = "".join(f"{column}, " for column in group_by)
+        group = f" GROUP BY {', '.join(group_by)}" if group_by else ""
+        rows = self._connection().execute(
+            f"""
+            SELECT {columns}SUM(attempts) AS attempts, SUM(bytes) AS bytes, SUM(duration) AS duration
+            FROM (
+                SELECT {raw_columns}COUNT(*) AS attempts, COALESCE(SUM(bytes), 0) AS bytes,
+                       COALESCE(SUM(duration), 0) AS duration
+                FROM uploads{where}{group}
+                UNION ALL
+                SELECT {columns}SUM(attempts), SUM(bytes), SUM(duration)
+                FROM upload_daily{daily_where}{group}
+            ){group}
+            ORDER BY attempts DESC
+            """,
+            (*params, *daily_params)
+        ).fetchall()
+        return [
+            {
+                **{column: row[column] for column in group_by},
+                'attempts': row['attempts'],
+                'bytes': row['bytes'],
+                'avg_duration': round(row['duration'] / row['attempts'], 2) if row['attempts'] else None
+            }
+            for row in rows if row['attempts']
+        ]
+
+    def compact(self, retention_days: Optional[float] = None, now: Optional[float] = None) -> int:
+        """Move linhas mais antigas que a retenção para os totais diários
+
+        Retorna quantas linhas foram removidas da tabela detalhada. Depois de
+        uma remoção o espaço livre é devolvido ao disco aos poucos, no máximo
+        VACUUM_PAGES páginas por chamada (incremental_vacuum, sem reescrever
+        o banco inteiro).
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        if retention_days is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - retention_days * _DAY
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO upload_daily (day, channel, platform, account, outcome, attempts, bytes, duration)
+                SELECT date(ts, 'unixepoch'), channel, platform, COALESCE(account, ''), outcome,
+                       COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(duration), 0)
+                FROM uploads WHERE ts < ?
+                GROUP BY 1, 2, 3, 4, 5
+                ON CONFLICT (day, channel, platform, account, outcome) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    bytes = bytes + excluded.bytes,
+                    duration = duration + excluded.duration
+                """,
+                (cutoff,)
+            )
+            removed = conn.execute("DELETE FROM uploads WHERE ts < ?", (cutoff,)).rowcount
+            conn.execute("DELETE FROM upload_operations WHERE ts < ?", (cutoff,))
+        if removed:
+            self._reclaim_space()
+        return removed
+
+    def _reclaim_space(self) -> None:
+        # O pragma libera uma página por passo; executescript roda até o fim (execute para no primeiro)
+        self._connection().executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
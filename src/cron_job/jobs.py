@@ -0,0 +1,119 @@
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+JOB_TYPES = ("video", "run")
+
+
+@dataclass
+class Job:
+    """Trabalho disparado pela API local"""
+    id: str
+    type: str
+    params: Dict
+    state: str = "queued"  # queued, running, done, failed
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "params": self.params,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Fila em memória executada por threads próprias
+
+    O runner recebe o Job e devolve o resultado do upload; status 'failed'
+    ou 'error' marcam o trabalho como falho. Guarda os últimos max_jobs
+    trabalhos para consulta.
+    """
+
+    def __init__(self, runner: Callable[[Job], Dict], workers: int = 1, max_jobs: int = 1000):
+        self._runner = runner
+        self._workers = max(1, workers)
+        self._max_jobs = max_jobs
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, job_type: str, params: Optional[Dict] = None) -> Job:
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Tipo de trabalho inválido: {job_type} (opções: {', '.join(JOB_TYPES)})")
+        job = Job(id=uuid.uuid4().hex[:16], type=job_type, params=params or {})
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._ensure_workers()
+        self._queue.put(job)
+        return job
+
+    def _evict(self) -> None:
+        # Descarta os concluídos mais antigos acima do limite
+        excess = len(self._jobs) - self._max_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].state in ("done", "failed"):
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 50) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())[-limit:]
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            while len(self._threads) < self._workers:
+                thread = threading.Thread(target=self._work, name=f"jobs-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.state = "running"
+            job.started_at = datetime.now()
+            try:
+                job.result = self._runner(job)
+                job.state = "failed" if job.result.get('status') in ('failed', 'error') else "done"
+            except Exception as e:
+                job.error = str(e)
+                job.state = "failed"
+            finally:
+                job.finished_at = datetime.now()
+
+    def stop(self) -> None:
+        """Encerra os workers depois dos trabalhos já enfileirados"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,187 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Set
+
+
+def default_worker_id() -> str:
+    """Identificador do processo: host + pid"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseStore:
+    """Reserva de vídeos entre workers/hosts via SQLite no armazenamento compartilhado
+
+    Um worker só envia um vídeo depois de obter o lease; o lease expira se o
+    worker parar de renovar (heartbeat) e então pode ser retomado por outro.
+    Vídeos concluídos ficam com estado 'done' e nunca são reservados de novo.
+    """
+
+    def __init__(self, db_path: str, worker_id: Optional[str] = None, ttl_seconds: float = 300):
+        self.db_path = str(db_path)
+        self.worker_id = worker_id or default_worker_id()
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS leases (
+                    filename TEXT PRIMARY KEY,
+                    channel TEXT,
+                    worker_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_state ON leases (state, channel)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexão por thread; timeout alto para esperar locks de outros hosts
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Transação com lock de escrita imediato (BEGIN IMMEDIATE)"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, filename: str, channel: Optional[str] = None) -> Optional[str]:
+        """Tenta reservar o vídeo
+
+        Retorna 'claimed', 'reclaimed' (lease expirado de outro worker) ou None
+        se o vídeo já foi enviado ou está reservado por outro worker.
+        """
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT worker_id, state, expires_at FROM leases WHERE filename = ?", (filename,)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO leases (filename, channel, worker_id, state, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, 'leased', ?, ?)",
+                    (filename, channel, self.worker_id, expires_at, now)
+                )
+                return 'claimed'
+
+            worker_id, state, current_expiry = row
+            if state == 'done':
+                return None
+            if worker_id != self.worker_id and current_expiry > now:
+                return None
+
+            conn.execute(
+                "UPDATE leases SET worker_id = ?, expires_at = ?, updated_at = ? WHERE filename = ?",
+                (self.worker_id, expires_at, now, filename)
+            )
+            return 'claimed' if worker_id == self.worker_id else 'reclaimed'
+
+    def heartbeat(self, filename: str) -> bool:
+        """Renova o lease; False se ele foi perdido"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ?, updated_at = ? "
+                "WHERE filename = ? AND worker_id = ? AND state = 'leased'",
+                (now + self.ttl_seconds, now, filename, self.worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, filename: str, done: bool = False, channel: Optional[str] = None) -> bool:
+        """Libera o lease; done=True marca o vídeo como enviado
+
+        O 'done' vale pelo nome do arquivo, seja quem for o dono atual: o vídeo
+        já foi publicado e não pode voltar a ser reservado. Retorna False se o
+        lease não era mais deste worker (expirou ou foi retomado por outro).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            if done:
+                row = conn.execute("SELECT worker_id FROM leases WHERE filename = ?", (filename,)).fetchone()
+                conn.execute(
+                    "INSERT INTO leases (filename, channel, worker_id, state, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, 'done', ?, ?) "
+                    "ON CONFLICT (filename) DO UPDATE SET worker_id = excluded.worker_id, state = 'done', "
+                    "expires_at = excluded.expires_at, updated_at = excluded.updated_at",
+                    (filename, channel, self.worker_id, now, now)
+                )
+                return row is not None and row[0] == self.worker_id
+            cursor = conn.execute(
+                "DELETE FROM leases WHERE filename = ? AND worker_id = ? AND state = 'leased'",
+                (filename, self.worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def reset(self, filename: str) -> None:
+        """Apaga o registro do vídeo (inclusive 'done') para que possa ser reservado de novo"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE filename = ?", (filename,))
+
+    def done_filenames(self, channel: Optional[str] = None) -> Set[str]:
+        """Vídeos concluídos por qualquer worker"""
+        conn = self._connection()
+        if channel is None:
+            rows = conn.execute("SELECT filename FROM leases WHERE state = 'done'")
+        else:
+            rows = conn.execute("SELECT filename FROM leases WHERE state = 'done' AND channel = ?", (channel,))
+        return {row[0] for row in rows}
+
+    def reclaim_expired(self) -> int:
+        """Remove leases expirados (workers que morreram); retorna quantos"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM leases WHERE state = 'leased' AND expires_at < ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def active_leases(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM leases WHERE state = 'leased' AND expires_at >= ?", (time.time(),)
+        ).fetchone()
+        return row[0]
+
+    @contextmanager
+    def heartbeat_while(self, filename: str, interval: Optional[float] = None):
+        """Renova o lease em segundo plano enquanto o bloco executa
+
+        Entrega um threading.Event que fica marcado se o lease for perdido
+        (outro worker pode ter retomado o vídeo); quem envia confere antes de
+        registrar o resultado.
+        """
+        interval = interval or max(1.0, self.ttl_seconds / 3)
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    if not self.heartbeat(filename):
+                        print(f"⚠️ Lease perdido para {filename}")
+                        lost.set()
+                        return
+                except Exception as e:
+                    print(f"⚠️ Erro no heartbeat do lease: {e}")
+
+        thread = threading.Thread(target=beat, name=f"lease-{filename}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
@@ -1,24 +1,152 @@
 import os
+import json
 import time
+import threading
 import schedule
-import random
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 from pathlib import Path
 
+from src.channels import resilience
+from src.channels.bandwidth import BandwidthLimiter, SharedBandwidthLimiter
+from src.channels.checkpoints import UploadCheckpoints
+from src.channels.prefetch import Prefetcher
+from src.channels.thumbnails import CHOOSE_TIMEOUT, ThumbnailPicker
+from src.channels.files import atomic_write_json, atomic_write_text
+from src.channels.publish_status import PublishStatusTracker
 from src.channels.publish_shorts import PublishShorts, PlatformAuth
+from src.channels.quota import QuotaBudget
+from src.channels.youtube_batch import YouTubeBatchQueue
+from src.cron_job.analytics import AnalyticsCollector
+from src.cron_job.history import UploadHistory, parse_since
+from src.cron_job.jobs import Job, JobQueue
+from src.cron_job.leases import LeaseStore
+from src.cron_job.selection import VideoPool, create_policy
+from src.cron_job.sharding import AccountSharder
+from src.observability import events, metrics, tracing
+from src.observability.server import LocalServer, json_response
 
 
 class VideoManager:
     """Gerenciador automático de upload de vídeos"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, clock: Optional[Callable[[], datetime]] = None,
+                 publisher: Optional[PublishShorts] = None):
         self.config = config
-        self.publisher = PublishShorts(config['base_path'])
-        self.auth = PlatformAuth(config['auth_config_path'])
+        self.platform = config.get('platform', 'youtube')
+        # Relógio e publicador injetáveis (a simulação usa relógio virtual e uploads falsos)
+        self._clock = clock or datetime.now
+        # Com quota_db_path a quota vale para todos os processos que usam o mesmo arquivo
+        self.quota = QuotaBudget(
+            config.get('quota_db_path') or Path(config['base_path']) / 'quota.db',
+            daily_limits=config.get('quota_limits'),
+            rate_limits=config.get('rate_limits'),
+            clock=self._clock
+        )
+        self.bandwidth = None
+        if config.get('bandwidth_profile'):
+            # Com bandwidth_db_path o limite vale para todos os processos que usam o mesmo arquivo
+            if config.get('bandwidth_db_path'):
+                self.bandwidth = SharedBandwidthLimiter(config['bandwidth_db_path'], config['bandwidth_profile'])
+            else:
+                self.bandwidth = BandwidthLimiter(config['bandwidth_profile'])
+        self.publisher = publisher or PublishShorts(
+            config['base_path'], config.get('network_profile', 'default'), self.quota, self.bandwidth,
+            platform_concurrency=config.get('platform_concurrency')
+        )
+        self.auth = PlatformAuth(config['auth_config_path'], config.get('interactive', True))
+        self.accounts = self.auth.list_accounts(self.platform) or ['default']
+        self.sharder = AccountSharder(
+            self.accounts,
+            policy=config.get('account_policy', 'round_robin'),
+            per_account_concurrency=config.get('account_concurrency', 1),
+            channel_accounts=config.get('channel_accounts'),
+            is_eligible=lambda account: self.quota.can_afford(self.platform, account),
+            load_of=lambda account: self.quota.used(self.platform, account)
+        )
         self.uploaded_videos = self._load_uploaded_list()
+        # Reserva compartilhada: vários hosts podem usar o mesmo base_path
+        self.leases = LeaseStore(
+            config.get('lease_db_path') or Path(config['base_path']) / 'leases.db',
+            worker_id=config.get('worker_id'),
+            ttl_seconds=config.get('lease_ttl_seconds', 300)
+        )
+        # Publicações do TikTok ainda em processamento; rejeições voltam para a fila
+        self.status_tracker = PublishStatusTracker(
+            self.leases.db_path, self.auth, self.quota,
+            on_failed=self._requeue_rejected,
+            poll_interval=config.get('status_poll_seconds', 30)
+        )
+        self.publisher.status_tracker = self.status_tracker
+        # Uploads em chunks interrompidos (queda ou reinício) são retomados do último chunk
+        self.checkpoints = UploadCheckpoints(self.leases.db_path)
+        self.publisher.checkpoints = self.checkpoints
+        # Histórico consultável de todas as tentativas (com retenção e compactação)
+        self.history = UploadHistory(
+            config.get('history_db_path') or Path(config['base_path']) / 'history.db',
+            retention_days=config.get('history_retention_days', 90)
+        )
+        # Playlists e outras chamadas após o upload no YouTube vão em BatchHttpRequest
+        self.youtube_batch = YouTubeBatchQueue(
+            self.auth, self.quota, on_results=self._record_operations,
+            max_batch=config.get('youtube_batch_size', 50),
+            max_delay=config.get('youtube_batch_delay_seconds', 30)
+        )
+        self.publisher.youtube_batch = self.youtube_batch
+        self.publisher.youtube_playlists = list(config.get('youtube_playlists') or [])
+        # Estatísticas dos vídeos publicados (views/likes) coletadas em lote
+        self.analytics = AnalyticsCollector(
+            self.history.db_path, self.auth, self.quota,
+            interval_hours=config.get('analytics_interval_hours', 6),
+            refresh_hours=config.get('analytics_refresh_hours', 12),
+            track_days=config.get('analytics_track_days', 30)
+        )
+        self.pool = VideoPool(create_policy(
+            self._selection_policy_name(), tag_weights=config.get('tag_weights'),
+            weight_fn=self._analytics_weight if config.get('analytics_weights') else None
+        ))
+        self._pool_scanned_mtime: Optional[float] = None
+        self._pool_synced = False
+        # Próximo vídeo já escolhido pela política e aquecido no cache de páginas
+        self._planned_next = None
+        self.prefetcher = Prefetcher(
+            config.get('prefetch_budget_mb', 256), mode=config.get('prefetch_mode', 'fadvise')
+        )
+        # Quadro de capa escolhido por nitidez/exposição (miniatura do YouTube e capa do TikTok)
+        self.thumbnails = ThumbnailPicker(
+            config.get('thumbnail_dir') or Path(config['base_path']) / 'thumbnails',
+            candidates=config.get('thumbnail_candidates', 6),
+            workers=config.get('thumbnail_workers', 2),
+            enabled=config.get('thumbnails_enabled', True),
+            choose_timeout=config.get('thumbnail_timeout_seconds', CHOOSE_TIMEOUT)
+        )
+        self.publisher.thumbnails = self.thumbnails
+        # Contadores mantidos incrementalmente para o status
+        self._uploaded_by_platform = Counter({self.platform: len(self.uploaded_videos)})
+        self._failed_by_platform = Counter()
+        self._in_flight = 0
         self.last_upload_time = None
+        # Upload antecipado: último horário de publicação já agendado
+        self._schedule_state_file = Path(config['base_path']) / 'schedule_state.json'
+        self.last_scheduled_slot = self._load_last_scheduled_slot()
         self._authenticated = False
+        self._authenticated_accounts = set()
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._http_server: Optional[LocalServer] = None
+        # Trabalhos enviados pela API local (n8n e afins)
+        self.jobs = JobQueue(self._run_job, workers=config.get('job_workers', 1))
+        self.tracer = tracing.Tracer(config.get('trace_history', 100))
+        if config.get('profile_output'):
+            self.tracer.profile_next_run(config['profile_output'], config.get('profile_mode', 'cprofile'))
+        events.configure(
+            config.get('event_log_path') or str(Path(config['base_path']) / 'events.jsonl'),
+            level=config.get('log_level', 'INFO'),
+            max_bytes=config.get('log_max_bytes', 10 * 1024 * 1024),
+            backup_count=config.get('log_backup_count', 5)
+        )
         
     def _load_uploaded_list(self) -> set:
         """Carrega lista de vídeos já enviados"""
@@ -31,33 +159,163 @@ class VideoManager:
     def _save_uploaded_video(self, video_filename: str):
         """Salva vídeo na lista de enviados"""
         self.uploaded_videos.add(video_filename)
+        self.pool.mark_uploaded(video_filename)
         uploaded_file = Path(self.config['base_path']) / 'uploaded_videos.txt'
         with open(uploaded_file, 'a') as f:
             f.write(f"{video_filename}\n")
     
+    def _requeue_rejected(self, video_filename: str, publish_id: str) -> None:
+        """Remove da lista de enviados um vídeo rejeitado pela plataforma"""
+        with self._lock:
+            if video_filename not in self.uploaded_videos:
+                return
+            self.uploaded_videos.discard(video_filename)
+            self.pool.requeue(video_filename)
+            self._uploaded_by_platform[self.platform] -= 1
+            self._failed_by_platform[self.platform] += 1
+            uploaded_file = Path(self.config['base_path']) / 'uploaded_videos.txt'
+            atomic_write_text(uploaded_file, "".join(f"{name}\n" for name in sorted(self.uploaded_videos)))
+        self.leases.reset(video_filename)
+        self.history.record(
+            self.config['channel_name'], self.platform, video_filename, 'rejected',
+            remote_id=publish_id, reason='publish_failed', ts=self._clock().timestamp()
+        )
+        print(f"🔁 {video_filename} voltou para a fila")
+        events.log_event("upload.requeued", filename=video_filename, publish_id=publish_id)
+
+    def _analytics_weight(self, tag: str) -> float:
+        """Peso configurado da tag ajustado pelo desempenho medido no canal"""
+        configured = (self.config.get('tag_weights') or {}).get(tag, 1.0)
+        return configured * self.analytics.tag_weight(tag, self.config['channel_name'])
+    
+    def _scan_videos(self, channel_name: str) -> Iterator:
+        """Varre o diretório do canal sob demanda (o pool consome sem montar lista) registrando a duração"""
+        started = time.perf_counter()
+        with tracing.span("scan"):
+            yield from self.publisher.iter_video_files(channel_name)
+        metrics.SCAN_DURATION.observe(time.perf_counter() - started, channel=channel_name)
+    
+    def _selection_policy_name(self) -> str:
+        """Política configurada; random_selection mantém compatibilidade"""
+        if self.config.get('selection_policy'):
+            return self.config['selection_policy']
+        return 'random' if self.config.get('random_selection', True) else 'ordered'
+    
+    def _refresh_pool(self, channel_name: str, force: bool = False) -> None:
+        """Atualiza o pool só quando o diretório do canal mudou"""
+        channel_path = Path(self.config['base_path']) / channel_name
+        try:
+            mtime = channel_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        
+        if not force and mtime is not None and mtime == self._pool_scanned_mtime:
+            return
+        
+        videos = self._scan_videos(channel_name)
+        reclaimed = self.leases.reclaim_expired()
+        if reclaimed:
+            events.log_event("lease.reclaimed", channel=channel_name, count=reclaimed)
+        # Vídeos concluídos por outros hosts também ficam fora do pool
+        done_elsewhere = self.leases.done_filenames(channel_name)
+        self.uploaded_videos.update(done_elsewhere)
+        changes = self.pool.sync(videos, excluded=self.uploaded_videos)
+        self._pool_scanned_mtime = mtime
+        self._pool_synced = True
+        if changes['added'] or changes['removed']:
+            events.log_event("pool.synced", "DEBUG", channel=channel_name, **changes)
+        metrics.QUEUE_DEPTH.set(self.pool.available, channel=channel_name)
+    
+    def sync_pool(self) -> None:
+        """Varre o diretório do canal agora (se mudou), para o status sair com os totais"""
+        with self._lock:
+            self._refresh_pool(self.config['channel_name'])
+    
     def _get_next_video(self, channel_name: str) -> Optional[object]:
-        """Seleciona próximo vídeo para upload"""
-        videos = self.publisher.get_video_files(channel_name)
+        """Seleciona próximo vídeo para upload (o vídeo sai do pool até ser devolvido)"""
+        self._refresh_pool(channel_name)
         
-        if not videos:
+        if not self.pool.total:
             print("❌ Nenhum vídeo disponível")
             return None
         
-        # Filtrar vídeos não enviados
-        available_videos = [
-            video for video in videos 
-            if video.filename not in self.uploaded_videos
-        ]
+        with tracing.span("selection"):
+            video = self._claim_next(channel_name)
+        metrics.QUEUE_DEPTH.set(self.pool.available, channel=channel_name)
         
-        if not available_videos:
+        if not video:
             print("❌ Todos os vídeos já foram enviados")
-            return None
+        return video
+    
+    def _claim_next(self, channel_name: str) -> Optional[object]:
+        """Escolhe o próximo vídeo cujo lease consiga ser obtido"""
+        # Primeiro os uploads interrompidos, enquanto a sessão ainda vale
+        for filename in self.checkpoints.pending(self.platform):
+            candidate = self.pool.take(filename)
+            if candidate is None:
+                continue
+            if self.leases.claim(filename, channel_name):
+                events.log_event("upload.resuming", filename=filename)
+                self._plan_next()
+                return candidate
+            self.pool.put_back(candidate)
         
-        # Selecionar vídeo aleatório ou por ordem
-        if self.config.get('random_selection', True):
-            return random.choice(available_videos)
-        else:
-            return available_videos[0]
+        planned, self._planned_next = self._planned_next, None
+        if planned is not None:
+            if self.pool.take(planned.filename) is not None:
+                if self.leases.claim(planned.filename, channel_name):
+                    self._plan_next()
+                    return planned
+                self.pool.put_back(planned)
+            # Enviado por outra via ou reservado por outro worker: escolhe de novo
+            self.prefetcher.release(planned.file_path)
+        
+        leased_elsewhere = []
+        video = None
+        done_elsewhere = None
+        try:
+            for _ in range(self.pool.available):
+                candidate = self.pool.pick()
+                if candidate is None:
+                    break
+                claim = self.leases.claim(candidate.filename, channel_name)
+                if claim:
+                    if claim == 'reclaimed':
+                        events.log_event("lease.taken_over", filename=candidate.filename)
+                    video = candidate
+                    break
+                if done_elsewhere is None:
+                    # Uma consulta só, feita na primeira reserva recusada
+                    done_elsewhere = self.leases.done_filenames(channel_name)
+                if candidate.filename in done_elsewhere:
+                    # Enviado por outro host depois da última varredura
+                    self.uploaded_videos.add(candidate.filename)
+                    self.pool.mark_uploaded(candidate.filename)
+                else:
+                    leased_elsewhere.append(candidate)
+        finally:
+            for candidate in leased_elsewhere:
+                self.pool.put_back(candidate)
+        if video is not None:
+            self._plan_next()
+        return video
+    
+    def _plan_next(self) -> None:
+        """Escolhe já o vídeo seguinte (pela mesma política) e o prepara enquanto o atual sobe
+
+        O arquivo é aquecido no cache de páginas e a miniatura é escolhida em
+        segundo plano, então o próximo upload já começa com as duas prontas.
+        """
+        if not (self.prefetcher.enabled or self.thumbnails.enabled) or self._planned_next is not None:
+            return
+        candidate = self.pool.pick()
+        if candidate is None:
+            return
+        # Continua disponível no pool; a próxima seleção o retira primeiro
+        self.pool.put_back(candidate)
+        self._planned_next = candidate
+        self.prefetcher.schedule(candidate.file_path)
+        self.thumbnails.schedule(candidate.file_path)
     
     def _check_upload_interval(self) -> bool:
         """Verifica se é hora de fazer upload"""
@@ -65,111 +323,491 @@ class VideoManager:
             return True
         
         interval_hours = self.config.get('upload_interval_hours', 24)
-        time_since_last = datetime.now() - self.last_upload_time
+        time_since_last = self._clock() - self.last_upload_time
         
         return time_since_last >= timedelta(hours=interval_hours)
     
     def _should_upload_now(self) -> bool:
         """Verifica se deve fazer upload agora baseado no horário"""
-        current_hour = datetime.now().hour
+        current_hour = self._clock().hour
         start_hour = self.config.get('upload_start_hour', 9)
         end_hour = self.config.get('upload_end_hour', 18)
         
         return start_hour <= current_hour <= end_hour
     
-    def upload_next_video(self):
-        """Faz upload do próximo vídeo"""
+    def upload_next_video(self, force: bool = False) -> dict:
+        """Faz upload do próximo vídeo; force ignora intervalo e horário"""
+        with events.correlation() as correlation_id, self.tracer.run(correlation_id):
+            result = self._upload_next_video(force)
+        result['correlation_id'] = correlation_id
+        return result
+    
+    def _circuit_open(self) -> bool:
+        """Endpoint da plataforma fora do ar: não insiste até o circuito liberar um teste"""
+        open_circuits = resilience.RESILIENCE.open_circuits(f"{self.platform}.")
+        if not open_circuits:
+            return False
+        wait = max(open_circuits.values())
+        print(f"🔌 {self.platform} indisponível ({', '.join(open_circuits)}); nova tentativa em {wait:.0f}s")
+        events.log_event(
+            "upload.skipped", reason="circuit_open", platform=self.platform,
+            endpoints=list(open_circuits), wait=round(wait, 1)
+        )
+        return True
+    
+    def upload_video_by_name(self, filename: str, publish_at: Optional[datetime] = None) -> dict:
+        """Envia agora um vídeo específico do canal (ignora intervalo e horário)"""
+        with events.correlation() as correlation_id, self.tracer.run(correlation_id):
+            result = self._upload_video_by_name(filename, publish_at)
+        result['correlation_id'] = correlation_id
+        return result
+    
+    def _upload_video_by_name(self, filename: str, publish_at: Optional[datetime] = None) -> dict:
+        channel_name = self.config['channel_name']
+        result = {'filename': filename, 'platform': self.platform}
+        with self._lock:
+            self._refresh_pool(channel_name)
+            if self.pool.state_of(filename) == 'unknown':
+                # Arquivo recém-copiado: força nova varredura antes de desistir
+                self._refresh_pool(channel_name, force=True)
+            state = self.pool.state_of(filename)
+            if state == 'unknown':
+                return {**result, 'status': 'failed', 'reason': 'not_found'}
+            if state == 'uploaded':
+                return {**result, 'status': 'skipped', 'reason': 'already_uploaded'}
+            video = self.pool.take(filename)
+            if video is None:
+                return {**result, 'status': 'skipped', 'reason': 'in_progress'}
+            claim = self.leases.claim(filename, channel_name)
+            if not claim:
+                self.pool.put_back(video)
+                return {**result, 'status': 'skipped', 'reason': 'leased_elsewhere'}
+        
+        if self._circuit_open():
+            self._return_to_pool(video)
+            return {**result, 'status': 'skipped', 'reason': 'circuit_open'}
+        return self._upload_video(video, publish_at)
+    
+    def _run_job(self, job: Job) -> dict:
+        """Executa um trabalho da fila da API"""
+        if job.type == 'video':
+            publish_at = job.params.get('publish_at')
+            return self.upload_video_by_name(
+                job.params['filename'], datetime.fromisoformat(publish_at) if publish_at else None
+            )
+        return self.upload_next_video(force=job.params.get('force', True))
+    
+    def _handle_job_submit(self, path: str, query: dict, body: bytes):
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Corpo deve ser um objeto JSON")
+            job_type = payload.pop('type', 'video' if 'filename' in payload else 'run')
+            if job_type == 'video' and not payload.get('filename'):
+                raise ValueError("Campo 'filename' obrigatório")
+            if payload.get('publish_at'):
+                datetime.fromisoformat(payload['publish_at'])
+            job = self.jobs.submit(job_type, payload)
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        events.log_event("job.queued", job_id=job.id, type=job.type, **job.params)
+        return json_response(job.to_dict(), 202)
+    
+    def _handle_job_get(self, path: str, query: dict, body: bytes):
+        job = self.jobs.get(path.rsplit('/', 1)[-1])
+        if job is None:
+            return json_response({'error': 'job not found'}, 404)
+        return json_response(job.to_dict())
+    
+    def _handle_job_list(self, path: str, query: dict, body: bytes):
+        try:
+            limit = int(query.get('limit', ['50'])[0])
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        return json_response({
+            'pending': self.jobs.pending(),
+            'jobs': [job.to_dict() for job in self.jobs.recent(limit)]
+        })
+    
+    def _handle_runs(self, path: str, query: dict, body: bytes):
+        try:
+            limit = int(query.get('limit', ['20'])[0])
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        return json_response({'runs': self.tracer.recent_runs(limit), 'stages': self.tracer.stage_summary()})
+    
+    def _handle_history(self, path: str, query: dict, body: bytes):
+        """GET /history?channel=&platform=&outcome=&since=7d&limit=&summary=1"""
+        params = {key: values[0] for key, values in query.items()}
+        try:
+            since = parse_since(params['since']) if params.get('since') else None
+            filters = {key: params.get(key) for key in ('channel', 'platform', 'outcome', 'account')}
+            if params.get('summary'):
+                group_by = params.get('group_by', 'channel,platform,outcome').split(',')
+                return json_response({'summary': self.history.summary(group_by, since=since, **filters)})
+            limit = int(params.get('limit', 100))
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        return json_response({'uploads': self.history.query(since=since, limit=limit, **filters)})
+    
+    def _has_budget(self) -> bool:
+        """Verifica quota diária e limite de taxa da plataforma (em alguma conta)"""
+        if not self.sharder.has_eligible(self.config['channel_name']):
+            print(f"⛽ Quota diária do {self.platform} esgotada em todas as contas")
+            events.log_event("upload.skipped", reason="quota", platform=self.platform)
+            return False
+        
+        wait = min(self.quota.rate_wait(f"{self.platform}.init", account) for account in self.accounts)
+        if wait > 0:
+            print(f"⏳ Limite de taxa do {self.platform}: aguardar {wait:.0f}s")
+            events.log_event("upload.skipped", reason="rate_limit", platform=self.platform, wait=wait)
+            return False
+        return True
+    
+    def _upload_ahead_enabled(self) -> bool:
+        """Upload antecipado só existe onde a API aceita publicação agendada"""
+        return bool(self.config.get('upload_ahead')) and self.publisher.adapter(self.platform).supports_scheduling
+    
+    def _load_last_scheduled_slot(self) -> Optional[datetime]:
+        if not self._schedule_state_file.exists():
+            return None
+        try:
+            with open(self._schedule_state_file, 'r') as f:
+                value = json.load(f).get('last_scheduled_slot')
+            return datetime.fromisoformat(value) if value else None
+        except Exception as e:
+            print(f"⚠️ Estado de agendamento inválido: {e}")
+            return None
+    
+    def _save_last_scheduled_slot(self, slot: datetime) -> None:
+        self.last_scheduled_slot = slot
+        atomic_write_json(self._schedule_state_file, {'last_scheduled_slot': slot.isoformat()})
+    
+    def _next_publish_slot(self, now: datetime) -> datetime:
+        """Próximo horário de publicação livre, seguindo intervalo e janela"""
+        return next_publish_slot(
+            self.last_scheduled_slot, now,
+            self.config.get('upload_start_hour', 9),
+            self.config.get('upload_end_hour', 18),
+            self.config.get('upload_interval_hours', 24)
+        )
+    
+    def _upload_next_video(self, force: bool = False) -> dict:
         try:
-            print(f"\n🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Verificando upload...")
+            print(f"\n🕐 {self._clock().strftime('%Y-%m-%d %H:%M:%S')} - Verificando upload...")
+            
+            if self._upload_ahead_enabled() and not force:
+                return self._upload_ahead()
             
             # Verificar intervalos
-            if not self._check_upload_interval():
+            if not force and not self._check_upload_interval():
                 print("⏰ Ainda não é hora de fazer upload")
-                return
+                events.log_event("upload.skipped", "DEBUG", reason="interval")
+                return {'status': 'skipped', 'reason': 'interval'}
             
-            if not self._should_upload_now():
+            if not force and not self._should_upload_now():
                 print("⏰ Fora do horário de upload")
-                return
+                events.log_event("upload.skipped", "DEBUG", reason="window")
+                return {'status': 'skipped', 'reason': 'window'}
+            
+            # Consultar circuito e quota antes de escolher (evita chamadas fadadas a falhar)
+            if self._circuit_open():
+                return {'status': 'skipped', 'reason': 'circuit_open'}
+            if not self._has_budget():
+                return {'status': 'skipped', 'reason': 'quota'}
             
             # Selecionar vídeo
             channel_name = self.config['channel_name']
-            video = self._get_next_video(channel_name)
+            with self._lock:
+                video = self._get_next_video(channel_name)
             
             if not video:
-                return
-            
+                events.log_event("upload.skipped", reason="no_video", channel=channel_name)
+                return {'status': 'skipped', 'reason': 'no_video'}
+        except Exception as e:
+            print(f"❌ Erro no upload: {e}")
+            events.log_event("upload.error", "ERROR", error=str(e))
+            return {'status': 'error', 'error': str(e)}
+        
+        return self._upload_video(video)
+    
+    def _upload_ahead(self) -> dict:
+        """Envia fora do horário de pico, agendando a publicação no próximo slot livre"""
+        now = self._clock()
+        slot = self._next_publish_slot(now)
+        horizon = timedelta(hours=self.config.get('upload_ahead_hours', 24))
+        if slot - now > horizon:
+            print(f"🗓️ Agenda preenchida; próximo slot livre em {slot:%Y-%m-%d %H:%M}")
+            events.log_event("upload.skipped", "DEBUG", reason="schedule_full", next_slot=slot)
+            return {'status': 'skipped', 'reason': 'schedule_full', 'next_slot': slot}
+        
+        # Dentro da janela a banda fica livre; só envia se o slot não puder esperar o fim do pico
+        min_lead = timedelta(minutes=self.config.get('upload_ahead_min_lead_minutes', 15))
+        if self._should_upload_now():
+            peak_end = now.replace(minute=0, second=0, microsecond=0) + timedelta(
+                hours=self.config.get('upload_end_hour', 18) - now.hour + 1
+            )
+            if slot - min_lead >= peak_end:
+                print(f"⏰ Horário de pico; o envio para {slot:%Y-%m-%d %H:%M} fica para depois das {peak_end:%H:%M}")
+                events.log_event("upload.skipped", "DEBUG", reason="peak", next_slot=slot)
+                return {'status': 'skipped', 'reason': 'peak', 'next_slot': slot}
+        
+        if self._circuit_open():
+            return {'status': 'skipped', 'reason': 'circuit_open'}
+        if not self._has_budget():
+            return {'status': 'skipped', 'reason': 'quota'}
+        
+        channel_name = self.config['channel_name']
+        with self._lock:
+            video = self._get_next_video(channel_name)
+        if not video:
+            events.log_event("upload.skipped", reason="no_video", channel=channel_name)
+            return {'status': 'skipped', 'reason': 'no_video'}
+        
+        # Slot já chegando: publica direto (publishAt precisa estar no futuro)
+        publish_at = slot if slot - now >= min_lead else None
+        result = self._upload_video(video, publish_at)
+        if result['status'] == 'uploaded':
+            self._save_last_scheduled_slot(slot)
+            result['publish_at'] = slot
+        return result
+    
+    def fill_ahead(self) -> List[dict]:
+        """Upload antecipado: envia em sequência até a agenda preencher o horizonte"""
+        results = []
+        while not self._stop_event.is_set():
+            result = self.upload_next_video()
+            results.append(result)
+            if result['status'] != 'uploaded':
+                break
+        return results
+    
+    def _upload_video(self, video, publish_at: Optional[datetime] = None) -> dict:
+        """Valida, autentica e envia um vídeo já retirado do pool"""
+        channel_name = self.config['channel_name']
+        account = self.sharder.acquire(channel_name)
+        if account is None:
+            self._return_to_pool(video)
+            events.log_event("upload.skipped", reason="quota", platform=self.platform, filename=video.filename)
+            return {'filename': video.filename, 'platform': self.platform, 'status': 'skipped', 'reason': 'quota'}
+        
+        with self._lock:
+            self._in_flight += 1
+        try:
+            result = self._upload_with_account(video, account, publish_at)
+        finally:
+            self.sharder.release(account)
+            with self._lock:
+                self._in_flight -= 1
+        
+        with self._lock:
+            if result['status'] == 'uploaded':
+                self._uploaded_by_platform[self.platform] += 1
+            elif result['status'] in ('failed', 'error'):
+                self._failed_by_platform[self.platform] += 1
+        self._record_history(result)
+        return result
+    
+    def _record_operations(self, rows: List[dict]) -> None:
+        """Resultados das chamadas em lote vão para o histórico do vídeo"""
+        now = self._clock().timestamp()
+        self.history.record_operations(
+            [{**row, 'channel': self.config['channel_name'], 'ts': now} for row in rows]
+        )
+    
+    def _record_history(self, result: dict) -> None:
+        """Grava a tentativa no histórico; falha no histórico não derruba o upload"""
+        try:
+            self.history.record(
+                self.config['channel_name'], self.platform, result['filename'], result['status'],
+                account=result.get('account'),
+                remote_id=result.get('remote_id'),
+                size_bytes=result.get('bytes', 0),
+                duration=result.get('duration'),
+                reason=result.get('reason') or result.get('error'),
+                ts=self._clock().timestamp()
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar histórico: {e}")
+            events.log_event("history.error", "WARNING", filename=result['filename'], error=str(e))
+    
+    def _upload_with_account(self, video, account: str, publish_at: Optional[datetime] = None) -> dict:
+        channel_name = self.config['channel_name']
+        result = {'filename': video.filename, 'platform': self.platform, 'account': account}
+        try:
             print(f"🎬 Vídeo selecionado: {video.title}")
             print(f"   📁 Arquivo: {video.filename}")
             print(f"   📏 Tamanho: {video.size_mb} MB")
+            events.log_event(
+                "upload.selected", channel=channel_name, filename=video.filename, size_mb=video.size_mb
+            )
             
             # Validar vídeo
-            validation = self.publisher.validate_video(video)
+            with tracing.span("validation"):
+                validation = self.publisher.validate_video(video)
             if not validation["ready_for_upload"]:
+                failed_checks = [k for k, v in validation.items() if not v and k != "ready_for_upload"]
+                for check in failed_checks:
+                    metrics.VALIDATION_FAILURES.inc(check=check)
                 print("❌ Vídeo não está pronto para upload")
-                return
+                self._return_to_pool(video)
+                events.log_event(
+                    "upload.validation_failed", "WARNING", filename=video.filename, checks=failed_checks
+                )
+                return {**result, 'status': 'skipped', 'reason': 'validation', 'checks': failed_checks}
             
             # Verificar autenticação
-            if not self.check_authentication():
+            with tracing.span("auth"):
+                authenticated = self.check_authentication(account)
+            if not authenticated:
                 print("❌ Falha na autenticação. Execute a configuração inicial.")
-                return
+                self._return_to_pool(video)
+                events.log_event("upload.auth_failed", "ERROR", platform=self.platform, account=account)
+                return {**result, 'status': 'failed', 'reason': 'auth'}
             
             # Preparar metadados
-            metadata = self.publisher.prepare_for_upload(video, "youtube")
+            with tracing.span("metadata"):
+                metadata = self.publisher.adapter(self.platform).prepare(video, publish_at)
             print(f"📝 Título: {metadata['title']}")
             print(f"📝 Tags: {', '.join(metadata['tags'])}")
             
             # Fazer upload
             print("📤 Iniciando upload...")
-            success = self.publisher.upload_video(video, "youtube", self.auth)
+            events.log_event("upload.started", platform=self.platform, account=account, filename=video.filename)
+            self.prefetcher.consume(video.file_path)
+            with tracing.span("transfer"), self.leases.heartbeat_while(video.filename) as lease_lost:
+                success = self.publisher.upload_video(video, self.platform, self.auth, account, publish_at)
+            if lease_lost.is_set():
+                # Outro worker pode ter retomado o vídeo durante o envio
+                events.log_event(
+                    "lease.lost", "ERROR", filename=video.filename, uploaded=bool(success),
+                    remote_id=getattr(success, 'remote_id', None)
+                )
+            result.update({
+                'remote_id': getattr(success, 'remote_id', None),
+                'bytes': getattr(success, 'size_bytes', 0),
+                'duration': round(getattr(success, 'seconds', 0.0), 3)
+            })
             
             if success:
                 print("✅ Upload realizado com sucesso!")
-                self._save_uploaded_video(video.filename)
-                self.last_upload_time = datetime.now()
-                
-                # Log do upload
-                log_entry = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {video.title} - {video.filename}"
-                self._log_upload(log_entry)
-            else:
-                print("❌ Falha no upload")
+                with self._lock:
+                    self._save_uploaded_video(video.filename)
+                    owned = self.leases.release(video.filename, done=True, channel=channel_name)
+                    self.last_upload_time = self._clock()
+                if not owned and not lease_lost.is_set():
+                    events.log_event("lease.lost", "ERROR", filename=video.filename, uploaded=True,
+                                     remote_id=result['remote_id'])
+                events.log_event(
+                    "upload.succeeded", platform=self.platform, account=account, channel=channel_name,
+                    filename=video.filename, title=video.title, remote_id=result['remote_id']
+                )
+                return {**result, 'status': 'uploaded'}
+            
+            print("❌ Falha no upload")
+            self._return_to_pool(video)
+            events.log_event("upload.failed", "ERROR", platform=self.platform, filename=video.filename)
+            return {**result, 'status': 'failed', 'reason': 'upload'}
                 
         except Exception as e:
             print(f"❌ Erro no upload: {e}")
-            self._log_error(f"Erro no upload: {e}")
-    
-    def _log_upload(self, message: str):
-        """Registra log de upload"""
-        log_file = Path(self.config['base_path']) / 'upload_log.txt'
-        with open(log_file, 'a') as f:
-            f.write(f"{message}\n")
+            if video.filename not in self.uploaded_videos:
+                self._return_to_pool(video)
+            events.log_event("upload.error", "ERROR", filename=video.filename, error=str(e))
+            return {**result, 'status': 'error', 'error': str(e)}
     
-    def _log_error(self, message: str):
-        """Registra log de erro"""
-        error_file = Path(self.config['base_path']) / 'error_log.txt'
-        with open(error_file, 'a') as f:
-            f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
+    def _return_to_pool(self, video) -> None:
+        with self._lock:
+            self.pool.put_back(video)
+        try:
+            self.leases.release(video.filename)
+        except Exception as e:
+            print(f"⚠️ Erro ao liberar lease: {e}")
     
-    def get_status(self) -> dict:
-        """Retorna status do gerenciador"""
+    def upload_batch(self, count: int, concurrency: Optional[int] = None) -> List[dict]:
+        """Envia até `count` vídeos em paralelo, ignorando intervalo e horário
+
+        Sem concurrency, usa uma vaga por conta (account_concurrency por conta).
+        """
+        if not concurrency:
+            concurrency = self.sharder.total_concurrency
         channel_name = self.config['channel_name']
-        videos = self.publisher.get_video_files(channel_name)
-        available_videos = [
-            video for video in videos 
-            if video.filename not in self.uploaded_videos
-        ]
+        remaining = count
+        attempted = set()
+        # Já tentados neste lote e escolhidos de novo pela política; voltam ao pool no fim
+        set_aside = []
         
-        return {
-            'total_videos': len(videos),
-            'uploaded_videos': len(self.uploaded_videos),
-            'available_videos': len(available_videos),
-            'last_upload': self.last_upload_time,
-            'next_upload_in': self._get_next_upload_time()
-        }
+        def worker() -> List[dict]:
+            nonlocal remaining
+            results = []
+            while not self._stop_event.is_set():
+                with self._lock:
+                    if remaining <= 0:
+                        return results
+                    remaining -= 1
+                
+                with events.correlation() as correlation_id, self.tracer.run(correlation_id):
+                    if self._circuit_open():
+                        results.append({'status': 'skipped', 'reason': 'circuit_open'})
+                        return results
+                    if not self._has_budget():
+                        results.append({'status': 'skipped', 'reason': 'quota'})
+                        return results
+                    with self._lock:
+                        video = self._get_next_video(channel_name)
+                        # Devolvido ao pool nesta rodada (ex.: falhou na validação): fica de lado
+                        while video is not None and video.filename in attempted:
+                            set_aside.append(video)
+                            video = self._get_next_video(channel_name)
+                        if video is not None:
+                            attempted.add(video.filename)
+                    if video is None:
+                        results.append({'status': 'skipped', 'reason': 'no_video'})
+                        return results
+                    result = self._upload_video(video)
+                result['correlation_id'] = correlation_id
+                results.append(result)
+            return results
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="upload") as executor:
+            futures = [executor.submit(worker) for _ in range(max(1, min(concurrency, count)))]
+            results = [result for future in futures for result in future.result()]
+        for video in set_aside:
+            self._return_to_pool(video)
+        self.youtube_batch.flush()
+        return results
+    
+    def get_status(self) -> dict:
+        """Retorna status do gerenciador a partir dos contadores (sem tocar no disco)
+
+        Antes da primeira varredura do pool (pool_synced False) os totais ainda
+        estão zerados.
+        """
+        with self._lock:
+            return {
+                'pool_synced': self._pool_synced,
+                'total_videos': self.pool.total,
+                'uploaded_videos': len(self.uploaded_videos),
+                'uploaded_by_platform': dict(self._uploaded_by_platform),
+                'available_videos': self.pool.available,
+                'in_flight': self._in_flight,
+                'jobs_pending': self.jobs.pending(),
+                'failed': dict(self._failed_by_platform),
+                'last_upload': self.last_upload_time,
+                'next_upload_in': self._get_next_upload_time(),
+                'scheduled_until': self.last_scheduled_slot,
+                'quota': self.quota.snapshot(),
+                'platform': self.publisher.platform_status(self.platform),
+                'circuits': resilience.RESILIENCE.snapshot(),
+                'tag_scores': self.analytics.cached_tag_scores(self.config['channel_name'])
+            }
     
     def _get_next_upload_time(self) -> Optional[datetime]:
         """Calcula próxima data de upload"""
+        if self._upload_ahead_enabled():
+            return self._next_publish_slot(self._clock())
         if not self.last_upload_time:
-            return datetime.now()
+            return self._clock()
         
         interval_hours = self.config.get('upload_interval_hours', 24)
         return self.last_upload_time + timedelta(hours=interval_hours)
@@ -193,33 +831,74 @@ class VideoManager:
             print(f"❌ Erro na configuração: {e}")
             return False
     
-    def check_authentication(self) -> bool:
-        """Verifica se está autenticado"""
-        if self._authenticated:
+    def check_authentication(self, account: Optional[str] = None) -> bool:
+        """Verifica se está autenticado (na conta indicada ou na principal)"""
+        primary = account is None or account == self.accounts[0]
+        if (primary and self._authenticated) or account in self._authenticated_accounts:
             return True
         
         # Tentar autenticar automaticamente
         try:
-            success = self.auth.authenticate_youtube()
+            success = self.publisher.adapter(self.platform).authenticate(self.auth, account)
             if success:
-                self._authenticated = True
+                if primary:
+                    self._authenticated = True
+                if account is not None:
+                    self._authenticated_accounts.add(account)
                 return True
         except Exception:
             pass
         
         return False
     
+    def start_http_server(self) -> Optional[LocalServer]:
+        """Inicia o endpoint HTTP local (/metrics, /status, /runs, /jobs, /history) se configurado"""
+        port = self.config.get('http_port')
+        if port is None:
+            return None
+        if self._http_server is None:
+            self._http_server = LocalServer(
+                self.config.get('http_host', '127.0.0.1'), port, token=self.config.get('http_token')
+            )
+            self._http_server.route(
+                'GET', '/metrics',
+                lambda path, query, body: (200, metrics.CONTENT_TYPE, metrics.REGISTRY.render().encode('utf-8'))
+            )
+            self._http_server.route(
+                'GET', '/status',
+                lambda path, query, body: json_response(self.get_status())
+            )
+            self._http_server.route('GET', '/runs', self._handle_runs)
+            self._http_server.route('POST', '/jobs', self._handle_job_submit)
+            self._http_server.route('GET', '/jobs/', self._handle_job_get)
+            self._http_server.route('GET', '/history', self._handle_history)
+            self._http_server.route('GET', '/jobs', self._handle_job_list)
+            self._http_server.start()
+        return self._http_server
+    
     def start_scheduler(self):
         """Inicia o agendador automático"""
+        self.start_http_server()
+        if self.platform == 'tiktok':
+            self.status_tracker.start()
+        elif self.platform == 'youtube' and self.config.get('analytics_enabled', True):
+            self.analytics.start()
         print("🚀 Iniciando gerenciador automático de vídeos")
         print(f"📁 Pasta: {self.config['base_path']}")
         print(f"⏰ Intervalo: {self.config.get('upload_interval_hours', 24)} horas")
         print(f"🕐 Horário: {self.config.get('upload_start_hour', 9)}h às {self.config.get('upload_end_hour', 18)}h")
         
         # Agendar uploads
-        schedule.every(self.config.get('upload_interval_hours', 24)).hours.do(self.upload_next_video)
+        if self._upload_ahead_enabled():
+            # Checagem frequente: a agenda é preenchida assim que o pico acaba
+            schedule.every(self.config.get('upload_ahead_check_minutes', 30)).minutes.do(self.fill_ahead)
+        else:
+            schedule.every(self.config.get('upload_interval_hours', 24)).hours.do(self.upload_next_video)
+        # Retenção do histórico: tentativas antigas viram totais diários
+        schedule.every(1).days.do(self.compact_history)
         
         # Verificar status inicial
+        self.sync_pool()
         status = self.get_status()
         print(f"\n📊 Status inicial:")
         print(f"   Total de vídeos: {status['total_videos']}")
@@ -228,16 +907,75 @@ class VideoManager:
         
         # Loop principal
         try:
-            while True:
+            while not self._stop_event.is_set():
                 schedule.run_pending()
-                time.sleep(60)  # Verificar a cada minuto
+                # Mantém o pool (e o status) em dia; só varre se o diretório mudou
+                with self._lock:
+                    self._refresh_pool(self.config['channel_name'])
+                self._stop_event.wait(60)  # Verificar a cada minuto
+            # stop() só interrompe o loop; o upload da vez já terminou aqui
+            self.drain()
+            print("\n⏹️ Gerenciador encerrado")
         except KeyboardInterrupt:
             print("\n⏹️ Gerenciador interrompido pelo usuário")
     
-    def run_once(self):
+    def compact_history(self) -> int:
+        """Aplica a retenção do histórico"""
+        removed = self.history.compact(now=self._clock().timestamp())
+        if removed:
+            print(f"🗜️ Histórico compactado: {removed} tentativas antigas")
+            events.log_event("history.compacted", removed=removed)
+        return removed
+    
+    def stop(self):
+        """Pede o encerramento do agendador e de lotes em andamento (seguro no handler de sinal)
+
+        Uploads em andamento continuam até o fim; drain() espera por eles.
+        """
+        self._stop_event.set()
+        self.status_tracker.stop()
+        self.analytics.stop()
+        self.prefetcher.stop()
+    
+    def drain(self):
+        """Depois dos uploads: conclui os trabalhos da API e envia as chamadas adiadas"""
+        self.jobs.stop()
+        self.thumbnails.stop()
+        # Por último: os uploads acima ainda enfileiram playlistItems.insert
+        self.youtube_batch.stop()
+    
+    def run_once(self, force: bool = False) -> dict:
         """Executa upload uma única vez"""
         print("🎬 Executando upload único...")
-        self.upload_next_video()
+        if self.platform == 'tiktok':
+            # Sem o daemon, o status das publicações anteriores é conferido aqui
+            self.status_tracker.poll_once()
+        result = self.upload_next_video(force)
+        # O processo termina em seguida: as chamadas adiadas não podem esperar o lote
+        self.youtube_batch.flush()
+        return result
+
+
+def next_publish_slot(
+    previous: Optional[datetime],
+    now: datetime,
+    start_hour: int,
+    end_hour: int,
+    interval_hours: float
+) -> datetime:
+    """Calcula o próximo horário de publicação
+
+    Segue o intervalo a partir do último slot agendado e empurra o resultado
+    para dentro da janela [start_hour, end_hour] (mesma regra do modo normal).
+    """
+    candidate = previous + timedelta(hours=interval_hours) if previous else now
+    candidate = max(candidate, now).replace(second=0, microsecond=0)
+    
+    if candidate.hour < start_hour:
+        candidate = candidate.replace(hour=start_hour, minute=0)
+    elif candidate.hour > end_hour:
+        candidate = (candidate + timedelta(days=1)).replace(hour=start_hour, minute=0)
+    return candidate
 
 
 def create_config(
@@ -247,7 +985,10 @@ def create_config(
     upload_start_hour: int = 9,
     upload_end_hour: int = 18,
     random_selection: bool = True,
-    auth_config_path: str = "src/channels/auth_config.json"
+    auth_config_path: str = "src/channels/auth_config.json",
+    http_port: Optional[int] = None,
+    selection_policy: Optional[str] = None,
+    platform: str = "youtube"
 ) -> dict:
     """Cria configuração para o gerenciador"""
     return {
@@ -257,10 +998,33 @@ def create_config(
         'upload_start_hour': upload_start_hour,
         'upload_end_hour': upload_end_hour,
         'random_selection': random_selection,
-        'auth_config_path': auth_config_path
+        'auth_config_path': auth_config_path,
+        'http_port': http_port,
+        'selection_policy': selection_policy,
+        'platform': platform
     }
 
 
+def load_config(path: str) -> dict:
+    """Carrega configuração de um arquivo JSON (campos ausentes usam o padrão)"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    
+    missing = [key for key in ('base_path', 'channel_name') if key not in data]
+    if missing:
+        raise ValueError(f"Configuração sem campos obrigatórios: {', '.join(missing)}")
+    
+    config = create_config(data['base_path'], data['channel_name'])
+    config.update(data)
+    return config
+
+
+def save_config(config: dict, path: str) -> None:
+    """Salva configuração em arquivo JSON para uso não interativo"""
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+
 def main():
     """Função principal para executar o gerenciador"""
     # Configurações
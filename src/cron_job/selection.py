@@ -0,0 +1,304 @@
+import heapq
+import itertools
+import random
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class SelectionPolicy:
+    """Estrutura que mantém os vídeos disponíveis e define a ordem de escolha"""
+
+    def add(self, video) -> None:
+        raise NotImplementedError
+
+    def remove(self, filename: str) -> bool:
+        """Retira o vídeo; False se ele não estava disponível"""
+        raise NotImplementedError
+
+    def pick(self):
+        """Escolhe e remove o próximo vídeo (None se vazio)"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class RandomPolicy(SelectionPolicy):
+    """Escolha aleatória O(1): lista + índice, remoção por troca com o último"""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._items: List = []
+        self._index: Dict[str, int] = {}
+        self._rng = rng or random.Random()
+
+    def add(self, video) -> None:
+        if video.filename in self._index:
+            return
+        self._index[video.filename] = len(self._items)
+        self._items.append(video)
+
+    def remove(self, filename: str) -> bool:
+        position = self._index.pop(filename, None)
+        if position is None:
+            return False
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._index[last.filename] = position
+        return True
+
+    def pick(self):
+        if not self._items:
+            return None
+        video = self._items[self._rng.randrange(len(self._items))]
+        self.remove(video.filename)
+        return video
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class OrderedPolicy(SelectionPolicy):
+    """Ordem de chegada (ordem da varredura), O(1) para escolher e remover"""
+
+    def __init__(self):
+        self._items: OrderedDict = OrderedDict()
+
+    def add(self, video) -> None:
+        self._items.setdefault(video.filename, video)
+
+    def remove(self, filename: str) -> bool:
+        return self._items.pop(filename, None) is not None
+
+    def pick(self):
+        if not self._items:
+            return None
+        return self._items.popitem(last=False)[1]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class HeapPolicy(SelectionPolicy):
+    """Ordem por chave (heap) com remoção preguiçosa; O(log N) para escolher"""
+
+    def __init__(self, key: Callable):
+        self._key = key
+        self._heap: List = []
+        self._live: Dict[str, object] = {}
+        self._counter = itertools.count()
+
+    def add(self, video) -> None:
+        if video.filename in self._live:
+            return
+        self._live[video.filename] = video
+        heapq.heappush(self._heap, (self._key(video), next(self._counter), video.filename))
+
+    def remove(self, filename: str) -> bool:
+        # Entrada fica no heap e é descartada quando chegar ao topo
+        removed = self._live.pop(filename, None) is not None
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+        return removed
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if entry[2] in self._live]
+        heapq.heapify(self._heap)
+
+    def pick(self):
+        while self._heap:
+            _, _, filename = heapq.heappop(self._heap)
+            video = self._live.pop(filename, None)
+            if video is not None:
+                return video
+        return None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+
+def _primary_tag(video) -> str:
+    return video.tags[0] if video.tags else ""
+
+
+class TagWeightedPolicy(SelectionPolicy):
+    """Sorteia a tag pelo peso e depois um vídeo aleatório dessa tag"""
+
+    def __init__(self, weight_fn: Callable[[str], float], rng: Optional[random.Random] = None):
+        self._weight_fn = weight_fn
+        self._rng = rng or random.Random()
+        self._buckets: Dict[str, RandomPolicy] = {}
+        self._tag_of: Dict[str, str] = {}
+
+    def add(self, video) -> None:
+        if video.filename in self._tag_of:
+            return
+        tag = _primary_tag(video)
+        self._tag_of[video.filename] = tag
+        self._buckets.setdefault(tag, RandomPolicy(self._rng)).add(video)
+
+    def remove(self, filename: str) -> bool:
+        tag = self._tag_of.pop(filename, None)
+        if tag is None:
+            return False
+        bucket = self._buckets[tag]
+        bucket.remove(filename)
+        if not len(bucket):
+            del self._buckets[tag]
+        return True
+
+    def pick(self):
+        if not self._buckets:
+            return None
+        tags = list(self._buckets)
+        weights = [max(0.0, float(self._weight_fn(tag))) for tag in tags]
+        if sum(weights) <= 0:
+            weights = [1.0] * len(tags)
+        tag = self._rng.choices(tags, weights=weights)[0]
+        video = self._buckets[tag].pick()
+        self.remove(video.filename)
+        return video
+
+    def __len__(self) -> int:
+        return len(self._tag_of)
+
+
+class RoundRobinPolicy(SelectionPolicy):
+    """Alterna entre as tags; dentro de cada tag mantém a ordem de chegada"""
+
+    def __init__(self):
+        self._buckets: Dict[str, OrderedPolicy] = {}
+        self._tag_of: Dict[str, str] = {}
+        self._rotation: deque = deque()
+
+    def add(self, video) -> None:
+        if video.filename in self._tag_of:
+            return
+        tag = _primary_tag(video)
+        self._tag_of[video.filename] = tag
+        if tag not in self._buckets:
+            self._buckets[tag] = OrderedPolicy()
+            self._rotation.append(tag)
+        self._buckets[tag].add(video)
+
+    def remove(self, filename: str) -> bool:
+        tag = self._tag_of.pop(filename, None)
+        if tag is None:
+            return False
+        return self._buckets[tag].remove(filename)
+
+    def pick(self):
+        # Tags vazias saem da rotação quando encontradas
+        while self._rotation:
+            tag = self._rotation.popleft()
+            bucket = self._buckets[tag]
+            video = bucket.pick()
+            if video is None:
+                del self._buckets[tag]
+                continue
+            del self._tag_of[video.filename]
+            if len(bucket):
+                self._rotation.append(tag)
+            else:
+                del self._buckets[tag]
+            return video
+        return None
+
+    def __len__(self) -> int:
+        return len(self._tag_of)
+
+
+POLICIES = ("random", "ordered", "oldest", "smallest", "tag_weighted", "round_robin")
+
+
+def create_policy(name: str, tag_weights: Optional[Dict[str, float]] = None,
+                  weight_fn: Optional[Callable[[str], float]] = None) -> SelectionPolicy:
+    """Cria a política de seleção pelo nome configurado"""
+    if name == "random":
+        return RandomPolicy()
+    if name == "ordered":
+        return OrderedPolicy()
+    if name == "oldest":
+        return HeapPolicy(key=lambda video: video.modified_at or 0.0)
+    if name == "smallest":
+        return HeapPolicy(key=lambda video: video.size_mb)
+    if name == "tag_weighted":
+        weights = tag_weights or {}
+        return TagWeightedPolicy(weight_fn or (lambda tag: weights.get(tag, 1.0)))
+    if name == "round_robin":
+        return RoundRobinPolicy()
+    raise ValueError(f"Política de seleção inválida: {name} (opções: {', '.join(POLICIES)})")
+
+
+class VideoPool:
+    """Conjunto mantido de vídeos disponíveis, atualizado de forma incremental"""
+
+    def __init__(self, policy: SelectionPolicy):
+        self.policy = policy
+        # filename -> vídeo conhecido no diretório (disponível ou não)
+        self._known: Dict[str, object] = {}
+        self._excluded: set = set()
+
+    def sync(self, videos: Iterable, excluded: Iterable[str] = ()) -> Dict[str, int]:
+        """Aplica uma nova varredura: adiciona novos arquivos e remove os que sumiram"""
+        self._excluded.update(excluded)
+        seen = {}
+        added = 0
+        for video in videos:
+            seen[video.filename] = video
+            if video.filename not in self._known:
+                added += 1
+                if video.filename not in self._excluded:
+                    self.policy.add(video)
+
+        removed = [filename for filename in self._known if filename not in seen]
+        for filename in removed:
+            self.policy.remove(filename)
+
+        self._known = seen
+        return {"added": added, "removed": len(removed)}
+
+    def pick(self):
+        """Escolhe e remove o próximo vídeo disponível"""
+        return self.policy.pick()
+
+    def take(self, filename: str):
+        """Retira um vídeo específico; None se não existe ou não está disponível"""
+        video = self._known.get(filename)
+        if video is None or not self.policy.remove(filename):
+            return None
+        return video
+
+    def state_of(self, filename: str) -> str:
+        """'unknown', 'uploaded' ou 'known' (disponível ou em andamento)"""
+        if filename not in self._known:
+            return "unknown"
+        return "uploaded" if filename in self._excluded else "known"
+
+    def put_back(self, video) -> None:
+        """Devolve um vídeo escolhido que não chegou a ser enviado"""
+        if video.filename in self._known and video.filename not in self._excluded:
+            self.policy.add(video)
+
+    def mark_uploaded(self, filename: str) -> None:
+        self._excluded.add(filename)
+        self.policy.remove(filename)
+
+    def requeue(self, filename: str) -> bool:
+        """Torna um vídeo já enviado disponível de novo (ex.: rejeitado pela plataforma)"""
+        if filename not in self._excluded:
+            return False
+        self._excluded.discard(filename)
+        video = self._known.get(filename)
+        if video is None:
+            return False
+        self.policy.add(video)
+        return True
+
+    @property
+    def total(self) -> int:
+        return len(self._known)
+
+    @property
+    def available(self) -> int:
+        return len(self.policy)
@@ -0,0 +1,97 @@
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+SHARDING_POLICIES = ("round_robin", "least_loaded", "fixed")
+
+
+class AccountSharder:
+    """Distribui uploads entre as contas de uma plataforma
+
+    Cada conta tem um limite de uploads simultâneos; acquire() bloqueia até
+    haver uma conta elegível (com capacidade e quota) e release() a libera.
+    """
+
+    def __init__(
+        self,
+        accounts: List[str],
+        policy: str = "round_robin",
+        per_account_concurrency: int = 1,
+        channel_accounts: Optional[Dict[str, str]] = None,
+        is_eligible: Optional[Callable[[str], bool]] = None,
+        load_of: Optional[Callable[[str], float]] = None
+    ):
+        if not accounts:
+            raise ValueError("Nenhuma conta configurada")
+        if policy not in SHARDING_POLICIES:
+            raise ValueError(f"Política de contas inválida: {policy} (opções: {', '.join(SHARDING_POLICIES)})")
+        self.accounts = list(accounts)
+        self.policy = policy
+        self.per_account_concurrency = max(1, per_account_concurrency)
+        self.channel_accounts = channel_accounts or {}
+        # Conta sem quota (ou outro motivo) fica fora da escolha
+        self._is_eligible = is_eligible or (lambda account: True)
+        # Carga acumulada (ex.: quota usada no dia) para desempate no least_loaded
+        self._load_of = load_of or (lambda account: 0.0)
+        self._in_flight: Dict[str, int] = {account: 0 for account in self.accounts}
+        self._cycle = itertools.cycle(self.accounts)
+        self._condition = threading.Condition()
+
+    @property
+    def total_concurrency(self) -> int:
+        return len(self.accounts) * self.per_account_concurrency
+
+    def in_flight(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(self._in_flight)
+
+    def _candidates(self, channel_name: Optional[str]) -> List[str]:
+        if self.policy == "fixed":
+            account = self.channel_accounts.get(channel_name) if channel_name else None
+            if account is None:
+                # Canal sem mapeamento usa a conta principal
+                return self.accounts[:1]
+            if account not in self._in_flight:
+                raise ValueError(f"Conta mapeada para {channel_name} não existe: {account}")
+            return [account]
+        return self.accounts
+
+    def _choose(self, candidates: List[str]) -> Optional[str]:
+        free = [
+            account for account in candidates
+            if self._in_flight[account] < self.per_account_concurrency and self._is_eligible(account)
+        ]
+        if not free:
+            return None
+        if self.policy == "least_loaded":
+            return min(free, key=lambda account: (self._in_flight[account], self._load_of(account)))
+        if self.policy == "round_robin":
+            for _ in range(len(self.accounts)):
+                account = next(self._cycle)
+                if account in free:
+                    return account
+        return free[0]
+
+    def has_eligible(self, channel_name: Optional[str] = None) -> bool:
+        """Há alguma conta com quota para este canal?"""
+        return any(self._is_eligible(account) for account in self._candidates(channel_name))
+
+    def acquire(self, channel_name: Optional[str] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """Reserva uma conta para um upload; None se nenhuma ficar disponível"""
+        with self._condition:
+            while True:
+                candidates = self._candidates(channel_name)
+                if not any(self._is_eligible(account) for account in candidates):
+                    return None
+                account = self._choose(candidates)
+                if account is not None:
+                    self._in_flight[account] += 1
+                    return account
+                if not self._condition.wait(timeout):
+                    return None
+
+    def release(self, account: str) -> None:
+        with self._condition:
+            self._in_flight[account] = max(0, self._in_flight[account] - 1)
+            self._condition.notify_all()
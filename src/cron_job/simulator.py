@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Simulação do agendador com relógio virtual
+Responde perguntas como "com 4 canais, intervalo de 6h, janela 9–18 e este
+acervo, quando os vídeos acabam?" sem esperar semanas: o VideoManager real
+roda com relógio virtual, catálogo sintético e uploads falsos.
+
+Exemplo:
+    python -m src.cron_job.simulator --channels 4 --videos 300 --interval 6 --days 120
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.channels.publish_shorts import PublishShorts, UploadResult, VideoFile
+from src.channels.quota import UPLOAD_OPERATION
+from src.cron_job.manager import VideoManager, create_config
+from src.observability import events
+
+
+class VirtualClock:
+    """Relógio controlado pela simulação (mesma interface de datetime.now)"""
+
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def synthetic_catalog(channel_name: str, count: int, tags: Optional[List[str]] = None,
+                      seed: int = 0) -> List[VideoFile]:
+    """Acervo fictício com tamanhos e tags variados"""
+    rng = random.Random(f"{seed}:{channel_name}")
+    tags = tags or ["curiosidades", "ciencia", "historia", "espaco"]
+    directory = f"<simulação>/{channel_name}"
+    videos = []
+    for index in range(count):
+        tag = rng.choice(tags)
+        videos.append(VideoFile(
+            directory=directory,
+            filename=f"{channel_name}-{index:06d}#{tag}.mp4",
+            title=f"{channel_name} {index}",
+            size_mb=round(rng.uniform(5, 80), 2),
+            tags=(tag,),
+            modified_at=float(index)
+        ))
+    return videos
+
+
+class SimulatedPublisher(PublishShorts):
+    """Publicador sem disco nem rede: lista o catálogo sintético e 'envia' na hora
+
+    O upload consome a quota como o real, então limites diários também entram
+    na simulação. failure_rate sorteia falhas de upload.
+    """
+
+    def __init__(self, base_path: str, videos: List[VideoFile], failure_rate: float = 0.0, seed: int = 0):
+        super().__init__(base_path)
+        self._videos = videos
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+
+    def iter_video_files(self, channel_name: str):
+        return iter(self._videos)
+
+    def validate_video(self, video: VideoFile) -> Dict[str, bool]:
+        return {"ready_for_upload": True}
+
+    def upload_video(self, video: VideoFile, platform: str, auth,
+                     account: Optional[str] = None, publish_at: Optional[datetime] = None) -> UploadResult:
+        size_bytes = round(video.size_mb * 1024 * 1024)
+        if self._rng.random() < self.failure_rate:
+            return UploadResult(success=False, size_bytes=size_bytes)
+        self.quota.charge(platform, UPLOAD_OPERATION[platform], account or "default")
+        return UploadResult(success=True, remote_id=f"sim-{self._rng.getrandbits(32):08x}", size_bytes=size_bytes)
+
+
+def simulate(
+    channels: List[Dict],
+    start: datetime,
+    days: int,
+    platform: str = "youtube",
+    seed: int = 0
+) -> Dict:
+    """Roda os canais no relógio virtual e devolve linha do tempo, slots ociosos e esgotamento
+
+    Cada canal é um dict com name, videos (quantidade) e opções do
+    VideoManager (upload_interval_hours, upload_start_hour, upload_end_hour,
+    selection_policy, upload_ahead, failure_rate, ...). Como no daemon, cada
+    canal tenta um upload a cada upload_interval_hours a partir de start.
+    """
+    clock = VirtualClock(start)
+    end = start + timedelta(days=days)
+    timeline = []
+    idle_slots = []
+    summary = {}
+
+    with tempfile.TemporaryDirectory(prefix="simulacao-") as workdir, \
+            open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        managers = {}
+        ticks = []
+        for spec in channels:
+            name = spec['name']
+            base_path = Path(workdir) / name
+            # Diretório vazio com mtime fixo: o pool é montado uma única vez
+            (base_path / name).mkdir(parents=True)
+            config = create_config(str(base_path), name, platform=platform,
+                                   auth_config_path=str(base_path / "auth_config.json"))
+            config.update({key: value for key, value in spec.items() if key not in ('name', 'videos', 'failure_rate')})
+            # Sem arquivos reais não há o que aquecer nem quadros para extrair
+            config.update({'interactive': False, 'log_level': 'ERROR', 'prefetch_budget_mb': 0,
+                           'thumbnails_enabled': False})
+
+            publisher = SimulatedPublisher(
+                str(base_path), synthetic_catalog(name, spec.get('videos', 100), seed=seed),
+                failure_rate=spec.get('failure_rate', 0.0), seed=seed
+            )
+            manager = VideoManager(config, clock=clock, publisher=publisher)
+            publisher.quota = manager.quota
+            manager._authenticated = True
+            managers[name] = manager
+            summary[name] = {'uploaded': 0, 'failed': 0, 'idle_slots': 0, 'idle_by_reason': {},
+                             'first_upload': None, 'last_upload': None, 'last_publish': None,
+                             'exhausted_at': None}
+            if manager._upload_ahead_enabled():
+                # Como no daemon: checagens frequentes que preenchem a agenda fora do pico
+                interval = timedelta(minutes=config.get('upload_ahead_check_minutes', 30))
+            else:
+                interval = timedelta(hours=config['upload_interval_hours'])
+            heapq.heappush(ticks, (start + interval, name, interval))
+
+        while ticks:
+            when, name, interval = heapq.heappop(ticks)
+            if when > end:
+                break
+            clock.now = when
+            manager = managers[name]
+            ahead = manager._upload_ahead_enabled()
+            results = manager.fill_ahead() if ahead else [manager.upload_next_video()]
+            stats = summary[name]
+
+            exhausted = False
+            for result in results:
+                if result['status'] == 'uploaded':
+                    stats['uploaded'] += 1
+                    stats['first_upload'] = stats['first_upload'] or when
+                    stats['last_upload'] = when
+                    # Com upload antecipado, a última publicação acontece depois do último envio
+                    stats['last_publish'] = result.get('publish_at') or when
+                    timeline.append({
+                        'time': when, 'channel': name, 'filename': result.get('filename'),
+                        'publish_at': result.get('publish_at')
+                    })
+                    continue
+                reason = result.get('reason', result['status'])
+                if ahead and reason in ('schedule_full', 'peak'):
+                    # Agenda em dia ou esperando o fim do pico: não é slot perdido
+                    continue
+                if result['status'] in ('failed', 'error'):
+                    stats['failed'] += 1
+                stats['idle_slots'] += 1
+                stats['idle_by_reason'][reason] = stats['idle_by_reason'].get(reason, 0) + 1
+                idle_slots.append({'time': when, 'channel': name, 'reason': reason})
+                if reason == 'no_video':
+                    # Acervo esgotado: o canal sai da simulação
+                    stats['exhausted_at'] = when
+                    exhausted = True
+            if exhausted:
+                continue
+            heapq.heappush(ticks, (when + interval, name, interval))
+
+        for name, manager in managers.items():
+            # Canal que nunca chegou à seleção (erro, quota, agenda cheia) ainda não montou o pool
+            manager.sync_pool()
+            summary[name]['remaining'] = manager.pool.available
+            manager.stop()
+            manager.drain()
+        # Fecha o log de eventos antes de apagar o diretório temporário
+        events.configure(None)
+
+    return {
+        'start': start,
+        'end': end,
+        'channels': summary,
+        'timeline': timeline,
+        'idle_slots': idle_slots
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simula o agendador com relógio virtual")
+    parser.add_argument('--spec', help="JSON com a lista de canais (substitui as opções abaixo)")
+    parser.add_argument('--channels', type=int, default=1, help="Quantidade de canais")
+    parser.add_argument('--videos', type=int, default=100, help="Vídeos por canal")
+    parser.add_argument('--interval', type=float, default=24, help="Intervalo entre uploads (horas)")
+    parser.add_argument('--start-hour', type=int, default=9, help="Início da janela")
+    parser.add_argument('--end-hour', type=int, default=18, help="Fim da janela")
+    parser.add_argument('--platform', default="youtube", help="Plataforma simulada")
+    parser.add_argument('--days', type=int, default=90, help="Dias simulados")
+    parser.add_argument('--start', help="Início da simulação (ISO, padrão: agora)")
+    parser.add_argument('--seed', type=int, default=0, help="Semente do catálogo e das falhas")
+    parser.add_argument('--timeline', action='store_true', help="Inclui linha do tempo e slots ociosos")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.spec:
+        with open(args.spec, 'r') as f:
+            channels = json.load(f)
+    else:
+        channels = [
+            {
+                'name': f"canal{index + 1}",
+                'videos': args.videos,
+                'upload_interval_hours': args.interval,
+                'upload_start_hour': args.start_hour,
+                'upload_end_hour': args.end_hour
+            }
+            for index in range(args.channels)
+        ]
+
+    start = datetime.fromisoformat(args.start) if args.start else datetime.now().replace(second=0, microsecond=0)
+    result = simulate(channels, start, args.days, args.platform, args.seed)
+    if not args.timeline:
+        result.pop('timeline')
+        result.pop('idle_slots')
+    sys.stdout.write(json.dumps(result, default=str, ensure_ascii=False, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
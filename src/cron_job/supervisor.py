@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Supervisor dos workers de upload
+Cada configuração (um canal) roda o daemon em um processo filho. Workers que
+caem são reiniciados com espera crescente; SIGTERM/SIGINT no supervisor
+repassam SIGTERM aos filhos, que terminam os uploads em andamento antes de
+sair (drain).
+
+Exemplo:
+    python -m src.cron_job.supervisor canal1.json canal2.json
+"""
+
+import argparse
+import multiprocessing
+import signal
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+from src.observability import events
+
+
+# Balde de banda comum a todos os workers do host (bandwidth_profile limita a soma)
+DEFAULT_BANDWIDTH_DB = os.path.join(tempfile.gettempdir(), "channel-dark-bandwidth.db")
+# Quota diária comum aos workers (fora do temp: precisa sobreviver a reinícios do host)
+DEFAULT_QUOTA_DB = os.path.join(os.path.expanduser("~"), ".channel-dark", "quota.db")
+
+
+def _worker_main(config_path: str, slot: int, bandwidth_db: str = DEFAULT_BANDWIDTH_DB,
+                 quota_db: str = DEFAULT_QUOTA_DB) -> None:
+    """Processo filho: um VideoManager rodando o agendador até receber SIGTERM"""
+    from src.cron_job.manager import VideoManager, load_config
+
+    # Ctrl+C chega ao grupo inteiro; quem decide o encerramento é o supervisor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    config = load_config(config_path)
+    config['interactive'] = False
+    # ID estável por slot: o worker reiniciado retoma na hora os próprios leases
+    config.setdefault('worker_id', f"{socket.gethostname()}-{config['channel_name']}-{slot}")
+    config.setdefault('bandwidth_db_path', bandwidth_db)
+    config.setdefault('quota_db_path', quota_db)
+    manager = VideoManager(config)
+
+    def handle(signum, frame):
+        print(f"📴 Worker {slot}: terminando uploads em andamento...")
+        manager.stop()
+
+    signal.signal(signal.SIGTERM, handle)
+    manager.start_scheduler()
+    # Espera os uploads que ainda estão nos executores das plataformas
+    manager.publisher.shutdown()
+
+
+@dataclass
+class WorkerSlot:
+    """Um worker supervisionado e seu histórico de quedas"""
+    slot: int
+    config_path: str
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    restarts: int = 0
+    crashes: Deque[float] = field(default_factory=deque)
+    next_start: float = 0.0
+    gave_up: bool = False
+    finished: bool = False
+
+
+class Supervisor:
+    """Mantém um processo por configuração, reiniciando os que caem
+
+    Um worker que cai mais de max_crashes vezes em crash_window segundos é
+    abandonado (provável erro de configuração). Saída com código 0 não é
+    queda: o worker terminou e não é reiniciado. No encerramento, os filhos
+    têm drain_timeout segundos para concluir os uploads antes de serem mortos.
+    """
+
+    def __init__(self, config_paths: List[str], max_crashes: int = 5, crash_window: float = 600,
+                 max_backoff: float = 60, drain_timeout: float = 900,
+                 bandwidth_db: str = DEFAULT_BANDWIDTH_DB, quota_db: str = DEFAULT_QUOTA_DB):
+        self.slots = [WorkerSlot(slot, path) for slot, path in enumerate(config_paths)]
+        self.max_crashes = max_crashes
+        self.crash_window = crash_window
+        self.max_backoff = max_backoff
+        self.drain_timeout = drain_timeout
+        self.bandwidth_db = bandwidth_db
+        self.quota_db = quota_db
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = threading.Event()
+
+    def _start(self, worker: WorkerSlot) -> None:
+        worker.process = self._context.Process(
+            target=_worker_main, args=(worker.config_path, worker.slot, self.bandwidth_db, self.quota_db),
+            name=f"upload-worker-{worker.slot}"
+        )
+        worker.process.start()
+        print(f"▶️ Worker {worker.slot} iniciado (pid {worker.process.pid}, {worker.config_path})")
+        events.log_event("worker.started", slot=worker.slot, pid=worker.process.pid, config=worker.config_path)
+
+    def _handle_exit(self, worker: WorkerSlot, now: float) -> None:
+        exitcode = worker.process.exitcode
+        worker.process = None
+        if self._stop.is_set():
+            # Saída durante o encerramento: não é queda nem volta
+            return
+        if exitcode == 0:
+            worker.finished = True
+            print(f"⏹️ Worker {worker.slot} terminou normalmente; não será reiniciado")
+            events.log_event("worker.finished", slot=worker.slot)
+            return
+        worker.crashes.append(now)
+        while worker.crashes and now - worker.crashes[0] > self.crash_window:
+            worker.crashes.popleft()
+
+        if len(worker.crashes) > self.max_crashes:
+            worker.gave_up = True
+            print(f"🛑 Worker {worker.slot} caiu {len(worker.crashes)} vezes; desistindo")
+            events.log_event("worker.abandoned", "ERROR", slot=worker.slot, exitcode=exitcode)
+            return
+
+        backoff = min(self.max_backoff, 2 ** (len(worker.crashes) - 1))
+        worker.next_start = now + backoff
+        worker.restarts += 1
+        print(f"💥 Worker {worker.slot} saiu (código {exitcode}); reiniciando em {backoff:.0f}s")
+        events.log_event(
+            "worker.crashed", "ERROR", slot=worker.slot, exitcode=exitcode,
+            restarts=worker.restarts, backoff=backoff
+        )
+
+    def run(self, poll_interval: float = 1.0) -> int:
+        """Supervisiona até stop(); retorna 1 se algum worker foi abandonado"""
+        os.makedirs(os.path.dirname(self.quota_db) or '.', exist_ok=True)
+        for worker in self.slots:
+            self._start(worker)
+
+        while not self._stop.wait(poll_interval):
+            now = time.monotonic()
+            for worker in self.slots:
+                if worker.gave_up or worker.finished:
+                    continue
+                if worker.process is None:
+                    if now >= worker.next_start:
+                        self._start(worker)
+                elif not worker.process.is_alive():
+                    self._handle_exit(worker, now)
+            if all(worker.gave_up or worker.finished for worker in self.slots):
+                break
+
+        self._drain()
+        return 1 if any(worker.gave_up for worker in self.slots) else 0
+
+    def _drain(self) -> None:
+        """SIGTERM para todos e espera o fim dos uploads (mata quem passar do prazo)"""
+        running = [worker for worker in self.slots if worker.process is not None and worker.process.is_alive()]
+        if not running:
+            return
+        print(f"⏳ Aguardando {len(running)} worker(s) concluírem os uploads...")
+        for worker in running:
+            worker.process.terminate()
+        deadline = time.monotonic() + self.drain_timeout
+        for worker in running:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                # O lease expira e o checkpoint permite retomar o upload depois
+                print(f"⚠️ Worker {worker.slot} não terminou a tempo; encerrando à força")
+                events.log_event("worker.killed", "WARNING", slot=worker.slot)
+                worker.process.kill()
+                worker.process.join()
+        events.log_event("supervisor.drained", workers=len(running))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Supervisiona um worker de upload por configuração")
+    parser.add_argument('configs', nargs='+', help="Arquivos JSON de configuração (um worker cada)")
+    parser.add_argument('--drain-timeout', type=float, default=900,
+                        help="Segundos para concluir uploads no encerramento")
+    parser.add_argument('--max-crashes', type=int, default=5,
+                        help="Quedas toleradas em 10 minutos antes de desistir do worker")
+    parser.add_argument('--bandwidth-db', default=DEFAULT_BANDWIDTH_DB,
+                        help="SQLite do limite de banda compartilhado entre os workers")
+    parser.add_argument('--quota-db', default=DEFAULT_QUOTA_DB,
+                        help="SQLite da quota diária compartilhada entre os workers")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    supervisor = Supervisor(args.configs, max_crashes=args.max_crashes, drain_timeout=args.drain_timeout,
+                            bandwidth_db=args.bandwidth_db, quota_db=args.quota_db)
+
+    def handle(signum, frame):
+        print(f"\n📴 Sinal {signum} recebido, drenando workers...")
+        supervisor.stop()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+    return supervisor.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
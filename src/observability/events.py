@@ -0,0 +1,171 @@
+import atexit
+import contextvars
+import json
+import os
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+# ID de correlação da tentativa de upload corrente (propaga por thread/contexto)
+_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "correlation_id", default=None
+)
+
+
+def current_correlation_id() -> Optional[str]:
+    """Retorna o ID de correlação ativo no contexto atual"""
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation(correlation_id: Optional[str] = None):
+    """Define um ID de correlação para todos os eventos emitidos no bloco"""
+    token = _correlation_id.set(correlation_id or uuid.uuid4().hex[:16])
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+class EventLog:
+    """Log de eventos em JSON lines com escrita em lote numa thread de fundo"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        level: str = "INFO",
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        flush_interval: float = 1.0
+    ):
+        self.path = Path(path) if path else None
+        self.level = LEVELS[level.upper()]
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None or self.path is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._writer_loop, name="event-log", daemon=True)
+                self._thread.start()
+
+    def emit(self, event: str, level: str = "INFO", **fields) -> None:
+        """Enfileira um evento; não bloqueia em I/O"""
+        if self.path is None or LEVELS[level.upper()] < self.level:
+            return
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "level": level.upper(),
+            "event": event,
+            "correlation_id": _correlation_id.get(),
+        }
+        record.update(fields)
+        self._ensure_writer()
+        self._queue.put(json.dumps(record, default=str, ensure_ascii=False))
+
+    def _writer_loop(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            # Drenar o que já estiver na fila em uma única escrita
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            lines = [line for line in batch if line is not None]
+            if lines:
+                try:
+                    self._write(lines)
+                except Exception as e:
+                    print(f"⚠️ Erro ao gravar log de eventos: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, lines: list) -> None:
+        size = self.path.stat().st_size if self.path.exists() else 0
+        pending = []
+        for line in lines:
+            data = (line + "\n").encode("utf-8")
+            if pending and size + len(data) > self.max_bytes:
+                self._append(pending)
+                pending, size = [], 0
+                self._rotate()
+            elif not pending and size and size + len(data) > self.max_bytes:
+                self._rotate()
+                size = 0
+            pending.append(data)
+            size += len(data)
+        self._append(pending)
+
+    def _append(self, chunks: list) -> None:
+        with open(self.path, "ab") as f:
+            f.write(b"".join(chunks))
+
+    def _rotate(self) -> None:
+        """Rotaciona events.jsonl -> events.jsonl.1 -> ... por tamanho"""
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def flush(self) -> None:
+        """Aguarda a gravação de todos os eventos enfileirados"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Grava pendências e encerra a thread de escrita"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+_event_log = EventLog()
+
+
+def configure(path: str, **options) -> EventLog:
+    """Configura o log de eventos global do processo"""
+    global _event_log
+    _event_log.close()
+    _event_log = EventLog(path, **options)
+    return _event_log
+
+
+def get_event_log() -> EventLog:
+    return _event_log
+
+
+def log_event(event: str, level: str = "INFO", **fields) -> None:
+    """Emite um evento no log global"""
+    _event_log.emit(event, level, **fields)
+
+
+atexit.register(lambda: _event_log.close())
@@ -0,0 +1,127 @@
+import hmac
+import ipaddress
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+# Um handler recebe (caminho, query, corpo) e devolve (status, content_type, corpo)
+Handler = Callable[[str, Dict[str, list], bytes], Tuple[int, str, bytes]]
+
+
+def is_loopback(host: str) -> bool:
+    """Endereço acessível só da própria máquina"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def json_response(data, status: int = 200) -> Tuple[int, str, bytes]:
+    """Monta resposta JSON para um handler"""
+    body = json.dumps(data, default=str, ensure_ascii=False).encode('utf-8')
+    return status, "application/json; charset=utf-8", body
+
+
+class LocalServer:
+    """Servidor HTTP local e leve para métricas, status e gatilhos
+
+    Com token, toda requisição precisa de "Authorization: Bearer <token>".
+    Fora do loopback o token é obrigatório: a API dispara uploads reais.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9100, token: Optional[str] = None):
+        if not token and not is_loopback(host):
+            raise ValueError(f"http_token é obrigatório para expor o servidor em {host}")
+        self.host = host
+        self.port = port
+        self.token = token
+        # (método, caminho ou prefixo terminado em '/') -> handler
+        self._routes: Dict[Tuple[str, str], Handler] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, method: str, path: str, handler: Handler) -> None:
+        """Registra handler; caminhos terminados em '/' casam por prefixo"""
+        self._routes[(method.upper(), path)] = handler
+
+    def _resolve(self, method: str, path: str) -> Optional[Handler]:
+        handler = self._routes.get((method, path))
+        if handler:
+            return handler
+        # Prefixo mais longo primeiro (ex.: /jobs/<id>)
+        prefixes = [
+            route_path for (route_method, route_path) in self._routes
+            if route_method == method and route_path.endswith('/') and path.startswith(route_path)
+        ]
+        if prefixes:
+            return self._routes[(method, max(prefixes, key=len))]
+        return None
+
+    def _authorized(self, header: Optional[str]) -> bool:
+        if not self.token:
+            return True
+        # Comparação em tempo constante
+        return hmac.compare_digest((header or "").encode(), f"Bearer {self.token}".encode())
+
+    def _make_handler(self):
+        server = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            def _dispatch(self, method: str):
+                parsed = urlparse(self.path)
+                handler = server._resolve(method, parsed.path)
+                if not server._authorized(self.headers.get('Authorization')):
+                    status, content_type, body = json_response({"error": "unauthorized"}, 401)
+                elif handler is None:
+                    status, content_type, body = json_response({"error": "not found"}, 404)
+                else:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    payload = self.rfile.read(length) if length else b""
+                    try:
+                        status, content_type, body = handler(parsed.path, parse_qs(parsed.query), payload)
+                    except Exception as e:
+                        status, content_type, body = json_response({"error": str(e)}, 500)
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                # Silenciar log padrão por requisição (polling frequente)
+                pass
+
+        return _RequestHandler
+
+    def start(self) -> None:
+        """Inicia o servidor em uma thread daemon"""
+        if self._httpd is not None:
+            return
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        # Porta real (útil quando port=0)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="local-http", daemon=True)
+        self._thread.start()
+        print(f"🌐 Servidor local em http://{self.host}:{self.port}")
+
+    def stop(self) -> None:
+        """Encerra o servidor"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        self._thread = None
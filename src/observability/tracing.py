@@ -0,0 +1,185 @@
+import contextvars
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter as _StackCounter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.observability import metrics
+
+
+STAGE_DURATION = metrics.REGISTRY.histogram(
+    "upload_stage_seconds",
+    "Duração de cada etapa de upload_next_video",
+    ("stage",)
+)
+
+
+@dataclass
+class Span:
+    """Etapa cronometrada de uma execução"""
+    name: str
+    started_at: float
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class RunTrace:
+    """Spans registrados em uma execução de upload_next_video"""
+    run_id: str
+    started_at: datetime
+    spans: List[Span] = field(default_factory=list)
+    duration: float = 0.0
+    profile_path: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration": round(self.duration, 6),
+            "profile_path": self.profile_path,
+            "spans": [
+                {"name": span.name, "duration": round(span.duration, 6), "error": span.error}
+                for span in self.spans
+            ],
+        }
+
+
+_current_run: contextvars.ContextVar[Optional[RunTrace]] = contextvars.ContextVar(
+    "current_run", default=None
+)
+
+
+@contextmanager
+def span(name: str):
+    """Cronometra uma etapa da execução ativa (no-op fora de uma execução)"""
+    run = _current_run.get()
+    if run is None:
+        yield None
+        return
+
+    current = Span(name=name, started_at=time.perf_counter())
+    try:
+        yield current
+    except Exception as e:
+        current.error = str(e)
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.started_at
+        run.spans.append(current)
+        STAGE_DURATION.observe(current.duration, stage=name)
+
+
+class SamplingProfiler:
+    """Amostrador de pilhas simples; grava no formato 'collapsed' (flamegraph)"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._samples: _StackCounter = _StackCounter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_thread_id: Optional[int] = None
+
+    def start(self) -> None:
+        self._target_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Tracer:
+    """Mantém os traces das últimas execuções para consulta posterior"""
+
+    def __init__(self, max_runs: int = 100):
+        self._runs: deque = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+        self._profile_next: Optional[Dict] = None
+
+    def profile_next_run(self, path: str, mode: str = "cprofile") -> None:
+        """Ativa profiling (cprofile ou sampling) apenas para a próxima execução"""
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Modo de profiling inválido: {mode}")
+        self._profile_next = {"path": path, "mode": mode}
+
+    @contextmanager
+    def run(self, run_id: str):
+        """Abre uma execução; spans emitidos dentro do bloco são associados a ela"""
+        trace = RunTrace(run_id=run_id, started_at=datetime.now())
+        token = _current_run.set(trace)
+        profile, self._profile_next = self._profile_next, None
+        profiler = None
+        if profile:
+            profiler = cProfile.Profile() if profile["mode"] == "cprofile" else SamplingProfiler()
+            if profile["mode"] == "cprofile":
+                profiler.enable()
+            else:
+                profiler.start()
+
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.duration = time.perf_counter() - started
+            _current_run.reset(token)
+            if profiler is not None:
+                if profile["mode"] == "cprofile":
+                    profiler.disable()
+                    profiler.dump_stats(profile["path"])
+                else:
+                    profiler.stop()
+                    profiler.dump(profile["path"])
+                trace.profile_path = profile["path"]
+                print(f"🔬 Profile salvo em {profile['path']}")
+            with self._lock:
+                self._runs.append(trace)
+
+    def recent_runs(self, limit: int = 20) -> List[Dict]:
+        """Retorna os traces mais recentes (mais novo primeiro)"""
+        with self._lock:
+            runs = list(self._runs)[-limit:]
+        return [trace.to_dict() for trace in reversed(runs)]
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Resumo por etapa (contagem, média, p95, máximo) das execuções guardadas"""
+        durations: Dict[str, List[float]] = {}
+        with self._lock:
+            for trace in self._runs:
+                for item in trace.spans:
+                    durations.setdefault(item.name, []).append(item.duration)
+
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            p95_index = max(0, int(round(0.95 * len(values))) - 1)
+            summary[name] = {
+                "count": len(values),
+                "avg": round(sum(values) / len(values), 6),
+                "p95": round(values[p95_index], 6),
+                "max": round(values[-1], 6),
+            }
+        return summary
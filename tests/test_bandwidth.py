@@ -0,0 +1,59 @@
+import threading
+import time
+from datetime import datetime
+
+from src.channels.bandwidth import BLOCK_SIZE, SharedBandwidthLimiter, ThrottledReader
+
+
+RATE = 1024 * 1024
+PROFILE = [{'start_hour': 0, 'end_hour': 24, 'bytes_per_second': RATE}]
+
+
+def _at(hour):
+    return lambda: datetime(2026, 10, 19, hour, 30)
+
+
+def test_profile_window_crossing_midnight(tmp_path):
+    profile = [
+        {'start_hour': 22, 'end_hour': 6, 'mb_per_second': 2},
+        {'start_hour': 9, 'end_hour': 18, 'mb_per_second': None},
+    ]
+    db_path = tmp_path / "bandwidth.db"
+
+    assert SharedBandwidthLimiter(db_path, profile, clock=_at(23)).current_rate() == 2 * RATE
+    assert SharedBandwidthLimiter(db_path, profile, clock=_at(3)).current_rate() == 2 * RATE
+    assert SharedBandwidthLimiter(db_path, profile, clock=_at(12)).current_rate() is None
+    assert SharedBandwidthLimiter(db_path, profile, clock=_at(20)).current_rate() is None
+
+
+def test_unlimited_window_does_not_touch_the_bucket(tmp_path):
+    limiter = SharedBandwidthLimiter(tmp_path / "bandwidth.db", [], clock=_at(12))
+
+    started = time.monotonic()
+    limiter.consume(100 * RATE)
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_limiters_on_the_same_file_share_the_rate(tmp_path):
+    db_path = tmp_path / "bandwidth.db"
+    # Um limitador por "processo": conexões e reservas locais independentes
+    limiters = [SharedBandwidthLimiter(db_path, PROFILE) for _ in range(2)]
+    per_limiter = RATE // 4
+
+    def send(limiter):
+        reader = ThrottledReader(b"\0" * per_limiter, limiter)
+        while reader.read(BLOCK_SIZE):
+            pass
+
+    threads = [threading.Thread(target=send, args=(limiter,)) for limiter in limiters]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    # O balde começa vazio: 512 KiB somados a 1 MiB/s levam ~0,5s (cada um sozinho levaria ~0,25s)
+    assert elapsed >= 0.4
+    assert elapsed < 2.0
@@ -0,0 +1,70 @@
+import sqlite3
+import time
+
+from src.cron_job.history import UploadHistory
+
+
+DAY = 86400
+
+
+def _pragma(history, name):
+    return history._connection().execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_compact_moves_old_rows_into_daily_totals(tmp_path):
+    history = UploadHistory(tmp_path / "history.db", retention_days=30)
+    now = time.time()
+    old = now - 40 * DAY
+    history.record("canal", "youtube", "a.mp4", "uploaded", size_bytes=100, duration=2.0, ts=old)
+    history.record("canal", "youtube", "b.mp4", "uploaded", size_bytes=300, duration=4.0, ts=old)
+    history.record("canal", "youtube", "c.mp4", "failed", ts=old)
+    history.record("canal", "youtube", "d.mp4", "uploaded", size_bytes=50, duration=1.0, ts=now)
+
+    assert history.compact(now=now) == 3
+
+    # Só a tentativa recente continua detalhada
+    assert [row['filename'] for row in history.query()] == ["d.mp4"]
+    # Os totais incluem as linhas compactadas
+    totals = {row['outcome']: row for row in history.summary(group_by=("outcome",))}
+    assert totals['uploaded']['attempts'] == 3
+    assert totals['uploaded']['bytes'] == 450
+    assert totals['uploaded']['avg_duration'] == round(7.0 / 3, 2)
+    assert totals['failed']['attempts'] == 1
+
+    # Compactar de novo não duplica os totais
+    assert history.compact(now=now) == 0
+    assert history.summary(group_by=("outcome",), outcome="uploaded")[0]['attempts'] == 3
+
+
+def test_compact_without_retention_keeps_everything(tmp_path):
+    history = UploadHistory(tmp_path / "history.db", retention_days=None)
+    history.record("canal", "youtube", "a.mp4", "uploaded", ts=time.time() - 400 * DAY)
+
+    assert history.compact() == 0
+    assert len(history.query()) == 1
+
+
+def test_compact_returns_freed_pages_incrementally(tmp_path):
+    history = UploadHistory(tmp_path / "history.db", retention_days=1)
+    assert _pragma(history, "auto_vacuum") == 2
+    old = time.time() - 5 * DAY
+    for index in range(3000):
+        history.record("canal", "youtube", f"{index}.mp4", "uploaded", reason="x" * 300, ts=old)
+    pages = _pragma(history, "page_count")
+
+    assert history.compact() == 3000
+    assert _pragma(history, "freelist_count") == 0
+    assert _pragma(history, "page_count") < pages // 10
+
+
+def test_existing_database_is_switched_to_incremental_vacuum(tmp_path):
+    db_path = tmp_path / "history.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("CREATE TABLE legado (valor TEXT)")
+    legacy.commit()
+    legacy.close()
+
+    history = UploadHistory(db_path)
+
+    assert _pragma(history, "auto_vacuum") == 2
+    assert history._connection().execute("SELECT COUNT(*) FROM legado").fetchone()[0] == 0
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from src.cron_job.leases import LeaseStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "leases.db"
+
+
+def test_claim_is_exclusive_while_lease_is_alive(db_path):
+    first = LeaseStore(db_path, worker_id="a")
+    second = LeaseStore(db_path, worker_id="b")
+
+    assert first.claim("video.mp4", "canal") == "claimed"
+    assert second.claim("video.mp4", "canal") is None
+    # O próprio dono pode reservar de novo (reinício com o mesmo worker_id)
+    assert first.claim("video.mp4", "canal") == "claimed"
+
+
+def test_expired_lease_is_stolen_and_old_owner_loses_heartbeat(db_path):
+    first = LeaseStore(db_path, worker_id="a", ttl_seconds=0.05)
+    second = LeaseStore(db_path, worker_id="b", ttl_seconds=60)
+
+    first.claim("video.mp4", "canal")
+    time.sleep(0.1)
+
+    assert second.claim("video.mp4", "canal") == "reclaimed"
+    assert first.heartbeat("video.mp4") is False
+    assert second.heartbeat("video.mp4") is True
+
+
+def test_release_frees_only_own_lease(db_path):
+    first = LeaseStore(db_path, worker_id="a")
+    second = LeaseStore(db_path, worker_id="b")
+
+    first.claim("video.mp4", "canal")
+    assert second.release("video.mp4") is False
+    assert second.claim("video.mp4", "canal") is None
+
+    assert first.release("video.mp4") is True
+    assert second.claim("video.mp4", "canal") == "claimed"
+
+
+def test_done_is_recorded_by_filename_whatever_the_owner(db_path):
+    first = LeaseStore(db_path, worker_id="a", ttl_seconds=0.05)
+    second = LeaseStore(db_path, worker_id="b")
+
+    first.claim("video.mp4", "canal")
+    time.sleep(0.1)
+    second.claim("video.mp4", "canal")
+
+    # O lease foi retomado, mas o envio de "a" terminou: o vídeo fica concluído
+    assert first.release("video.mp4", done=True, channel="canal") is False
+    assert second.done_filenames("canal") == {"video.mp4"}
+    assert second.claim("video.mp4", "canal") is None
+
+    # Sem registro (removido por reclaim_expired) o 'done' também é gravado
+    assert first.release("outro.mp4", done=True, channel="canal") is False
+    assert first.done_filenames("canal") == {"video.mp4", "outro.mp4"}
+
+
+def test_reclaim_expired_keeps_done_rows(db_path):
+    store = LeaseStore(db_path, worker_id="a", ttl_seconds=0.05)
+    store.claim("expira.mp4", "canal")
+    store.claim("enviado.mp4", "canal")
+    assert store.release("enviado.mp4", done=True, channel="canal") is True
+    time.sleep(0.1)
+
+    assert store.reclaim_expired() == 1
+    assert store.active_leases() == 0
+    assert store.done_filenames() == {"enviado.mp4"}
+
+
+def test_heartbeat_while_flags_lost_lease(db_path):
+    store = LeaseStore(db_path, worker_id="a")
+    store.claim("video.mp4", "canal")
+
+    with store.heartbeat_while("video.mp4", interval=0.02) as lost:
+        assert not lost.is_set()
+        store.reset("video.mp4")
+        assert lost.wait(1.0)
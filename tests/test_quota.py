@@ -0,0 +1,65 @@
+import multiprocessing
+
+import pytest
+
+from src.channels.quota import QuotaBudget, QuotaExceededError
+
+
+LIMITS = {'youtube': 200}
+
+
+def _charge_until_refused(db_path, attempts, results):
+    """Executado em outro processo: cobra videos.list (1 unidade) attempts vezes"""
+    quota = QuotaBudget(db_path, daily_limits=LIMITS)
+    charged = 0
+    for _ in range(attempts):
+        try:
+            quota.charge('youtube', 'videos.list', 'conta')
+            charged += 1
+        except QuotaExceededError:
+            pass
+    results.put(charged)
+
+
+def test_charge_is_refused_past_the_daily_limit(tmp_path):
+    quota = QuotaBudget(tmp_path / "quota.db", daily_limits={'youtube': 3200})
+
+    assert quota.charge('youtube', 'videos.insert', 'conta') == 1600
+    assert quota.charge('youtube', 'videos.insert', 'conta') == 1600
+    with pytest.raises(QuotaExceededError):
+        quota.charge('youtube', 'videos.list', 'conta')
+
+    assert quota.used('youtube', 'conta') == 3200
+    assert quota.can_afford('youtube', 'conta') is False
+    # Cada conta tem a sua quota
+    assert quota.can_afford('youtube', 'outra') is True
+
+
+def test_two_processes_share_the_limit(tmp_path):
+    db_path = str(tmp_path / "quota.db")
+    QuotaBudget(db_path, daily_limits=LIMITS)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=_charge_until_refused, args=(db_path, 150, results))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    charged = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    # 300 tentativas contra um limite de 200: nenhuma cobrança passa do limite
+    assert sum(charged) == 200
+    assert QuotaBudget(db_path, daily_limits=LIMITS).used('youtube', 'conta') == 200
+
+
+def test_snapshot_reflects_charges_without_reading_the_database(tmp_path):
+    quota = QuotaBudget(tmp_path / "quota.db", daily_limits=LIMITS)
+    quota.charge('youtube', 'videos.update', 'conta')
+
+    snapshot = quota.snapshot()
+    assert snapshot['youtube:conta']['used'] == 50
+    assert snapshot['youtube:conta']['limit'] == 200
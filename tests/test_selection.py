@@ -0,0 +1,111 @@
+import random
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.cron_job.selection import OrderedPolicy, RandomPolicy, VideoPool, create_policy
+
+
+@dataclass
+class Video:
+    filename: str
+    size_mb: float = 10.0
+    modified_at: Optional[float] = None
+    tags: Tuple[str, ...] = ()
+
+
+def _videos(*names):
+    return [Video(name) for name in names]
+
+
+def _drain(pool):
+    picked = []
+    while True:
+        video = pool.pick()
+        if video is None:
+            return picked
+        picked.append(video.filename)
+
+
+def test_sync_adds_new_files_and_drops_missing_ones():
+    pool = VideoPool(OrderedPolicy())
+
+    assert pool.sync(_videos("a", "b", "c")) == {"added": 3, "removed": 0}
+    assert pool.sync(_videos("b", "c", "d")) == {"added": 1, "removed": 1}
+
+    assert pool.total == 3
+    assert _drain(pool) == ["b", "c", "d"]
+
+
+def test_sync_keeps_uploaded_files_out_of_the_pool():
+    pool = VideoPool(OrderedPolicy())
+    pool.sync(_videos("a", "b", "c"), excluded={"b"})
+
+    assert pool.total == 3
+    assert pool.available == 2
+    assert pool.state_of("b") == "uploaded"
+    assert pool.state_of("a") == "known"
+    assert pool.state_of("z") == "unknown"
+
+    # Uma varredura nova não traz de volta o que já foi enviado
+    pool.sync(_videos("a", "b", "c"))
+    assert _drain(pool) == ["a", "c"]
+
+
+def test_pick_removes_and_put_back_returns_the_video():
+    pool = VideoPool(OrderedPolicy())
+    pool.sync(_videos("a", "b"))
+
+    video = pool.pick()
+    assert video.filename == "a"
+    assert pool.available == 1
+
+    pool.put_back(video)
+    assert pool.available == 2
+    # Devolver duas vezes não duplica
+    pool.put_back(video)
+    assert pool.available == 2
+
+
+def test_put_back_ignores_uploaded_or_vanished_videos():
+    pool = VideoPool(OrderedPolicy())
+    pool.sync(_videos("a", "b"))
+    first, second = pool.pick(), pool.pick()
+
+    pool.mark_uploaded(first.filename)
+    pool.sync(_videos("a"))
+    pool.put_back(first)
+    pool.put_back(second)
+
+    assert pool.available == 0
+
+
+def test_take_and_requeue():
+    pool = VideoPool(OrderedPolicy())
+    pool.sync(_videos("a", "b"))
+
+    assert pool.take("b").filename == "b"
+    assert pool.take("b") is None
+    assert pool.take("z") is None
+
+    pool.mark_uploaded("b")
+    assert pool.requeue("b") is True
+    assert pool.requeue("a") is False
+    assert sorted(_drain(pool)) == ["a", "b"]
+
+
+def test_random_policy_picks_every_video_once():
+    pool = VideoPool(RandomPolicy(random.Random(7)))
+    names = [f"{index}.mp4" for index in range(50)]
+    pool.sync(_videos(*names))
+
+    picked = _drain(pool)
+
+    assert sorted(picked) == sorted(names)
+    assert picked != names
+
+
+def test_smallest_policy_orders_by_size():
+    pool = VideoPool(create_policy("smallest"))
+    pool.sync([Video("grande", 90.0), Video("pequeno", 5.0), Video("medio", 40.0)])
+
+    assert _drain(pool) == ["pequeno", "medio", "grande"]